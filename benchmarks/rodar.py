@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+import numpy as np
+
+# Benchmarks do modelo e do pipeline de dados sobre um universo sintético
+# (ver sintetico.py). Roda offline: os CSVs vão para uma pasta temporária.
+#
+#   python benchmarks/rodar.py                       # 20 ativos x 20 anos
+#   python benchmarks/rodar.py --tamanho grande      # 1000 ativos x 30 anos
+#   python benchmarks/rodar.py --casos fronteira monte_carlo
+#   python benchmarks/rodar.py --comparar resultados/a.json resultados/b.json
+#
+# Cada caso roda `--repeticoes` vezes para o tempo (mínimo e mediana) e uma vez
+# a mais sob tracemalloc para o pico de memória (alocações Python + NumPy).
+# O resultado vai para benchmarks/resultados/<data_hora>_<commit>_<ativos>x<anos>.json.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'dados', 'codes'))
+sys.path.insert(0, os.path.join(ROOT, 'modelos_portfolio', 'codes'))
+sys.path.insert(0, ROOT)
+from sintetico import escrever_universo, gerar_precos
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+PASTA_UNIVERSOS = os.path.join(tempfile.gettempdir(), 'baroque_benchmarks')
+
+TAMANHOS = {
+    'atual': (20, 20),
+    'medio': (200, 25),
+    'grande': (1000, 30),
+}
+
+CASOS = {}
+
+
+def caso(nome):
+    # Registra um caso: preparar(contexto) -> função sem argumentos a medir
+    def registrar(preparar):
+        CASOS[nome] = preparar
+        return preparar
+    return registrar
+
+
+# --- Casos ---
+
+@caso('csv_painel')
+def _csv_painel(ctx):
+    from painel import construir_painel
+    destino = os.path.join(ctx['trabalho'], 'painel_csv')
+    return lambda: construir_painel(ctx['universo'], destino)
+
+
+@caso('painel_carga')
+def _painel_carga(ctx):
+    from painel import carregar_painel
+    # Painel já atualizado: mede checagem do manifesto + memmap + frame completo
+    carregar_painel(ctx['universo'])
+    return lambda: carregar_painel(ctx['universo']).frame(how='outer')
+
+
+@caso('conversao_brl')
+def _conversao_brl(ctx):
+    from painel import carregar_painel
+    from conversao import convert_panel
+    # Os ativos sintéticos não estão no registro (cotados em BRL): mede o produto
+    # vetorizado preços x câmbio sobre o painel inteiro, sem gravar os CSVs
+    painel = carregar_painel(ctx['universo'])
+    return lambda: convert_panel(painel, painel.colunas)
+
+
+@caso('cubo_retornos')
+def _cubo_retornos(ctx):
+    from painel import carregar_painel
+    from retornos import atualizar_cubo
+    # Cubo D/W/M completo (log, simples e máscaras) a partir do painel
+    painel = carregar_painel(ctx['universo'])
+    destino = os.path.join(ctx['trabalho'], 'cubo')
+
+    def construir():
+        shutil.rmtree(destino, ignore_errors=True)
+        atualizar_cubo(painel, destino)
+    return construir
+
+
+@caso('cubo_carga')
+def _cubo_carga(ctx):
+    from retornos import carregar_cubo
+    # Cubo já atualizado: checagem do manifesto + memmap + retornos alinhados de 20 ativos
+    carregar_cubo(ctx['universo'])
+    colunas = carregar_cubo(ctx['universo']).colunas[:20]
+    return lambda: carregar_cubo(ctx['universo']).alinhados(colunas, 'W')
+
+
+@caso('covariancia')
+def _covariancia(ctx):
+    from alocacao import estatisticas_retornos
+    return lambda: estatisticas_retornos(ctx['retornos'])
+
+
+@caso('covariancia_expansiva')
+def _covariancia_expansiva(ctx):
+    from estatisticas import EstatisticaExpansiva, empilhar
+    retornos = np.diff(np.log(ctx['precos'].to_numpy()), axis=0)
+    return lambda: empilhar(EstatisticaExpansiva(retornos.shape[1]), retornos, covariancia=False)
+
+
+@caso('otimizacao_unica')
+def _otimizacao_unica(ctx):
+    from otimizacao import ObjetivosCarteira, otimizar
+    mu, sigma = ctx['estatisticas']
+    objetivos = ObjetivosCarteira(mu, sigma, 0.0)
+    x0 = np.full(len(mu), 1 / len(mu))
+    soma = [objetivos.restricao_soma()]
+    return lambda: otimizar(objetivos, objetivos.neg_sharpe, x0, soma)
+
+
+@caso('fronteira')
+def _fronteira(ctx):
+    from alocacao import otimizar_carteiras
+    _, ret_mean, cov_matrix = ctx['estatisticas_pd']
+    return lambda: otimizar_carteiras(ret_mean, cov_matrix, 0.0, n_pontos=50)
+
+
+@caso('fronteira_fatores')
+def _fronteira_fatores(ctx):
+    from alocacao import otimizar_carteiras
+    from fatores import estimar_pca
+    retornos, ret_mean, _ = ctx['estatisticas_pd']
+    modelo = estimar_pca(retornos, 10)
+    return lambda: otimizar_carteiras(ret_mean, modelo, 0.0, n_pontos=50)
+
+
+@caso('fronteira_reamostrada')
+def _fronteira_reamostrada(ctx):
+    from reamostragem import fronteira_reamostrada
+    retornos = ctx['estatisticas_pd'][0]
+    # 100 reamostras em blocos, CLA por reamostra no pool (um processo por núcleo)
+    return lambda: fronteira_reamostrada(retornos, 0.0, 0.10, n_reamostras=100)
+
+
+@caso('monte_carlo')
+def _monte_carlo(ctx):
+    from nuvem import simular_nuvem
+    mu, sigma = ctx['estatisticas']
+    return lambda: simular_nuvem(mu, sigma, 0.0, n_portfolios=30000)
+
+
+@caso('risco_lote')
+def _risco_lote(ctx):
+    from nuvem import simular_nuvem
+    from risco import avaliar_carteiras
+    retornos, ret_mean, cov_matrix = ctx['estatisticas_pd']
+    # VaR/CVaR, drawdown e Sortino de 5000 carteiras da nuvem sobre o histórico inteiro
+    pesos = simular_nuvem(ret_mean, cov_matrix, 0.0, n_portfolios=5000, guardar_pesos=True)[3]
+    return lambda: avaliar_carteiras(retornos, pesos)
+
+
+@caso('paginas')
+def _paginas(ctx):
+    from generate_pages import thumbnail, write_lod
+    precos = ctx['precos']
+    days = precos.index.values.astype('datetime64[D]').astype(np.int64)
+    destino = os.path.join(ctx['trabalho'], 'lod')
+
+    # Pirâmide LOD + miniatura LTTB de cada ativo (o trabalho por ativo do site)
+    def gerar():
+        for coluna in precos.columns:
+            values = precos[coluna].to_numpy()
+            write_lod(os.path.join(destino, coluna), days, values)
+            thumbnail(days, values)
+    return gerar
+
+
+@caso('site')
+def _site(ctx):
+    import generate_pages
+    from painel import carregar_painel
+    # Build completo do site (páginas HTML, config.js, pirâmides LOD e
+    # miniaturas) com um ativo por coluna do painel do universo, numa pasta temporária
+    destino = os.path.join(ctx['trabalho'], 'site')
+    painel = carregar_painel(ctx['universo'])
+    assets = [{'id': coluna, 'nome': coluna, 'name': coluna.upper(), 'region': 'EUA',
+               'category': 'Renda Variável', 'path': f"../{painel.caminhos[coluna]}"}
+              for coluna in painel.colunas]
+    caminhos = {
+        'PAGES_DIR': os.path.join(destino, 'pages'),
+        'CONFIG_JS': os.path.join(destino, 'js', 'config.js'),
+        'LOD_DIR': os.path.join(destino, 'lod'),
+        'THUMBNAIL_DIR': os.path.join(destino, 'miniaturas'),
+        'STATE_PATH': os.path.join(destino, '.build', 'state.json'),
+    }
+
+    def gerar():
+        # Saídas redirecionadas só durante a medida (o site real não é tocado)
+        originais = {nome: getattr(generate_pages, nome) for nome in caminhos}
+        for nome, valor in caminhos.items():
+            setattr(generate_pages, nome, valor)
+        try:
+            generate_pages.build(assets, force=True, painel=painel)
+        finally:
+            for nome, valor in originais.items():
+                setattr(generate_pages, nome, valor)
+    return gerar
+
+
+# --- Execução ---
+
+def contexto(n_ativos, anos, seed, trabalho):
+    from alocacao import estatisticas_retornos
+    universo = os.path.join(PASTA_UNIVERSOS, f"{n_ativos}x{anos}_s{seed}")
+    escrever_universo(universo, n_ativos, anos, seed)
+    precos = gerar_precos(n_ativos, anos, seed, completo=True)
+    retornos = np.log(precos).diff().dropna()
+    estat = (retornos,) + estatisticas_retornos(retornos)
+    return {
+        'universo': universo,
+        'trabalho': trabalho,
+        'precos': precos,
+        'retornos': retornos,
+        'estatisticas_pd': estat,
+        'estatisticas': (estat[1].to_numpy(), estat[2].to_numpy()),
+    }
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'min_s': min(tempos),
+        'mediana_s': float(np.median(tempos)),
+        'repeticoes': repeticoes,
+        'pico_memoria_mb': pico / 2**20,
+    }
+
+
+def versao_git():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        sujo = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'sem_git', False
+    return commit, bool(sujo)
+
+
+def rodar(casos, n_ativos, anos, seed=0, repeticoes=3):
+    commit, sujo = versao_git()
+    trabalho = tempfile.mkdtemp(prefix='baroque_bench_')
+    try:
+        print(f"Universo sintético: {n_ativos} ativos x {anos} anos (seed {seed})")
+        ctx = contexto(n_ativos, anos, seed, trabalho)
+        resultados = {}
+        for nome in casos:
+            funcao = CASOS[nome](ctx)
+            resultados[nome] = medir(funcao, repeticoes)
+            r = resultados[nome]
+            print(f"  {nome:<22} {r['min_s'] * 1000:10.1f} ms (mediana {r['mediana_s'] * 1000:.1f})"
+                  f"  pico {r['pico_memoria_mb']:8.1f} MB")
+    finally:
+        shutil.rmtree(trabalho, ignore_errors=True)
+
+    return {
+        'commit': commit,
+        'alteracoes_locais': sujo,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'universo': {'ativos': n_ativos, 'anos': anos, 'seed': seed},
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'casos': resultados,
+    }
+
+
+def salvar(relatorio, pasta=PASTA_RESULTADOS):
+    os.makedirs(pasta, exist_ok=True)
+    u = relatorio['universo']
+    sufixo = '_sujo' if relatorio['alteracoes_locais'] else ''
+    carimbo = relatorio['data'].replace('-', '').replace(':', '').replace('T', '_')
+    nome = f"{carimbo}_{relatorio['commit']}{sufixo}_{u['ativos']}x{u['anos']}.json"
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=1)
+    return caminho
+
+
+def comparar(base, novo):
+    # Tabela caso a caso: tempo mínimo e pico de memória, novo / base
+    with open(base, encoding='utf-8') as f:
+        a = json.load(f)
+    with open(novo, encoding='utf-8') as f:
+        b = json.load(f)
+    if a['universo'] != b['universo']:
+        print(f"Aviso: universos diferentes ({a['universo']} x {b['universo']})")
+    print(f"{'caso':<22} {a['commit']:>10} {b['commit']:>10} {'tempo':>8} {'memória':>8}")
+    for nome in a['casos']:
+        if nome not in b['casos']:
+            continue
+        ra, rb = a['casos'][nome], b['casos'][nome]
+        razao_t = rb['min_s'] / ra['min_s'] if ra['min_s'] else float('nan')
+        razao_m = rb['pico_memoria_mb'] / ra['pico_memoria_mb'] if ra['pico_memoria_mb'] else float('nan')
+        print(f"{nome:<22} {ra['min_s'] * 1000:8.1f}ms {rb['min_s'] * 1000:8.1f}ms "
+              f"{razao_t:7.2f}x {razao_m:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks offline sobre um universo sintético")
+    parser.add_argument("--tamanho", choices=sorted(TAMANHOS), default='atual', help="universo pré-definido")
+    parser.add_argument("--ativos", type=int, help="número de ativos (sobrepõe --tamanho)")
+    parser.add_argument("--anos", type=int, help="anos de cotações diárias (sobrepõe --tamanho)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--sem-salvar", action="store_true", help="só imprime, não grava o JSON")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NOVO"), help="compara dois resultados")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        sys.exit(0)
+
+    n_ativos, anos = TAMANHOS[args.tamanho]
+    relatorio = rodar(args.casos, args.ativos or n_ativos, args.anos or anos, args.seed, args.repeticoes)
+    if not args.sem_salvar:
+        print(f"Resultados em {salvar(relatorio)}")
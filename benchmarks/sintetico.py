@@ -0,0 +1,55 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Universo sintético de preços para os benchmarks (sem rede).
+# Retornos diários de um modelo de fatores (k fatores comuns + ruído
+# idiossincrático), preços = 100·exp(Σ retornos) em dias úteis. Uma fração dos
+# ativos começa mais tarde e alguns dias são removidos ao acaso, como nos
+# CSVs reais, para exercitar o alinhamento do painel (união de datas).
+# Determinístico para um mesmo (n_ativos, anos, seed).
+
+N_FATORES = 5
+INICIO = '1995-01-02'
+
+
+def gerar_precos(n_ativos=20, anos=20, seed=0, completo=True):
+    # DataFrame (datas x ativos); completo=False aplica inícios tardios e lacunas
+    rng = np.random.default_rng(seed)
+    datas = pd.bdate_range(INICIO, periods=int(anos * 252), name='Date')
+    T = len(datas)
+
+    betas = rng.normal(0.0, 1.0, (N_FATORES, n_ativos)) * 0.006
+    fatores = rng.standard_normal((T, N_FATORES))
+    idio = rng.standard_normal((T, n_ativos)) * rng.uniform(0.004, 0.02, n_ativos)
+    drift = rng.uniform(-0.0001, 0.0006, n_ativos)
+    retornos = drift + fatores @ betas + idio
+
+    precos = 100.0 * np.exp(np.cumsum(retornos, axis=0))
+    if not completo:
+        # 25% dos ativos começam em algum ponto da primeira metade do período
+        tardios = rng.random(n_ativos) < 0.25
+        inicios = np.where(tardios, rng.integers(0, T // 2, n_ativos), 0)
+        precos[np.arange(T)[:, None] < inicios[None, :]] = np.nan
+        # ~1% de dias sem cotação por ativo
+        precos[rng.random((T, n_ativos)) < 0.01] = np.nan
+
+    colunas = [f"sint_{i:04d}" for i in range(n_ativos)]
+    return pd.DataFrame(precos, index=datas, columns=colunas)
+
+
+def escrever_universo(pasta, n_ativos=20, anos=20, seed=0):
+    # Um CSV por ativo (Date,<rótulo>), no mesmo formato de dados/<classe>/...
+    # Se a pasta já tem o universo completo, não reescreve.
+    precos = gerar_precos(n_ativos, anos, seed, completo=False)
+    destino = os.path.join(pasta, 'renda_variavel', 'SINT')
+    os.makedirs(destino, exist_ok=True)
+    for coluna in precos.columns:
+        caminho = os.path.join(destino, f"{coluna}.csv")
+        if os.path.exists(caminho):
+            continue
+        serie = precos[coluna].dropna()
+        tmp = caminho + '.tmp'
+        serie.to_frame(coluna.upper()).to_csv(tmp, float_format='%.6f')
+        os.replace(tmp, caminho)
+    return precos
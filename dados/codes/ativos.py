@@ -0,0 +1,81 @@
+# Registry of the assets stored under dados/
+# nome: CSV file name (without .csv) | ticker: provider symbol
+# pasta: folder relative to dados/  | provedor: key in provedores.PROVEDORES
+# moeda: quote currency of the source prices (default BRL)
+# cambio: for FX series, the currency they price in BRL (e.g. BRL=X -> "USD")
+# tipo: "preco" (default) or "taxa" for rate series (checks in qualidade.py)
+# id, titulo, regiao, categoria: page id, display name and grouping on the site
+# (generate_pages.py builds the pages, js/config.js and dados/web from this list)
+
+ATIVOS = [
+    # 1. US Govt Bonds
+    {"nome": "us_treasury_bond_20y_TLT", "id": "us_treasury_20", "titulo": "US Treasury Bond 20y (TLT)", "regiao": "EUA", "categoria": "Renda Fixa",
+     "ticker": "TLT", "pasta": "renda_fixa/US", "provedor": "yahoo", "moeda": "USD"},
+    {"nome": "us_treasury_bond_7_10y_IEF", "id": "us_treasury_7_10", "titulo": "US Treasury Bond 7-10y (IEF)", "regiao": "EUA", "categoria": "Renda Fixa",
+     "ticker": "IEF", "pasta": "renda_fixa/US", "provedor": "yahoo", "moeda": "USD"},
+    {"nome": "us_treasury_bond_1_3y_SHY", "id": "us_treasury_1_3", "titulo": "US Treasury Bond 1-3y (SHY)", "regiao": "EUA", "categoria": "Renda Fixa",
+     "ticker": "SHY", "pasta": "renda_fixa/US", "provedor": "yahoo", "moeda": "USD"},
+
+    # 2. US Corporate Bonds (Private Credit)
+    {"nome": "us_corp_bond_inv_grade_LQD", "id": "us_corp_inv", "titulo": "US Corp Bond Inv Grade (LQD)", "regiao": "EUA", "categoria": "Renda Fixa",
+     "ticker": "LQD", "pasta": "renda_fixa/US", "provedor": "yahoo", "moeda": "USD"},
+    {"nome": "us_corp_bond_high_yield_HYG", "id": "us_corp_high", "titulo": "US Corp Bond High Yield (HYG)", "regiao": "EUA", "categoria": "Renda Fixa",
+     "ticker": "HYG", "pasta": "renda_fixa/US", "provedor": "yahoo", "moeda": "USD"},
+
+    # 3. Currency
+    {"nome": "usd_brl_currency", "id": "usd_brl", "titulo": "USD/BRL", "regiao": "Brasil", "categoria": "Cotações",
+     "ticker": "BRL=X", "pasta": "cotacao", "provedor": "yahoo", "cambio": "USD"},
+    {"nome": "eur_brl_currency", "id": "eur_brl", "titulo": "EUR/BRL", "regiao": "Brasil", "categoria": "Cotações",
+     "ticker": "EURBRL=X", "pasta": "cotacao", "provedor": "yahoo", "cambio": "EUR"},
+
+    # 4. BR Govt Bonds (Proxies via ETF)
+    {"nome": "br_gov_inflation_IMAB11", "id": "br_gov_inf", "titulo": "BR Gov Inflation (IMAB11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "IMAB11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+    {"nome": "br_gov_fixed_rate_IRFM11", "id": "br_gov_fixed", "titulo": "BR Gov Fixed Rate (IRFM11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "IRFM11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+
+    # 5. BR Private Credit - Debentures
+    # DEBB11 is generic debetures, KDIF11 is infrastructure
+    {"nome": "br_debentures_DEBB11", "id": "br_deb", "titulo": "BR Debêntures (DEBB11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "DEBB11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+    {"nome": "br_debentures_infra_KDIF11", "id": "br_deb_infra", "titulo": "BR Debêntures Infra (KDIF11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "KDIF11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+
+    # 6. BR Private Credit - CRI/CRA
+    # Using KNCR11 (Kinea Rendimentos Imobiliarios - mostly CDI) as a proxy for high grade private credit in Real Estate
+    {"nome": "br_cri_proxy_KNCR11", "id": "br_cri_proxy", "titulo": "BR CRI Proxy (KNCR11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "KNCR11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+    {"nome": "br_cri_inflation_proxy_CPTS11", "id": "br_cri_inf", "titulo": "BR CRI Inflation Proxy (CPTS11)", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "CPTS11.SA", "pasta": "renda_fixa/BR", "provedor": "yahoo"},
+
+    # 7. Selic meta (% a.a.) - BCB SGS series 432
+    {"nome": "selic_historica", "id": "selic", "titulo": "Selic Histórica", "regiao": "Brasil", "categoria": "Renda Fixa",
+     "ticker": "432", "pasta": "renda_fixa/BR", "provedor": "sgs",
+     "indice": "date", "coluna": "selic_meta_aa", "tipo": "taxa"},
+
+    # 8. Metais
+    {"nome": "gold_ouro", "id": "gold", "titulo": "Ouro (Gold)", "regiao": "Ativos Não Tradicionais", "categoria": "Metais",
+     "ticker": "GC=F", "pasta": "metais", "provedor": "yahoo", "moeda": "USD"},
+    {"nome": "silver_prata", "id": "silver", "titulo": "Prata (Silver)", "regiao": "Ativos Não Tradicionais", "categoria": "Metais",
+     "ticker": "SI=F", "pasta": "metais", "provedor": "yahoo", "moeda": "USD"},
+
+    # 9. Stable coins
+    {"nome": "stable_usdt", "id": "usdt", "titulo": "Stablecoin (USDT)", "regiao": "Ativos Não Tradicionais", "categoria": "Cripto",
+     "ticker": "USDT-USD", "pasta": "ativos_nao_tradicionais/CRIPTO", "provedor": "yahoo", "moeda": "USD"},
+
+    # 10. Equity ETFs
+    {"nome": "us_sp500_SPY", "id": "sp500", "titulo": "US S&P 500 (SPY)", "regiao": "EUA", "categoria": "Renda Variável",
+     "ticker": "SPY", "pasta": "renda_variavel/US", "provedor": "yahoo", "moeda": "USD"},
+    {"nome": "br_ibovespa_BOVA11", "id": "ibovespa", "titulo": "BR Ibovespa (BOVA11)", "regiao": "Brasil", "categoria": "Renda Variável",
+     "ticker": "BOVA11.SA", "pasta": "renda_variavel/BR", "provedor": "yahoo"},
+
+    # 11. Art Market Proxy (Artnet AG - Francfurt)
+    # Using 'AYD.F' as a proxy for the Art Market industry
+    {"nome": "art_index_artnet", "id": "art", "titulo": "Art Index (Artnet)", "regiao": "Ativos Não Tradicionais", "categoria": "Arte",
+     "ticker": "AYD.F", "pasta": "ativos_nao_tradicionais/ARTE", "provedor": "yahoo", "moeda": "EUR"},
+]
+
+ATIVOS_POR_NOME = {a["nome"]: a for a in ATIVOS}
+
+# {currency: FX series name}, e.g. {"USD": "usd_brl_currency"}
+CAMBIOS = {a["cambio"]: a["nome"] for a in ATIVOS if "cambio" in a}
@@ -0,0 +1,94 @@
+import time
+import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from provedores import com_retentativas
+
+# Concurrent batched fetch engine
+# Requests are grouped by provider and cut into batches of up to
+# provider.tamanho_lote tickers. In incremental mode every ticker has its own
+# start (last stored date), so a batch asks from its earliest start and each
+# series is trimmed back to its own start afterwards. Batches run on a bounded
+# thread pool, each one paced by its provider's rate limit and retried with
+# backoff, so a full refresh takes about as long as the slowest request
+# instead of the sum of all.
+
+
+class Tarefa:
+    def __init__(self, nome, ticker, provedor, inicio=None):
+        self.nome = nome
+        self.ticker = ticker
+        self.provedor = provedor
+        self.inicio = inicio
+
+
+def _ordem_inicio(tarefa):
+    # Full-history requests (start None) first, then by start date
+    return (tarefa.inicio is not None, pd.Timestamp(tarefa.inicio) if tarefa.inicio is not None else pd.Timestamp.min)
+
+
+def agrupar_lotes(tarefas, provedores):
+    # {provider: [tasks]} -> list of (provider, start, [tasks]) batches.
+    # Tasks are sorted by start so a batch mixes similar starts; its start is
+    # the earliest one (None = full history if any task needs it)
+    grupos = defaultdict(list)
+    for tarefa in tarefas:
+        grupos[tarefa.provedor].append(tarefa)
+
+    lotes = []
+    for chave, grupo in grupos.items():
+        grupo = sorted(grupo, key=_ordem_inicio)
+        tamanho = max(1, provedores[chave].tamanho_lote)
+        for i in range(0, len(grupo), tamanho):
+            lote = grupo[i:i + tamanho]
+            lotes.append((chave, lote[0].inicio, lote))
+    return lotes
+
+
+def _recortar(serie, inicio):
+    # Drop what the batch fetched before this ticker's own start
+    if serie is None or inicio is None:
+        return serie
+    return serie[serie.index >= pd.Timestamp(inicio)]
+
+
+def _executar_lote(provedor, inicio, tarefas, tentativas):
+    tickers = [t.ticker for t in tarefas]
+
+    def chamada():
+        if not provedor.limite_por_requisicao:
+            provedor.limite.aguardar()
+        return provedor.baixar_lote(tickers, inicio)
+
+    return com_retentativas(chamada, tentativas=tentativas)
+
+
+def coletar(tarefas, provedores, max_workers=4, tentativas=4):
+    # Returns ({nome: pd.Series}, {nome: exception}, stats)
+    lotes = agrupar_lotes(tarefas, provedores)
+    resultados, erros = {}, {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futuros = {
+            pool.submit(_executar_lote, provedores[chave], inicio, grupo, tentativas): grupo
+            for chave, inicio, grupo in lotes
+        }
+        for futuro in as_completed(futuros):
+            grupo = futuros[futuro]
+            try:
+                por_ticker = futuro.result()
+            except Exception as e:
+                for tarefa in grupo:
+                    erros[tarefa.nome] = e
+                continue
+            for tarefa in grupo:
+                resultados[tarefa.nome] = _recortar(por_ticker.get(tarefa.ticker), tarefa.inicio)
+
+    stats = {
+        "tarefas": len(tarefas),
+        "lotes": len(lotes),
+        "erros": len(erros),
+        "segundos": round(time.perf_counter() - t0, 3),
+    }
+    return resultados, erros, stats
@@ -1,109 +1,130 @@
-
+import numpy as np
 import pandas as pd
+import argparse
+import json
 import os
+from ativos import ATIVOS_POR_NOME, CAMBIOS
+from painel import DADOS_DIR, BRL_DIR, carregar_painel
+import instrumentacao
+
+# BRL layer
+# Source CSVs under dados/ keep the prices in their quote currency and are
+# never rewritten. This script writes a separate copy of every asset in BRL
+# under dados/brl/ (same relative paths), so running it twice is harmless.
+# Price_BRL = Price_Origin * Rate_Origin_BRL, for the whole aligned panel in
+# one vectorized product. BRL assets are copied with a rate of 1.
+# A manifest of input hashes (asset + FX series) skips unchanged assets.
 
 # Caminhos
-base_path = "/home/usuario/Downloads/Documentos/baroque/markowitz/dados"
-
-# Currency Files
-currencies = {
-    "USD": os.path.join(base_path, "cotacao/usd_brl_currency.csv"),
-    "EUR": os.path.join(base_path, "cotacao/eur_brl_currency.csv")
-}
-
-# Configuration: Which folder uses which currency
-conversion_tasks = [
-    {"folder": os.path.join(base_path, "renda_fixa/US"), "currency": "USD"},
-    {"folder": os.path.join(base_path, "renda_variavel/US"), "currency": "USD"},
-    {"folder": os.path.join(base_path, "metais"), "currency": "USD"},
-    {"folder": os.path.join(base_path, "ativos_nao_tradicionais/CRIPTO"), "currency": "USD"},
-    {"folder": os.path.join(base_path, "ativos_nao_tradicionais/ARTE"), "currency": "EUR"},
-]
-
-def load_currency(path):
+base_path = DADOS_DIR
+brl_path = BRL_DIR
+manifest_path = os.path.join(brl_path, "conversao.json")
+
+def quote_currency(column):
+    # Currency comes from the registry (ativos.py); unknown assets are BRL
+    return ATIVOS_POR_NOME.get(column, {}).get("moeda", "BRL")
+
+def load_manifest(path=manifest_path):
     if not os.path.exists(path):
-        raise FileNotFoundError(f"Arquivo de cotação não encontrado: {path}")
-    
-    # Load currency
-    # Assumes Date is index (col 0) and the rate is the first data column
-    df = pd.read_csv(path, index_col=0, parse_dates=True)
-    # Return the series
-    return df.iloc[:, 0]
-
-def convert_and_save():
-    print("Iniciando conversão para BRL...")
-    
-    # Pre-load currencies
-    loaded_currencies = {}
-    for code, path in currencies.items():
-        try:
-            loaded_currencies[code] = load_currency(path)
-            print(f"Cotação {code} carregada de: {path}")
-        except Exception as e:
-            print(f"Erro ao carregar cotação {code}: {e}")
-
-    for task in conversion_tasks:
-        folder = task["folder"]
-        curr_code = task["currency"]
-        
-        if curr_code not in loaded_currencies:
-            print(f"[SKIP] Cotação {curr_code} não disponível para pasta {folder}")
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=manifest_path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def plan_conversion(painel, manifest, force=False):
+    # Returns {column: fingerprint} for the assets whose inputs changed
+    pending = {}
+    for column in painel.colunas:
+        currency = quote_currency(column)
+        fx_column = CAMBIOS.get(currency)
+        if currency != "BRL" and fx_column not in painel.colunas:
+            print(f"[SKIP] Cotação {currency} não disponível para {column}")
             continue
 
-        currency_series = loaded_currencies[curr_code]
+        fingerprint = {
+            "moeda": currency,
+            "origem": painel.fontes[column]["sha256"],
+            "cambio": painel.fontes[fx_column]["sha256"] if currency != "BRL" else None,
+        }
+        output = os.path.join(brl_path, painel.caminhos[column])
+        if not force and manifest.get(column) == fingerprint and os.path.exists(output):
+            continue
+        pending[column] = fingerprint
+    return pending
+
+def convert_panel(painel, columns):
+    # One (dates x assets) product: prices * matching FX column (1.0 for BRL).
+    # Dates without a rate become NaN (same as the old inner join).
+    positions = np.array([painel.posicao(c) for c in columns])
+    fx_positions = np.array([
+        painel.posicao(CAMBIOS[quote_currency(c)]) if quote_currency(c) != "BRL" else -1
+        for c in columns
+    ])
+    prices = np.asarray(painel.valores[:, positions])
+    rates = np.where(fx_positions >= 0, np.asarray(painel.valores[:, np.maximum(fx_positions, 0)]), 1.0)
+    return prices * rates
+
+def write_outputs(painel, columns, values_brl, dates, pending, manifest):
+    for j, column in enumerate(columns):
+        file_path = os.path.join(brl_path, painel.caminhos[column])
+        print(f"  Convertendo {painel.caminhos[column]} ({pending[column]['moeda']} -> BRL)...", end=" ")
 
-        if not os.path.exists(folder):
-            print(f"Pasta não encontrada: {folder}")
+        series = pd.Series(values_brl[:, j], index=dates).dropna()
+        if series.empty:
+            print("Vazio (ignorado).")
             continue
-            
-        print(f"Processando pasta: {folder} ({curr_code} -> BRL)")
-        files = os.listdir(folder)
-        
-        for file in files:
-            if not file.endswith(".csv"):
-                continue
-            
-            # Skip currency files if they happen to be there
-            if "currency" in file:
-                continue
-                
-            file_path = os.path.join(folder, file)
-            print(f"  Convertendo {file}...", end=" ")
-            
-            try:
-                # Read Asset
-                df_asset = pd.read_csv(file_path, index_col=0, parse_dates=True)
-                if df_asset.empty:
-                    print("Vazio (ignorado).")
-                    continue
-                
-                # Align dates (Join)
-                # We want asset prices in BRL.
-                # Price_BRL = Price_Origin * Rate_Origin_BRL
-                
-                # Access the first column of the asset
-                asset_col_name = df_asset.columns[0]
-                asset_series = df_asset.iloc[:, 0]
-                
-                # Join
-                combined = pd.concat([asset_series, currency_series], axis=1, join='inner')
-                combined.columns = ['Asset_Origin', 'Rate']
-                
-                # Calc
-                combined['Asset_BRL'] = combined['Asset_Origin'] * combined['Rate']
-                
-                # Create result dataframe to save (keep original structure)
-                df_result = combined[['Asset_BRL']]
-                df_result.columns = [asset_col_name] 
-                
-                # Save
-                df_result.to_csv(file_path)
-                print("OK.")
-                
-            except Exception as e:
-                print(f"ERRO: {e}")
-
-    print("Conversão concluída.")
+
+        # Keep original structure (same header as the source file)
+        df_result = series.to_frame(painel.rotulos[column])
+        df_result.index.name = painel.fontes[column].get("indice", "Date")
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp = file_path + ".tmp"
+        df_result.to_csv(tmp)
+        os.replace(tmp, file_path)
+        manifest[column] = pending[column]
+        instrumentacao.contar("arquivos_gravados")
+        print("OK.")
+
+def convert_and_save(force=False):
+    print("Iniciando conversão para BRL...")
+
+    # Prices and currencies come from the aligned panel (dados/painel),
+    # so every asset shares the same date index as the FX series.
+    with instrumentacao.etapa("carregar_painel"):
+        painel = carregar_painel(base_path)
+    manifest = load_manifest()
+
+    with instrumentacao.etapa("planejar"):
+        pending = plan_conversion(painel, manifest, force)
+    skipped = len(painel.colunas) - len(pending)
+    # Manifest hits: assets whose inputs did not change
+    instrumentacao.cache("conversao", acertos=skipped, faltas=len(pending))
+    if not pending:
+        print(f"Nada a converter ({skipped} ativos inalterados).")
+        return
+
+    columns = list(pending)
+    with instrumentacao.etapa("converter"):
+        values_brl = convert_panel(painel, columns)
+    dates = pd.DatetimeIndex(painel.datas)
+
+    with instrumentacao.etapa("gravar"):
+        write_outputs(painel, columns, values_brl, dates, pending, manifest)
+
+    os.makedirs(brl_path, exist_ok=True)
+    save_manifest(manifest)
+    print(f"Conversão concluída ({len(columns)} convertidos, {skipped} inalterados).")
 
 if __name__ == "__main__":
-    convert_and_save()
+    parser = argparse.ArgumentParser(description="Gera a camada BRL em dados/brl/")
+    parser.add_argument("--force", action="store_true", help="reconverte todos os ativos")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    with instrumentacao.sessao("conversao", args.metricas, args.perfil):
+        convert_and_save(args.force)
@@ -1,139 +1,170 @@
-
-import yfinance as yf
 import pandas as pd
+import argparse
+import json
 import os
+from datetime import datetime
+from ativos import ATIVOS
+from coleta import Tarefa, coletar
+from provedores import PROVEDORES, ProvedorLocal
+import instrumentacao
+import qualidade
 
 # Define output directories
-base_path = "/home/usuario/Downloads/Documentos/baroque/markowitz/dados"
-us_fixed_path = os.path.join(base_path, "renda_fixa/US")
-br_fixed_path = os.path.join(base_path, "renda_fixa/BR")
-us_var_path = os.path.join(base_path, "renda_variavel/US")
-br_var_path = os.path.join(base_path, "renda_variavel/BR")
-metais_path = os.path.join(base_path, "metais")
-ant_path = os.path.join(base_path, "ativos_nao_tradicionais")
-art_path = os.path.join(ant_path, "ARTE")
-cripto_path = os.path.join(ant_path, "CRIPTO")
-cotacao_path = os.path.join(base_path, "cotacao")
-
-# Create directories if they don't exist
-os.makedirs(us_fixed_path, exist_ok=True)
-os.makedirs(br_fixed_path, exist_ok=True)
-os.makedirs(us_var_path, exist_ok=True)
-os.makedirs(br_var_path, exist_ok=True)
-os.makedirs(metais_path, exist_ok=True)
-os.makedirs(ant_path, exist_ok=True)
-os.makedirs(art_path, exist_ok=True)
-os.makedirs(cripto_path, exist_ok=True)
-os.makedirs(cotacao_path, exist_ok=True)
-
-# Define assets to download
-# (Key: Filename, Value: Ticker)
-assets = {
-    # 1. US Govt Bonds
-    "us_treasury_bond_20y_TLT": "TLT",
-    "us_treasury_bond_7_10y_IEF": "IEF",
-    "us_treasury_bond_1_3y_SHY": "SHY",
-    
-    # 2. US Corporate Bonds (Private Credit)
-    "us_corp_bond_inv_grade_LQD": "LQD",
-    "us_corp_bond_high_yield_HYG": "HYG",
-    
-    # 3. Currency
-    "usd_brl_currency": "BRL=X",
-    "eur_brl_currency": "EURBRL=X",
-    
-    # 4. BR Govt Bonds (Proxies via ETF)
-    "br_gov_inflation_IMAB11": "IMAB11.SA",
-    "br_gov_fixed_rate_IRFM11": "IRFM11.SA",
-    
-    # 5. BR Private Credit - Debentures
-    # DEBB11 is generic debetures, KDIF11 is infrastructure
-    "br_debentures_DEBB11": "DEBB11.SA",
-    "br_debentures_infra_KDIF11": "KDIF11.SA",
-    
-    # 6. BR Private Credit - CRI/CRA 
-    # Using KNCR11 (Kinea Rendimentos Imobiliarios - mostly CDI) as a proxy for high grade private credit in Real Estate
-    "br_cri_proxy_KNCR11": "KNCR11.SA",
-    "br_cri_inflation_proxy_CPTS11": "CPTS11.SA",
-
-    # 7. Metais
-    "gold_ouro": "GC=F",
-    "silver_prata": "SI=F",
-
-    # 8. Stable coins
-    "stable_usdt": "USDT-USD",
-
-    # 9. Equity ETFs
-    "us_sp500_SPY": "SPY",
-    "br_ibovespa_BOVA11": "BOVA11.SA",
-
-    # 10. Art Market Proxy (Artnet AG - Francfurt)
-    # Using 'AYD.F' as a proxy for the Art Market industry
-    "art_index_artnet": "AYD.F"
-}
-
-print("Iniciando downloads...")
-
-for name, ticker in assets.items():
-    # Determine Folder
-    if "us_treasury" in name or "us_corp" in name:
-        folder = us_fixed_path
-    elif "br_gov" in name or "br_debentures" in name or "br_cri" in name:
-        folder = br_fixed_path
-    elif "usd_brl" in name or "eur_brl" in name:
-        folder = cotacao_path
-    elif "us_sp500" in name:
-        folder = us_var_path
-    elif "br_ibovespa" in name:
-        folder = br_var_path
-    elif "gold" in name or "silver" in name:
-        folder = metais_path
-    elif "stable" in name:
-        folder = cripto_path
-    elif "art_index" in name:
-        folder = art_path
-    else:
-        folder = base_path
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Per-asset sync state (last stored date, rows, last run)
+sync_state_path = os.path.join(base_path, "sync_state.json")
 
-    file_path = os.path.join(folder, f"{name}.csv")
+def get_file_path(asset):
+    # Folder comes from the registry (ativos.py)
+    return os.path.join(base_path, asset["pasta"], f"{asset['nome']}.csv")
 
-    if os.path.exists(file_path):
-        print(f"Pilhando {ticker} -> {name} (Arquivo já existe em {file_path})")
-        continue
+def load_state(path=sync_state_path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
-    print(f"Baixando {ticker} -> {name}...")
+def write_atomic(path, write):
+    # Write to a temp file in the same folder, then rename over the target.
+    # A failed write leaves neither a half file nor the temp behind
+    tmp = path + ".tmp"
     try:
-        # Download max history
-        data = yf.download(ticker, period="max", progress=False)
-        
-        if data.empty:
-            print(f"  [AVISO] Sem dados para {ticker}.")
-            continue
-            
-        # Clean up columns (Handle MultiIndex)
-        # yfinance often returns columns like ('Adj Close', 'TLT')
-        if isinstance(data.columns, pd.MultiIndex):
-            # Prefer Adj Close, fallback to Close
-            if 'Adj Close' in data.columns.get_level_values(0):
-                series = data['Adj Close'][ticker]
-            elif 'Close' in data.columns.get_level_values(0):
-                series = data['Close'][ticker]
-            else:
-                # Fallback: take the first column
-                series = data.iloc[:, 0]
-        else:
-            if 'Adj Close' in data.columns:
-                series = data['Adj Close']
-            elif 'Close' in data.columns:
-                series = data['Close']
-            else:
-                series = data.iloc[:, 0]
-        
-        # Save to CSV
-        series.to_csv(file_path)
-        print(f"  Salvo em: {file_path}")
-        
-    except Exception as e:
-        print(f"  [ERRO] Falha ao baixar {ticker}: {e}")
-
-print("Concluído.")
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def save_state(state, path=sync_state_path):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+    write_atomic(path, write)
+
+def read_existing(file_path):
+    if not os.path.exists(file_path):
+        return None
+    df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+    if df.empty:
+        return None
+    return df.iloc[:, 0]
+
+def merge_series(existing, new, asset=None):
+    # New rows win on overlapping dates (the provider may revise the last close).
+    # Sorting, duplicates inside the download and bad values are left to
+    # qualidade.validar, which records what it drops.
+    if existing is None or existing.empty:
+        # New file: header from the registry, or Date,<ticker>
+        merged = new.rename((asset or {}).get("coluna", new.name))
+        index_name = (asset or {}).get("indice", "Date")
+    else:
+        existing = existing[~existing.index.isin(new.index)]
+        merged = pd.concat([existing, new.rename(existing.name)])
+        index_name = existing.index.name
+    merged.index.name = index_name
+    return merged
+
+def plan_start(existing, mode):
+    # mode: "incremental" fetches only from the last stored date on,
+    #       "full" re-downloads the whole history,
+    #       "skip" keeps the old behaviour (existing files are never touched)
+    if mode == "incremental" and existing is not None:
+        # Re-fetch the last stored day so a revised close replaces it
+        return existing.index.max()
+    return None
+
+def store_asset(asset, existing, series, provider_name, state):
+    file_path = get_file_path(asset)
+    # Validate once here: only the clean, sorted series reaches dados/
+    merged, quarantined, report = qualidade.validar_ativo(asset, merge_series(existing, series, asset))
+    qualidade.registrar(asset["nome"], quarantined, report)
+    if merged.empty:
+        print(f"  [AVISO] Nenhuma linha válida para {asset['ticker']} ({len(quarantined)} em quarentena).")
+        return False
+    added = len(merged) - (0 if existing is None else len(existing))
+
+    # Save to CSV (atomic: readers never see a half-written file)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    write_atomic(file_path, lambda tmp: merged.to_csv(tmp))
+    print(f"  {asset['ticker']} -> {file_path} (+{added} linhas"
+          + (f", {len(quarantined)} em quarentena)" if len(quarantined) else ")"))
+
+    state[asset["nome"]] = {
+        "ticker": asset["ticker"],
+        "provider": provider_name,
+        "last_date": merged.index.max().strftime("%Y-%m-%d"),
+        "rows": int(len(merged)),
+        "rows_added": int(added),
+        "quarantined": int(len(quarantined)),
+        "synced_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return True
+
+def sync_all(providers, mode="incremental", names=None, state_path=sync_state_path, max_workers=4):
+    state = load_state(state_path)
+    selected = [a for a in ATIVOS if not names or a["nome"] in names]
+
+    tasks, existing_by_name = [], {}
+    with instrumentacao.etapa("ler_existentes"):
+        for asset in selected:
+            existing = read_existing(get_file_path(asset))
+            if mode == "skip" and existing is not None:
+                print(f"Pilhando {asset['ticker']} -> {asset['nome']} (Arquivo já existe)")
+                continue
+            start = plan_start(existing, mode)
+            existing_by_name[asset["nome"]] = existing
+            tasks.append(Tarefa(asset["nome"], asset["ticker"], asset["provedor"], start))
+    # Incremental sync: assets with a stored file only fetch the tail
+    instrumentacao.cache("sync_incremental", acertos=sum(t.inicio is not None for t in tasks),
+                         faltas=sum(t.inicio is None for t in tasks))
+
+    print(f"Baixando {len(tasks)} ativos...")
+    with instrumentacao.etapa("coleta"):
+        results, errors, stats = coletar(tasks, providers, max_workers=max_workers)
+    instrumentacao.contar("lotes", stats["lotes"])
+    instrumentacao.contar("erros_download", stats["erros"])
+
+    with instrumentacao.etapa("gravar"):
+        for asset in selected:
+            name = asset["nome"]
+            if name in errors:
+                print(f"  [ERRO] Falha ao baixar {asset['ticker']}: {errors[name]}")
+                continue
+            if name not in existing_by_name:
+                continue
+            series = results.get(name)
+            if series is None or series.empty:
+                print(f"  [AVISO] Sem dados para {asset['ticker']}.")
+                continue
+            if not store_asset(asset, existing_by_name[name], series, providers[asset["provedor"]].nome, state):
+                continue
+            instrumentacao.contar("linhas_novas", state[name]["rows_added"])
+            instrumentacao.contar("linhas_quarentena", state[name]["quarantined"])
+            instrumentacao.contar("arquivos_gravados")
+
+        save_state(state, state_path)
+    print(f"{stats['tarefas']} ativos em {stats['lotes']} lotes, {stats['erros']} erros, {stats['segundos']}s")
+    return state
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Baixa/sincroniza os ativos de dados/")
+    parser.add_argument("--mode", choices=["incremental", "full", "skip"], default="incremental")
+    parser.add_argument("--local", metavar="DIR",
+                        help="usa CSVs locais (<DIR>/<ticker>.csv) em vez de Yahoo/BCB")
+    parser.add_argument("--workers", type=int, default=4, help="requisições simultâneas")
+    parser.add_argument("assets", nargs="*", help="subset of asset names (default: all)")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.local:
+        local = ProvedorLocal(args.local)
+        providers = {key: local for key in PROVEDORES}
+    else:
+        providers = {key: cls() for key, cls in PROVEDORES.items()}
+
+    print("Iniciando downloads...")
+    with instrumentacao.sessao("download_assets", args.metricas, args.perfil):
+        sync_all(providers, args.mode, args.assets, max_workers=args.workers)
+    print("Concluído.")
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+# Instrumentação dos scripts (download, conversão, site, modelo)
+# Um coletor por processo acumula:
+#   etapas    - intervalos cronometrados (aninhados: "pai/filho"), com chamadas,
+#               tempo de parede, tempo de CPU da thread e pico de RSS ao final
+#   contadores- números livres (linhas gravadas, arquivos, cantos do CLA...)
+#   solvers   - por nome: chamadas, iterações e avaliações de objetivo,
+#               restrições e jacobianos de cada minimize (ver otimizacao.py)
+#   caches    - acertos/faltas e taxa de acerto de cada cache
+# e grava tudo em JSON (--metricas ARQ.json). --perfil ARQ.prof envolve a
+# execução no cProfile (abrir com python -m pstats ARQ.prof ou snakeviz).
+# Sem --metricas o custo é só o de time.perf_counter por etapa.
+
+
+def pico_rss_mb():
+    # Pico de memória residente do processo (ru_maxrss: KB no Linux, bytes no macOS)
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+
+
+class Coletor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.inicio = time.perf_counter()
+            self.data = datetime.now().isoformat(timespec="seconds")
+            self.etapas = {}
+            self.contadores = {}
+            self.solvers = {}
+            self.caches = {}
+
+    def _pilha(self):
+        if not hasattr(self._local, "pilha"):
+            self._local.pilha = []
+        return self._local.pilha
+
+    @contextmanager
+    def etapa(self, nome):
+        pilha = self._pilha()
+        pilha.append(nome)
+        caminho = "/".join(pilha)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            segundos, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            pilha.pop()
+            with self._lock:
+                e = self.etapas.setdefault(caminho, {"chamadas": 0, "segundos": 0.0, "cpu_segundos": 0.0})
+                e["chamadas"] += 1
+                e["segundos"] += segundos
+                e["cpu_segundos"] += cpu
+                e["pico_rss_mb"] = pico_rss_mb()
+
+    def contar(self, nome, n=1):
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + n
+
+    def solver(self, nome, res):
+        # res: OptimizeResult (com res.contagem de otimizacao.otimizar, se houver)
+        contagem = getattr(res, "contagem", {})
+        with self._lock:
+            s = self.solvers.setdefault(nome, {"chamadas": 0, "falhas": 0, "nit": 0, "nfev": 0, "njev": 0,
+                                               "objetivo": 0, "restricao": 0, "jacobiano": 0})
+            s["chamadas"] += 1
+            s["falhas"] += 0 if res.success else 1
+            for chave in ("nit", "nfev", "njev"):
+                s[chave] += int(getattr(res, chave, 0) or 0)
+            for chave in ("objetivo", "restricao", "jacobiano"):
+                s[chave] += int(contagem.get(chave, 0))
+
+    def cache(self, nome, acertos=0, faltas=0):
+        with self._lock:
+            c = self.caches.setdefault(nome, {"acertos": 0, "faltas": 0})
+            c["acertos"] += acertos
+            c["faltas"] += faltas
+
+    def relatorio(self, programa=None):
+        with self._lock:
+            caches = {}
+            for nome, c in self.caches.items():
+                total = c["acertos"] + c["faltas"]
+                caches[nome] = {**c, "taxa_acerto": c["acertos"] / total if total else None}
+            return {
+                "programa": programa,
+                "data": self.data,
+                "segundos": time.perf_counter() - self.inicio,
+                "pico_rss_mb": pico_rss_mb(),
+                "ambiente": {"python": platform.python_version(), "plataforma": platform.platform(),
+                             "argv": sys.argv},
+                "etapas": dict(self.etapas),
+                "contadores": dict(self.contadores),
+                "solvers": dict(self.solvers),
+                "caches": caches,
+            }
+
+
+# Coletor do processo; os módulos usam as funções abaixo
+COLETOR = Coletor()
+etapa = COLETOR.etapa
+contar = COLETOR.contar
+solver = COLETOR.solver
+cache = COLETOR.cache
+
+
+def salvar_metricas(caminho, programa=None):
+    relatorio = COLETOR.relatorio(programa)
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=1)
+    os.replace(tmp, caminho)
+    return relatorio
+
+
+def adicionar_argumentos(parser):
+    parser.add_argument("--metricas", metavar="ARQ.json", help="grava etapas, solvers e caches em JSON")
+    parser.add_argument("--perfil", metavar="ARQ.prof", help="roda sob cProfile e grava o dump")
+
+
+@contextmanager
+def sessao(programa, metricas=None, perfil=None):
+    # Envolve a execução de um script: zera o coletor, liga o cProfile se
+    # pedido e grava o JSON no fim (mesmo se a execução falhar)
+    COLETOR.zerar()
+    perfilador = None
+    if perfil:
+        import cProfile
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    try:
+        with etapa(programa):
+            yield COLETOR
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(perfil)
+            print(f"Perfil (cProfile) em {perfil}")
+        if metricas:
+            salvar_metricas(metricas, programa)
+            print(f"Métricas em {metricas}")
@@ -0,0 +1,219 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+
+# Painel consolidado de preços
+# Todos os CSVs de dados/ são lidos uma única vez, alinhados numa grade única
+# de datas (união, NaN onde o ativo não tem cotação) e gravados em formato
+# binário colunar (.npy, ordem Fortran -> cada coluna é contígua em disco).
+# A leitura usa memmap: projeção de colunas e fatias de datas (busca binária,
+# O(log n)) não carregam o resto do arquivo. O painel só é reconstruído quando
+# algum CSV de origem muda (tamanho/mtime e, na dúvida, hash do conteúdo).
+
+DADOS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAINEL_DIR = os.path.join(DADOS_DIR, "painel")
+# Camada derivada com todos os ativos em BRL (gerada por conversao.py)
+BRL_DIR = os.path.join(DADOS_DIR, "brl")
+
+# Pastas de dados/ que não são fontes de preços
+PASTAS_IGNORADAS = {"codes", "painel", "brl", "web", "taxas", "quarentena", "retornos"}
+
+ARQ_DATAS = "datas.npy"
+ARQ_VALORES = "valores.npy"
+ARQ_MANIFESTO = "manifesto.json"
+# Incrementar quando o formato do painel/manifesto mudar (força reconstrução)
+VERSAO = 2
+
+
+def listar_fontes(base_path=DADOS_DIR, ignorar=PASTAS_IGNORADAS):
+    # {nome_do_arquivo_sem_extensao: caminho}, em ordem determinística
+    fontes = {}
+    for raiz, pastas, arquivos in os.walk(base_path):
+        pastas[:] = sorted(p for p in pastas if p not in ignorar)
+        for arquivo in sorted(arquivos):
+            if arquivo.endswith(".csv"):
+                fontes[arquivo[:-4]] = os.path.join(raiz, arquivo)
+    return fontes
+
+
+def hash_arquivo(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _assinatura(path):
+    st = os.stat(path)
+    return {"tamanho": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _ler_manifesto(destino):
+    path = os.path.join(destino, ARQ_MANIFESTO)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _gravar_atomico(path, escrever):
+    tmp = path + ".tmp"
+    escrever(tmp)
+    os.replace(tmp, path)
+
+
+def _salvar_npy(path, array):
+    # np.save com caminho acrescenta ".npy" ao nome temporário; com arquivo aberto, não
+    with open(path, "wb") as f:
+        np.save(f, array)
+
+
+def _salvar_json(path, dados):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=1)
+
+
+def painel_desatualizado(base_path=DADOS_DIR, destino=None, dtype=np.float64):
+    destino = destino or os.path.join(base_path, "painel")
+    manifesto = _ler_manifesto(destino)
+    if manifesto is None or manifesto.get("versao") != VERSAO or manifesto.get("dtype") != np.dtype(dtype).name:
+        return True
+    fontes = listar_fontes(base_path)
+    registradas = manifesto["fontes"]
+    if set(fontes) != set(registradas):
+        return True
+    tocadas = False
+    for nome, path in fontes.items():
+        reg = registradas[nome]
+        assinatura = _assinatura(path)
+        if assinatura == {"tamanho": reg["tamanho"], "mtime_ns": reg["mtime_ns"]}:
+            continue
+        # mtime mudou (ex: checkout do git): só reconstrói se o conteúdo mudou
+        if hash_arquivo(path) != reg["sha256"]:
+            return True
+        reg.update(assinatura)
+        tocadas = True
+    if tocadas:
+        # Conteúdo igual: guarda a nova assinatura para não recalcular o hash
+        _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO),
+                        lambda p: _salvar_json(p, manifesto))
+    return False
+
+
+def _ler_csv(path):
+    df = pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index, errors="coerce")
+    serie = pd.to_numeric(df.iloc[:, 0], errors="coerce") if df.shape[1] else pd.Series(dtype=float)
+    serie = serie[serie.index.notna()]
+    # Datas repetidas: mantém a última cotação
+    serie = serie[~serie.index.duplicated(keep="last")].sort_index()
+    rotulo = df.columns[0] if df.shape[1] else ""
+    return serie, rotulo, df.index.name or "Date"
+
+
+def construir_painel(base_path=DADOS_DIR, destino=None, dtype=np.float64):
+    destino = destino or os.path.join(base_path, "painel")
+    fontes = listar_fontes(base_path)
+    series, rotulos, registro = [], [], {}
+    for nome, path in fontes.items():
+        serie, rotulo, indice = _ler_csv(path)
+        series.append(serie.rename(nome))
+        rotulos.append(rotulo)
+        registro[nome] = {
+            "caminho": os.path.relpath(path, base_path).replace(os.sep, "/"),
+            "indice": indice,
+            "sha256": hash_arquivo(path),
+            **_assinatura(path),
+        }
+
+    df = pd.concat(series, axis=1, join="outer").sort_index() if series else pd.DataFrame()
+    datas = df.index.values.astype("datetime64[D]")
+    valores = np.asfortranarray(df.to_numpy(dtype=dtype))
+
+    os.makedirs(destino, exist_ok=True)
+    _gravar_atomico(os.path.join(destino, ARQ_DATAS), lambda p: _salvar_npy(p, datas))
+    _gravar_atomico(os.path.join(destino, ARQ_VALORES), lambda p: _salvar_npy(p, valores))
+
+    manifesto = {
+        "versao": VERSAO,
+        "colunas": list(fontes),
+        "rotulos": rotulos,
+        "dtype": np.dtype(dtype).name,
+        "linhas": int(len(datas)),
+        "fontes": registro,
+    }
+
+    # Manifesto por último: um painel só é válido depois que ele existe
+    _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO), lambda p: _salvar_json(p, manifesto))
+    return manifesto
+
+
+class Painel:
+    def __init__(self, datas, valores, colunas, rotulos, fontes):
+        # fontes: {coluna: entrada do manifesto (caminho, indice, sha256, ...)}
+        self.datas = datas
+        self.valores = valores
+        self.colunas = list(colunas)
+        self.rotulos = dict(zip(colunas, rotulos))
+        self.fontes = fontes
+        self.caminhos = {c: fontes[c]["caminho"] for c in self.colunas}
+        self._pos = {c: i for i, c in enumerate(self.colunas)}
+
+    def posicao(self, nome):
+        return self._pos[nome]
+
+    def _intervalo(self, inicio=None, fim=None):
+        # Busca binária na grade de datas ordenada
+        i0 = 0 if inicio is None else np.searchsorted(self.datas, np.datetime64(inicio, "D"), side="left")
+        i1 = len(self.datas) if fim is None else np.searchsorted(self.datas, np.datetime64(fim, "D"), side="right")
+        return i0, i1
+
+    def janela(self, inicio=None, fim=None):
+        # Fatia de datas sem cópia (views do memmap)
+        i0, i1 = self._intervalo(inicio, fim)
+        return Painel(self.datas[i0:i1], self.valores[i0:i1], self.colunas,
+                      [self.rotulos[c] for c in self.colunas], self.fontes)
+
+    def coluna(self, nome, inicio=None, fim=None):
+        i0, i1 = self._intervalo(inicio, fim)
+        return self.valores[i0:i1, self._pos[nome]]
+
+    def serie(self, nome, inicio=None, fim=None, dropna=True):
+        i0, i1 = self._intervalo(inicio, fim)
+        s = pd.Series(np.asarray(self.valores[i0:i1, self._pos[nome]]),
+                      index=pd.DatetimeIndex(self.datas[i0:i1], name="Date"), name=nome)
+        return s.dropna() if dropna else s
+
+    def frame(self, colunas=None, inicio=None, fim=None, how="outer"):
+        # how="inner" descarta as datas em que alguma das colunas não tem cotação
+        colunas = self.colunas if colunas is None else list(colunas)
+        i0, i1 = self._intervalo(inicio, fim)
+        idx = [self._pos[c] for c in colunas]
+        df = pd.DataFrame(np.asarray(self.valores[i0:i1][:, idx]), columns=colunas,
+                          index=pd.DatetimeIndex(self.datas[i0:i1], name="Date"))
+        return df.dropna() if how == "inner" else df.dropna(how="all")
+
+    def colunas_em(self, pasta):
+        # Colunas cujo CSV de origem está em dados/<pasta>/
+        prefixo = pasta.rstrip("/") + "/"
+        return [c for c in self.colunas if self.caminhos[c].startswith(prefixo)]
+
+
+def carregar_painel(base_path=DADOS_DIR, destino=None, dtype=np.float64, mmap=True):
+    destino = destino or os.path.join(base_path, "painel")
+    if painel_desatualizado(base_path, destino, dtype):
+        print(f"Reconstruindo painel de preços em {destino}...")
+        construir_painel(base_path, destino, dtype)
+    manifesto = _ler_manifesto(destino)
+    modo = "r" if mmap else None
+    datas = np.load(os.path.join(destino, ARQ_DATAS), mmap_mode=modo)
+    valores = np.load(os.path.join(destino, ARQ_VALORES), mmap_mode=modo)
+    return Painel(datas, valores, manifesto["colunas"], manifesto["rotulos"], manifesto["fontes"])
+
+
+if __name__ == "__main__":
+    manifesto = construir_painel()
+    print(f"Painel com {len(manifesto['colunas'])} ativos x {manifesto['linhas']} datas salvo em {PAINEL_DIR}")
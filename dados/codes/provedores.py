@@ -0,0 +1,191 @@
+import pandas as pd
+import os
+import random
+import threading
+import time
+
+# Data providers used by download_assets.py / coleta.py
+# A provider exposes
+#   baixar(ticker, inicio=None) -> pd.Series of prices indexed by date (name = ticker)
+#   baixar_lote(tickers, inicio=None) -> {ticker: pd.Series}
+# inicio=None means the full history. tamanho_lote is how many tickers fit in
+# one request and limite spaces out consecutive requests to the same provider.
+# coleta.py waits on limite once per batch; providers that send several HTTP
+# requests per batch set limite_por_requisicao and wait before each one.
+
+
+class LimiteTaxa:
+    # Minimum interval between requests to one provider (shared by all threads)
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def com_retentativas(funcao, tentativas=4, espera_base=1.0, espera_max=30.0):
+    # Exponential backoff with jitter: 1s, 2s, 4s... (+/- 50%)
+    for tentativa in range(tentativas):
+        try:
+            return funcao()
+        except Exception:
+            if tentativa == tentativas - 1:
+                raise
+            espera = min(espera_max, espera_base * 2 ** tentativa)
+            time.sleep(espera * random.uniform(0.5, 1.5))
+
+
+def _extrair_serie(data, ticker):
+    if data.empty:
+        return pd.Series(dtype=float, name=ticker)
+    # Clean up columns (Handle MultiIndex)
+    # yfinance often returns columns like ('Adj Close', 'TLT')
+    if isinstance(data.columns, pd.MultiIndex):
+        # Prefer Adj Close, fallback to Close
+        if 'Adj Close' in data.columns.get_level_values(0):
+            series = data['Adj Close'][ticker]
+        elif 'Close' in data.columns.get_level_values(0):
+            series = data['Close'][ticker]
+        else:
+            # Fallback: take the first column
+            series = data.iloc[:, 0]
+    else:
+        if 'Adj Close' in data.columns:
+            series = data['Adj Close']
+        elif 'Close' in data.columns:
+            series = data['Close']
+        else:
+            series = data.iloc[:, 0]
+    return series.dropna().rename(ticker)
+
+
+class Provedor:
+    nome = "base"
+    tamanho_lote = 1
+    limite_por_requisicao = False
+
+    def __init__(self, intervalo=0.0):
+        self.limite = LimiteTaxa(intervalo)
+
+    def baixar(self, ticker, inicio=None):
+        return self.baixar_lote([ticker], inicio).get(ticker, pd.Series(dtype=float, name=ticker))
+
+    def baixar_lote(self, tickers, inicio=None):
+        raise NotImplementedError
+
+
+class ProvedorYahoo(Provedor):
+    # Several tickers per yf.download call (one HTTP round for the batch)
+    nome = "yahoo"
+    tamanho_lote = 10
+
+    def __init__(self, intervalo=0.5):
+        super().__init__(intervalo)
+
+    def baixar_lote(self, tickers, inicio=None):
+        # Imported here so offline runs (local provider) don't need yfinance
+        import yfinance as yf
+
+        kwargs = {"period": "max"} if inicio is None else {"start": pd.Timestamp(inicio).strftime("%Y-%m-%d")}
+        data = yf.download(list(tickers), progress=False, threads=False, **kwargs)
+
+        resultado = {}
+        for ticker in tickers:
+            try:
+                resultado[ticker] = _extrair_serie(data, ticker)
+            except KeyError:
+                # Ticker missing from the batch response: empty for this one only
+                resultado[ticker] = pd.Series(dtype=float, name=ticker)
+        return resultado
+
+
+class ProvedorSGS(Provedor):
+    # Banco Central (SGS) time series, e.g. 432 = Selic meta (% a.a.), 11 = Selic diária.
+    # The API only serves up to 10 years of a daily series per request, so a
+    # full history is several requests: each one is paced by limite.
+    nome = "sgs"
+    limite_por_requisicao = True
+    url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados"
+    inicio_padrao = "1999-03-01"
+    janela_anos = 10
+
+    def __init__(self, intervalo=0.5, timeout=30):
+        super().__init__(intervalo)
+        self.timeout = timeout
+
+    def _janelas(self, inicio, fim):
+        atual = pd.Timestamp(inicio).normalize()
+        fim = pd.Timestamp(fim).normalize()
+        while atual <= fim:
+            proximo = min(atual + pd.DateOffset(years=self.janela_anos) - pd.Timedelta(days=1), fim)
+            yield atual, proximo
+            atual = proximo + pd.Timedelta(days=1)
+
+    def baixar_lote(self, tickers, inicio=None):
+        import requests
+
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        resultado = {}
+        for codigo in tickers:
+            partes = []
+            for ini, fim in self._janelas(inicio or self.inicio_padrao, pd.Timestamp.now()):
+                params = {"formato": "json",
+                          "dataInicial": ini.strftime("%d/%m/%Y"),
+                          "dataFinal": fim.strftime("%d/%m/%Y")}
+                self.limite.aguardar()
+                resp = requests.get(self.url.format(codigo=codigo), params=params,
+                                    headers=headers, timeout=self.timeout)
+                # SGS answers 404 for windows with no observations
+                if resp.status_code == 404:
+                    continue
+                resp.raise_for_status()
+                partes.extend(resp.json())
+            if not partes:
+                resultado[codigo] = pd.Series(dtype=float, name=codigo)
+                continue
+            df = pd.DataFrame(partes)
+            serie = pd.Series(pd.to_numeric(df["valor"], errors="coerce").values,
+                              index=pd.to_datetime(df["data"], format="%d/%m/%Y"), name=codigo)
+            resultado[codigo] = serie.dropna()
+        return resultado
+
+
+class ProvedorLocal(Provedor):
+    # Stand-in provider for offline runs and tests: serves <diretorio>/<ticker>.csv
+    # (same Date,<ticker> layout as the files under dados/).
+    nome = "local"
+    tamanho_lote = 50
+
+    def __init__(self, diretorio, intervalo=0.0):
+        super().__init__(intervalo)
+        self.diretorio = diretorio
+        self.chamadas = []
+
+    def baixar_lote(self, tickers, inicio=None):
+        self.chamadas.append((tuple(tickers), inicio))
+        resultado = {}
+        for ticker in tickers:
+            path = os.path.join(self.diretorio, f"{ticker.replace('/', '_')}.csv")
+            if not os.path.exists(path):
+                resultado[ticker] = pd.Series(dtype=float, name=ticker)
+                continue
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            series = df.iloc[:, 0].rename(ticker)
+            if inicio is not None:
+                series = series[series.index >= pd.Timestamp(inicio)]
+            resultado[ticker] = series
+        return resultado
+
+
+# Default provider set; download_assets.py --local swaps every entry for ProvedorLocal
+PROVEDORES = {
+    "yahoo": ProvedorYahoo,
+    "sgs": ProvedorSGS,
+}
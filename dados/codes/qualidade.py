@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+from ativos import ATIVOS
+from painel import DADOS_DIR, _gravar_atomico, _salvar_json
+from taxas import feriados
+
+# Validação das séries na escrita (download_assets.py grava só a série limpa)
+# Tudo vetorizado sobre a série inteira (datas em datetime64[D], valores em float):
+#   data_invalida - data que não pôde ser lida
+#   sem_valor     - valor ausente ou não numérico
+#   duplicada     - data repetida (fica a última linha)
+#   nao_positivo  - preço <= 0
+#   pico          - salto que se desfaz no dia seguinte (ex: cotação errada isolada)
+#   repetido      - mesmo valor por mais de REPETICOES_MAX observações (dado parado)
+# saem da série e vão para a quarentena (dados/quarentena/<nome>.csv, com o
+# motivo). Saltos que não se desfazem (desdobramentos, crises) e lacunas em
+# relação ao calendário do mercado só são registrados no relatório
+# (dados/quarentena/relatorio.json): são reais ou não têm como ser corrigidos aqui.
+# A série limpa sai ordenada, sem datas repetidas e sem NaN, então o painel,
+# a conversão, o modelo e o site não precisam repetir essas checagens.
+
+QUARENTENA_DIR = os.path.join(DADOS_DIR, "quarentena")
+ARQ_RELATORIO = "relatorio.json"
+
+# Salto = |retorno log| acima de max(SALTO_MAD x desvio robusto, SALTO_MIN);
+# é pico se o dia seguinte volta na direção oposta e a soma dos dois fica abaixo
+# de REVERSAO x o limite
+SALTO_MAD = 10
+SALTO_MIN = 0.25
+REVERSAO = 0.5
+REPETICOES_MAX = 10
+# Lacuna: mais de LACUNA_MAX dias úteis do calendário sem cotação
+LACUNA_MAX = 5
+
+MOTIVOS = ["data_invalida", "sem_valor", "duplicada", "nao_positivo", "pico", "repetido"]
+
+# Perfis por tipo de série: taxas (Selic, % a.a.) mudam em degraus e ficam
+# paradas por meses, então não passam pelas checagens de salto e repetição
+PERFIS = {
+    "preco": {"saltos": True, "repeticoes": True},
+    "taxa": {"saltos": False, "repeticoes": False},
+}
+
+
+def calendario_ativo(asset):
+    # B3/ANBIMA para ativos brasileiros, 7 dias para cripto e séries diárias
+    # corridas (SGS), segunda a sexta para o resto
+    if asset.get("tipo") == "taxa" or asset.get("categoria") == "Cripto":
+        return np.busdaycalendar(weekmask="1111111")
+    if asset["ticker"].endswith(".SA"):
+        return np.busdaycalendar(holidays=feriados(1990, 2100))
+    return np.busdaycalendar()
+
+
+def perfil_ativo(asset):
+    return PERFIS[asset.get("tipo", "preco")]
+
+
+def _amplitudes(iguais):
+    # Para cada posição, o tamanho da sequência de valores iguais a que ela pertence
+    # e a posição dentro da sequência (0 = primeira)
+    inicios = np.flatnonzero(~iguais)
+    tamanhos = np.diff(np.append(inicios, len(iguais)))
+    grupo = np.cumsum(~iguais) - 1
+    return tamanhos[grupo], np.arange(len(iguais)) - inicios[grupo]
+
+
+def _picos(valores, reversao=REVERSAO):
+    # Posições dos picos isolados e dos saltos que não se desfazem, e o limite usado
+    r = np.diff(np.log(valores))
+    if len(r) < 2:
+        return np.zeros(len(valores), dtype=bool), np.zeros(len(valores), dtype=bool), None
+    desvio = 1.4826 * np.median(np.abs(r - np.median(r)))
+    limite = max(SALTO_MAD * desvio, SALTO_MIN)
+    grande = np.abs(r) > limite
+    a, b = r[:-1], r[1:]
+    volta = grande[:-1] & grande[1:] & (np.sign(a) != np.sign(b)) & (np.abs(a + b) < reversao * limite)
+    pico = np.concatenate([[False], volta, [False]])
+    # Saltos restantes: os retornos grandes que não entram nem saem de um pico
+    salto = np.concatenate([[False], grande]) & ~pico & ~np.roll(pico, 1)
+    return pico, salto, limite
+
+
+def validar(serie, perfil=PERFIS["preco"], calendario=None):
+    # serie: pd.Series indexada por data, como lida/baixada (pode vir desordenada).
+    # Devolve (série limpa, quarentena, relatório):
+    #   quarentena: DataFrame [data, valor, motivo] das linhas removidas
+    #   relatório: contagens por motivo, saltos e lacunas encontrados
+    datas = pd.to_datetime(pd.Index(serie.index), errors="coerce").values.astype("datetime64[D]")
+    brutos = serie.to_numpy()
+    valores = pd.to_numeric(pd.Series(brutos), errors="coerce").to_numpy(dtype=float)
+
+    # Ordenação estável (NaT no fim): entre datas repetidas, a última linha fica por último
+    ordem = np.argsort(datas, kind="stable")
+    datas, valores, brutos = datas[ordem], valores[ordem], brutos[ordem]
+    motivo = np.full(len(valores), "", dtype=object)
+
+    def marcar(posicoes, nome):
+        # posicoes: máscara booleana ou índices; só marca quem ainda está válido
+        mascara = np.zeros(len(motivo), dtype=bool)
+        mascara[posicoes] = True
+        motivo[mascara & (motivo == "")] = nome
+
+    with np.errstate(invalid="ignore"):
+        marcar(np.isnat(datas), "data_invalida")
+        marcar(~np.isfinite(valores), "sem_valor")
+        marcar(valores <= 0, "nao_positivo")
+
+    idx = np.flatnonzero(motivo == "")
+    marcar(idx[:-1][datas[idx[:-1]] == datas[idx[1:]]], "duplicada")
+
+    saltos, limite = [], None
+    if perfil["repeticoes"]:
+        idx = np.flatnonzero(motivo == "")
+        if len(idx):
+            v = valores[idx]
+            tamanho, posicao = _amplitudes(np.concatenate([[False], v[1:] == v[:-1]]))
+            marcar(idx[(tamanho > REPETICOES_MAX) & (posicao > 0)], "repetido")
+    if perfil["saltos"]:
+        idx = np.flatnonzero(motivo == "")
+        v = valores[idx]
+        pico, salto, limite = _picos(v)
+        marcar(idx[pico], "pico")
+        saltos = [{"data": str(datas[idx[j]]), "retorno_log": round(float(np.log(v[j] / v[j - 1])), 6)}
+                  for j in np.flatnonzero(salto)]
+
+    validas = motivo == ""
+    limpa = pd.Series(valores[validas], index=pd.DatetimeIndex(datas[validas], name=serie.index.name),
+                      name=serie.name)
+
+    lacunas = []
+    d = datas[validas]
+    if calendario is not None and len(d) > 1:
+        faltando = np.busday_count(d[:-1] + 1, d[1:], busdaycal=calendario)
+        lacunas = [{"de": str(d[k]), "ate": str(d[k + 1]), "dias_uteis": int(faltando[k])}
+                   for k in np.flatnonzero(faltando > LACUNA_MAX)]
+
+    quarentena = pd.DataFrame({
+        "data": np.datetime_as_string(datas[~validas]),
+        "valor": brutos[~validas],
+        "motivo": motivo[~validas],
+    })
+    relatorio = {
+        "linhas": int(len(valores)),
+        "validas": int(validas.sum()),
+        "quarentena": {m: int((motivo == m).sum()) for m in MOTIVOS if (motivo == m).any()},
+        "limite_salto": None if limite is None else round(float(limite), 6),
+        "saltos": saltos,
+        "lacunas": lacunas,
+    }
+    return limpa, quarentena, relatorio
+
+
+def validar_ativo(asset, serie):
+    return validar(serie, perfil_ativo(asset), calendario_ativo(asset))
+
+
+def registrar(nome, quarentena, relatorio, pasta=QUARENTENA_DIR):
+    # Acumula as linhas em quarentena do ativo (sem repetir data + motivo) e
+    # atualiza o relatório consolidado
+    os.makedirs(pasta, exist_ok=True)
+    if len(quarentena):
+        caminho = os.path.join(pasta, f"{nome}.csv")
+        if os.path.exists(caminho):
+            anterior = pd.read_csv(caminho, dtype={"data": str, "valor": str}, keep_default_na=False)
+            quarentena = pd.concat([anterior, quarentena.astype({"valor": str})])
+        quarentena = quarentena.astype({"valor": str}).drop_duplicates(["data", "motivo"], keep="last")
+        tmp = caminho + ".tmp"
+        quarentena.sort_values("data").to_csv(tmp, index=False)
+        os.replace(tmp, caminho)
+
+    caminho = os.path.join(pasta, ARQ_RELATORIO)
+    todos = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            todos = json.load(f)
+    todos[nome] = relatorio
+    _gravar_atomico(caminho, lambda p: _salvar_json(p, todos))
+
+
+if __name__ == "__main__":
+    # Audita (e com --aplicar, limpa) os CSVs já gravados em dados/
+    from download_assets import get_file_path, write_atomic
+
+    parser = argparse.ArgumentParser(description="Valida as séries de dados/ e separa as linhas ruins")
+    parser.add_argument("ativos", nargs="*", help="nomes do registro (padrão: todos)")
+    parser.add_argument("--aplicar", action="store_true", help="regrava os CSVs só com as linhas válidas")
+    args = parser.parse_args()
+
+    for asset in ATIVOS:
+        if args.ativos and asset["nome"] not in args.ativos:
+            continue
+        caminho = get_file_path(asset)
+        if not os.path.exists(caminho):
+            continue
+        df = pd.read_csv(caminho, index_col=0, dtype=str, keep_default_na=False)
+        limpa, quarentena, relatorio = validar_ativo(asset, df.iloc[:, 0])
+        removidas = ", ".join(f"{m}={n}" for m, n in relatorio["quarentena"].items()) or "nenhuma"
+        print(f"{asset['nome']:<32} {relatorio['validas']:>6}/{relatorio['linhas']:<6} removidas: {removidas}"
+              f" | saltos: {len(relatorio['saltos'])} | lacunas: {len(relatorio['lacunas'])}")
+        if args.aplicar:
+            registrar(asset["nome"], quarentena, relatorio)
+            if len(quarentena):
+                write_atomic(caminho, lambda tmp: limpa.to_csv(tmp))
@@ -0,0 +1,282 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+from painel import DADOS_DIR, carregar_painel, _gravar_atomico, _salvar_npy, _salvar_json
+
+# Cubo de retornos pré-calculado sobre o painel (painel.py)
+# Para cada periodicidade (D: grade diária do painel, W: semanas de segunda a
+# domingo, M: meses) e cada ativo, em .npy ordem Fortran (coluna contígua):
+#   F_datas    - data de cada período (último dia da grade dentro dele)
+#   F_nivel    - log do último preço do ativo no período (NaN se não cotou)
+#   F_log      - retorno log desde a observação anterior do próprio ativo
+#   F_simples  - retorno simples (expm1 do log)
+#   F_mascara  - True onde o retorno existe (o ativo cotou no período e antes dele)
+# Um dia sem cotação (feriado local, falha) não vira retorno zero: o retorno
+# seguinte cobre o intervalo todo e a máscara marca o buraco. A leitura usa
+# memmap; janelas de datas e colunas consecutivas são views, sem cópia.
+# Quando o painel muda, só as linhas a partir da primeira data alterada (e os
+# períodos W/M que a contêm) são recalculadas: preços novos no fim custam
+# O(linhas novas x ativos).
+
+PERIODICIDADES = ("D", "W", "M")
+FATOR_ANUAL = {"D": 252, "W": 52, "M": 12}
+
+ARQ_MANIFESTO = "manifesto.json"
+# Incrementar quando o formato do cubo mudar (força reconstrução)
+VERSAO = 1
+
+
+def _arquivo(destino, freq, nome):
+    return os.path.join(destino, f"{freq}_{nome}.npy")
+
+
+def _chaves_periodo(datas, freq):
+    # Chave inteira do período de cada data (datas ordenadas)
+    dias = datas.astype("datetime64[D]").astype(np.int64)
+    if freq == "D":
+        return dias
+    if freq == "W":
+        # 1970-01-01 foi quinta-feira: +3 faz as semanas começarem na segunda
+        return (dias + 3) // 7
+    return datas.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _ultimo_valido(nivel):
+    # Para cada linha, a posição da última linha <= ela com valor (ou -1)
+    pos = np.where(np.isfinite(nivel), np.arange(len(nivel))[:, None], -1)
+    return np.maximum.accumulate(pos, axis=0) if len(nivel) else pos
+
+
+def _niveis(datas, nivel, freq):
+    # Reamostra os log-preços diários: (datas dos períodos, último log-preço de
+    # cada ativo dentro do período). Um ativo sem cotação no período fica NaN.
+    if freq == "D":
+        return datas, nivel
+    chaves = _chaves_periodo(datas, freq)
+    fim = np.r_[np.flatnonzero(np.diff(chaves)) + 1, len(chaves)] - 1
+    inicio = np.r_[0, fim[:-1] + 1]
+    ultimo = _ultimo_valido(nivel)[fim]
+    colunas = np.arange(nivel.shape[1])
+    valores = nivel[np.maximum(ultimo, 0), colunas]
+    return datas[fim], np.where(ultimo >= inicio[:, None], valores, np.nan)
+
+
+def _retornos(nivel, anterior):
+    # Retorno log de cada linha desde a observação anterior do mesmo ativo.
+    # anterior: último log-preço de cada ativo antes da primeira linha (NaN se nenhum)
+    base = np.vstack([anterior[None, :], nivel])
+    ultimo = _ultimo_valido(base)[:-1]
+    colunas = np.arange(nivel.shape[1])
+    previo = np.where(ultimo >= 0, base[np.maximum(ultimo, 0), colunas], np.nan)
+    log = nivel - previo
+    return log, np.expm1(log), np.isfinite(log)
+
+
+def _anterior(nivel, linha):
+    # Último log-preço de cada ativo antes de `linha`. Procura em blocos
+    # crescentes para trás, sem varrer o histórico todo quando todos cotaram há pouco
+    n = nivel.shape[1]
+    anterior = np.full(n, np.nan)
+    faltam = np.arange(n)
+    fim, bloco = linha, 32
+    while fim > 0 and len(faltam):
+        ini = max(0, fim - bloco)
+        trecho = np.asarray(nivel[ini:fim][:, faltam])
+        ultimo = _ultimo_valido(trecho)[-1]
+        achou = ultimo >= 0
+        anterior[faltam[achou]] = trecho[ultimo[achou], np.flatnonzero(achou)]
+        faltam = faltam[~achou]
+        fim, bloco = ini, bloco * 2
+    return anterior
+
+
+def _log_precos(valores):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nivel = np.log(np.asarray(valores, dtype=float))
+    nivel[~np.isfinite(nivel)] = np.nan
+    return nivel
+
+
+def _primeira_diferenca(datas_velhas, nivel_velho, datas, nivel):
+    # Primeira linha da grade nova que difere da antiga (datas ou preços, NaN == NaN)
+    n = min(len(datas_velhas), len(datas))
+    iguais = datas_velhas[:n] == datas[:n]
+    a, b = nivel_velho[:n], nivel[:n]
+    iguais &= ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+    return n if iguais.all() else int(np.argmin(iguais))
+
+
+class Cubo:
+    def __init__(self, arrays, colunas, rotulos):
+        # arrays: {freq: {"datas", "nivel", "log", "simples", "mascara"}}
+        self.arrays = arrays
+        self.colunas = list(colunas)
+        self.rotulos = dict(zip(colunas, rotulos))
+        self._pos = {c: i for i, c in enumerate(self.colunas)}
+
+    def datas(self, freq="D"):
+        return self.arrays[freq]["datas"]
+
+    def _intervalo(self, freq, inicio=None, fim=None):
+        datas = self.arrays[freq]["datas"]
+        i0 = 0 if inicio is None else np.searchsorted(datas, np.datetime64(inicio, "D"), side="left")
+        i1 = len(datas) if fim is None else np.searchsorted(datas, np.datetime64(fim, "D"), side="right")
+        return i0, i1
+
+    def _colunas(self, colunas):
+        # Fatia quando as colunas são consecutivas no cubo (view), senão índices (cópia)
+        if colunas is None:
+            return slice(None)
+        pos = [self._pos[c] for c in colunas]
+        if pos and pos == list(range(pos[0], pos[0] + len(pos))):
+            return slice(pos[0], pos[0] + len(pos))
+        return np.array(pos, dtype=int)
+
+    def janela(self, freq="D", tipo="log", colunas=None, inicio=None, fim=None):
+        # (datas, retornos, máscara) da janela; views do memmap para colunas consecutivas
+        i0, i1 = self._intervalo(freq, inicio, fim)
+        a, cols = self.arrays[freq], self._colunas(colunas)
+        return a["datas"][i0:i1], a[tipo][i0:i1, cols], a["mascara"][i0:i1, cols]
+
+    def coluna(self, nome, freq="D", tipo="log", inicio=None, fim=None):
+        # (datas, retornos, máscara) de um ativo: views da coluna
+        i0, i1 = self._intervalo(freq, inicio, fim)
+        a, j = self.arrays[freq], self._pos[nome]
+        return a["datas"][i0:i1], a[tipo][i0:i1, j], a["mascara"][i0:i1, j]
+
+    def _comuns(self, colunas, freq, inicio, fim):
+        # (datas, log-preços) das linhas em que todos os ativos cotam
+        i0, i1 = self._intervalo(freq, inicio, fim)
+        a, cols = self.arrays[freq], [self._pos[c] for c in colunas]
+        nivel = np.asarray(a["nivel"][i0:i1][:, cols])
+        comuns = np.isfinite(nivel).all(axis=1)
+        return a["datas"][i0:i1][comuns], nivel[comuns]
+
+    def datas_comuns(self, colunas, freq="D", inicio=None, fim=None):
+        # Datas em que todos os ativos cotam: a primeira é a base do primeiro
+        # retorno de alinhados, as demais são o seu índice
+        return self._comuns(colunas, freq, inicio, fim)[0]
+
+    def alinhados(self, colunas, freq="D", tipo="log", inicio=None, fim=None):
+        # Retornos nas datas em que todos os ativos cotam, como
+        # np.log(df / df.shift(1)).dropna() sobre o frame de preços com inner join
+        # (o log-preço é acumulado, então a diferença nas datas comuns é exata)
+        datas, nivel = self._comuns(colunas, freq, inicio, fim)
+        log = np.diff(nivel, axis=0)
+        valores = log if tipo == "log" else np.expm1(log)
+        return pd.DataFrame(valores, columns=list(colunas), index=pd.DatetimeIndex(datas[1:], name="Date"))
+
+
+def _calcular(datas, nivel_diario, inicio_linha=0, velhos=None):
+    # Calcula (ou recalcula a partir de inicio_linha da grade diária) os arrays
+    # de todas as periodicidades; velhos: arrays do cubo anterior
+    arrays = {}
+    for freq in PERIODICIDADES:
+        if velhos is None or inicio_linha == 0:
+            p0, linha = 0, 0
+        else:
+            # Primeiro período que contém linhas alteradas e sua primeira linha diária
+            chave = _chaves_periodo(datas[inicio_linha:inicio_linha + 1], freq)[0]
+            datas_velhas = velhos[freq]["datas"]
+            p0 = int(np.searchsorted(_chaves_periodo(datas_velhas, freq), chave, side="left"))
+            linha = int(np.searchsorted(_chaves_periodo(datas, freq), chave, side="left"))
+        datas_f, nivel_f = _niveis(datas[linha:], nivel_diario[linha:], freq)
+        anterior = _anterior(velhos[freq]["nivel"], p0) if p0 else np.full(nivel_diario.shape[1], np.nan)
+        log, simples, mascara = _retornos(nivel_f, anterior)
+        novos = {"datas": datas_f, "nivel": nivel_f, "log": log, "simples": simples, "mascara": mascara}
+        if p0:
+            novos = {k: np.concatenate([np.asarray(velhos[freq][k][:p0]), v]) for k, v in novos.items()}
+        arrays[freq] = novos
+    return arrays
+
+
+def _ler_manifesto(destino):
+    path = os.path.join(destino, ARQ_MANIFESTO)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _assinatura_painel(painel):
+    return {c: painel.fontes[c]["sha256"] for c in painel.colunas}
+
+
+def _abrir(destino, mmap=True):
+    modo = "r" if mmap else None
+    return {freq: {nome: np.load(_arquivo(destino, freq, nome), mmap_mode=modo)
+                   for nome in ("datas", "nivel", "log", "simples", "mascara")}
+            for freq in PERIODICIDADES}
+
+
+def cubo_desatualizado(painel, destino):
+    manifesto = _ler_manifesto(destino)
+    return (manifesto is None or manifesto.get("versao") != VERSAO
+            or manifesto["fontes"] != _assinatura_painel(painel))
+
+
+def atualizar_cubo(painel, destino):
+    # Recalcula o cubo a partir da primeira linha da grade que mudou.
+    # Devolve (Cubo, linhas diárias recalculadas)
+    datas = np.asarray(painel.datas)
+    nivel = _log_precos(painel.valores)
+
+    manifesto = _ler_manifesto(destino)
+    velhos, i0 = None, 0
+    if manifesto is not None and manifesto.get("versao") == VERSAO and manifesto["colunas"] == painel.colunas:
+        velhos = _abrir(destino, mmap=True)
+        i0 = _primeira_diferenca(velhos["D"]["datas"], velhos["D"]["nivel"], datas, nivel)
+        if len(velhos["D"]["datas"]) > len(datas):
+            # Grade encolheu (datas removidas no fim): recalcula tudo
+            i0 = 0
+        elif i0 == len(datas):
+            # Mesmos preços (ex: só o hash de uma fonte mudou): só o manifesto
+            manifesto["fontes"] = _assinatura_painel(painel)
+            _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO), lambda p: _salvar_json(p, manifesto))
+            return Cubo(velhos, manifesto["colunas"], manifesto["rotulos"]), 0
+    arrays = _calcular(datas, nivel, i0, velhos)
+    # Os memmaps antigos precisam estar fechados antes de substituir os arquivos
+    del velhos
+
+    os.makedirs(destino, exist_ok=True)
+    for freq, a in arrays.items():
+        for nome, valores in a.items():
+            valores = valores if nome == "datas" else np.asfortranarray(valores)
+            _gravar_atomico(_arquivo(destino, freq, nome), lambda p, v=valores: _salvar_npy(p, v))
+    manifesto = {
+        "versao": VERSAO,
+        "colunas": painel.colunas,
+        "rotulos": [painel.rotulos[c] for c in painel.colunas],
+        "fontes": _assinatura_painel(painel),
+        "linhas": {freq: int(len(a["datas"])) for freq, a in arrays.items()},
+    }
+    # Manifesto por último: o cubo só é válido depois que ele existe
+    _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO), lambda p: _salvar_json(p, manifesto))
+    return Cubo(arrays, manifesto["colunas"], manifesto["rotulos"]), len(datas) - i0
+
+
+def carregar_cubo(base_path=DADOS_DIR, destino=None, painel=None, mmap=True):
+    # Cubo do painel de base_path (dados/ ou dados/brl), atualizado se preciso
+    destino = destino or os.path.join(base_path, "retornos")
+    if painel is None:
+        painel = carregar_painel(base_path)
+    if cubo_desatualizado(painel, destino):
+        print(f"Atualizando cubo de retornos em {destino}...")
+        return atualizar_cubo(painel, destino)[0]
+    manifesto = _ler_manifesto(destino)
+    return Cubo(_abrir(destino, mmap), manifesto["colunas"], manifesto["rotulos"])
+
+
+if __name__ == "__main__":
+    from painel import BRL_DIR
+    parser = argparse.ArgumentParser(description="Cubo de retornos D/W/M (log e simples) do painel")
+    parser.add_argument("--brl", action="store_true", help="usa a camada BRL (dados/brl)")
+    args = parser.parse_args()
+
+    base_path = BRL_DIR if args.brl else DADOS_DIR
+    painel = carregar_painel(base_path)
+    cubo, recalculadas = atualizar_cubo(painel, os.path.join(base_path, "retornos"))
+    linhas = ", ".join(f"{freq}={len(cubo.datas(freq))}" for freq in PERIODICIDADES)
+    print(f"Cubo de retornos: {len(cubo.colunas)} ativos, períodos {linhas} ({recalculadas} dias recalculados)")
@@ -0,0 +1,247 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+from ativos import ATIVOS_POR_NOME
+from painel import DADOS_DIR, hash_arquivo, _assinatura, _gravar_atomico, _salvar_npy, _salvar_json
+
+# Índice de acumulação da Selic (LFT) em dias úteis, convenção DU/252
+# A taxa vem do CSV sincronizado por download_assets.py (SGS 432, meta % a.a.,
+# uma linha por dia corrido). Aqui só os dias úteis do calendário nacional
+# (ANBIMA: feriados nacionais, Carnaval, Sexta-feira Santa e Corpus Christi)
+# acumulam: fator_t = (1 + taxa_{t-1}/100)^(1/252), indice_t = Π fator.
+# O resultado fica em dados/taxas/ (.npy + manifesto) e é atualizado só a
+# partir da primeira data cuja taxa mudou. Qualquer retorno da LFT entre duas
+# datas é a razão indice(fim) / indice(inicio), lida numa tabela por dia
+# corrido (O(1)), para o modelo e os backtests. No site o índice vira o ativo
+# "lft" (página, pirâmide LOD e miniatura) em generate_pages.py.
+
+TAXAS_DIR = os.path.join(DADOS_DIR, "taxas")
+ATIVO_SELIC = "selic_historica"
+DIAS_ANO = 252
+
+ARQ_DATAS = "datas.npy"
+ARQ_TAXA = "taxa.npy"
+ARQ_INDICE = "indice.npy"
+ARQ_MANIFESTO = "manifesto.json"
+VERSAO = 1
+
+
+# --- Calendário ---
+
+def pascoa(ano):
+    # Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return np.datetime64(f"{ano:04d}-{mes:02d}-{dia:02d}", "D")
+
+
+def feriados(ano_inicio, ano_fim):
+    # Feriados nacionais (calendário ANBIMA), de ano_inicio a ano_fim inclusive
+    datas = []
+    for ano in range(ano_inicio, ano_fim + 1):
+        fixos = ["01-01", "04-21", "05-01", "09-07", "10-12", "11-02", "11-15", "12-25"]
+        if ano >= 2024:
+            fixos.append("11-20")  # Consciência Negra (Lei 14.759/2023)
+        datas += [np.datetime64(f"{ano:04d}-{md}", "D") for md in fixos]
+        p = pascoa(ano)
+        # Carnaval (segunda e terça), Sexta-feira Santa e Corpus Christi
+        datas += [p - 48, p - 47, p - 2, p + 60]
+    return np.unique(np.array(datas, dtype="datetime64[D]"))
+
+
+def calendario(ano_inicio, ano_fim):
+    return np.busdaycalendar(holidays=feriados(ano_inicio, ano_fim))
+
+
+def dias_uteis(inicio, fim, cal=None):
+    # Dias úteis em [inicio, fim)
+    inicio, fim = np.datetime64(inicio, "D"), np.datetime64(fim, "D")
+    if cal is None:
+        cal = calendario(inicio.astype(object).year, fim.astype(object).year)
+    dias = np.arange(inicio, fim, dtype="datetime64[D]")
+    return dias[np.is_busday(dias, busdaycal=cal)]
+
+
+# --- Índice acumulado ---
+
+class IndiceTaxa:
+    def __init__(self, datas, taxa, indice):
+        # datas: dias úteis; taxa: % a.a. vigente em cada dia; indice: acumulado
+        self.datas = datas
+        self.taxa = taxa
+        self.indice = indice
+        # Tabela por dia corrido: valor no último dia útil <= data
+        self.dia0 = datas[0]
+        dias = np.arange(datas[0], datas[-1] + 1, dtype="datetime64[D]")
+        self._du_por_dia = np.searchsorted(datas, dias, side="right") - 1
+        self._por_dia = indice[self._du_por_dia]
+
+    def _posicao(self, data):
+        # Posição na tabela por dia corrido (datas fora do intervalo ficam nas bordas)
+        pos = (np.asarray(data, dtype="datetime64[D]") - self.dia0).astype(np.int64)
+        return np.clip(pos, 0, len(self._por_dia) - 1)
+
+    def valor(self, data):
+        return self._por_dia[self._posicao(data)]
+
+    def retorno(self, inicio, fim):
+        # Retorno da LFT entre as datas (aceita arrays): razão de dois índices
+        return self.valor(fim) / self.valor(inicio) - 1
+
+    def du(self, inicio, fim):
+        # Dias úteis acumulados entre as datas
+        return self._du_por_dia[self._posicao(fim)] - self._du_por_dia[self._posicao(inicio)]
+
+    def taxa_anual(self, inicio=None, fim=None):
+        # Taxa efetiva anualizada (DU/252) do período
+        inicio = self.datas[0] if inicio is None else inicio
+        fim = self.datas[-1] if fim is None else fim
+        du = self.du(inicio, fim)
+        return (1 + self.retorno(inicio, fim)) ** (DIAS_ANO / du) - 1 if du > 0 else 0.0
+
+    def serie(self, inicio=None, fim=None, nome="LFT"):
+        # Preço teórico da LFT nos dias úteis (base 1 no primeiro dia do store)
+        i0 = 0 if inicio is None else np.searchsorted(self.datas, np.datetime64(inicio, "D"), side="left")
+        i1 = len(self.datas) if fim is None else np.searchsorted(self.datas, np.datetime64(fim, "D"), side="right")
+        return pd.Series(self.indice[i0:i1], index=pd.DatetimeIndex(self.datas[i0:i1], name="Date"), name=nome)
+
+    def retornos_diarios(self, inicio=None, fim=None):
+        # Fator diário - 1 (o que rende um dia útil), alinhado às datas do índice
+        s = self.serie(inicio, fim)
+        return (s / s.shift(1) - 1).dropna()
+
+
+def _taxa_em_dias_uteis(serie):
+    # Taxa % a.a. vigente em cada dia útil entre a primeira e a última data
+    serie = serie.dropna().sort_index()
+    inicio = serie.index[0].to_datetime64().astype("datetime64[D]")
+    fim = serie.index[-1].to_datetime64().astype("datetime64[D]")
+    datas = dias_uteis(inicio, fim + 1)
+    pos = np.searchsorted(serie.index.values.astype("datetime64[D]"), datas, side="right") - 1
+    return datas, serie.to_numpy(dtype=float)[pos]
+
+
+def _acumular(taxa, indice_anterior=1.0):
+    # indice_t = indice_{t-1} · (1 + taxa_{t-1}/100)^(1/252); indice_0 = indice_anterior
+    fator = (1 + taxa[:-1] / 100) ** (1 / DIAS_ANO)
+    return indice_anterior * np.concatenate([[1.0], np.cumprod(fator)])
+
+
+def csv_selic(base_path=DADOS_DIR):
+    ativo = ATIVOS_POR_NOME[ATIVO_SELIC]
+    return os.path.join(base_path, ativo["pasta"], f"{ATIVO_SELIC}.csv")
+
+
+def _ler_manifesto(destino):
+    path = os.path.join(destino, ARQ_MANIFESTO)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ler_csv(path):
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    return pd.to_numeric(df.iloc[:, 0], errors="coerce")
+
+
+def indice_desatualizado(origem, destino=TAXAS_DIR):
+    manifesto = _ler_manifesto(destino)
+    if manifesto is None or manifesto.get("versao") != VERSAO:
+        return True
+    assinatura = _assinatura(origem)
+    if assinatura == {"tamanho": manifesto["tamanho"], "mtime_ns": manifesto["mtime_ns"]}:
+        return False
+    if hash_arquivo(origem) != manifesto["sha256"]:
+        return True
+    # Conteúdo igual (ex: checkout do git): guarda a nova assinatura
+    manifesto.update(assinatura)
+    _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO), lambda p: _salvar_json(p, manifesto))
+    return False
+
+
+def atualizar_indice(origem=None, destino=TAXAS_DIR):
+    # Recalcula o índice só a partir da primeira data com taxa nova ou revisada.
+    # Devolve (IndiceTaxa, dias úteis recalculados)
+    origem = origem or csv_selic()
+    datas, taxa = _taxa_em_dias_uteis(_ler_csv(origem))
+
+    manifesto = _ler_manifesto(destino)
+    i0 = 0
+    if manifesto is not None and manifesto.get("versao") == VERSAO:
+        antigas = np.load(os.path.join(destino, ARQ_DATAS))
+        taxa_antiga = np.load(os.path.join(destino, ARQ_TAXA))
+        indice_antigo = np.load(os.path.join(destino, ARQ_INDICE))
+        n = min(len(antigas), len(datas))
+        if n and antigas[0] == datas[0]:
+            iguais = (antigas[:n] == datas[:n]) & (taxa_antiga[:n] == taxa[:n])
+            i0 = n if iguais.all() else int(np.argmin(iguais))
+    if i0 > 0:
+        # O índice em i0 depende só da taxa em i0 - 1, que não mudou
+        indice = np.concatenate([indice_antigo[:i0], _acumular(taxa[i0 - 1:], indice_antigo[i0 - 1])[1:]])
+    else:
+        indice = _acumular(taxa)
+
+    os.makedirs(destino, exist_ok=True)
+    _gravar_atomico(os.path.join(destino, ARQ_DATAS), lambda p: _salvar_npy(p, datas))
+    _gravar_atomico(os.path.join(destino, ARQ_TAXA), lambda p: _salvar_npy(p, taxa))
+    _gravar_atomico(os.path.join(destino, ARQ_INDICE), lambda p: _salvar_npy(p, indice))
+    manifesto = {
+        "versao": VERSAO,
+        "origem": os.path.relpath(origem, DADOS_DIR).replace(os.sep, "/"),
+        "sha256": hash_arquivo(origem),
+        **_assinatura(origem),
+        "inicio": str(datas[0]),
+        "fim": str(datas[-1]),
+        "dias_uteis": int(len(datas)),
+    }
+    # Manifesto por último: o índice só é válido depois que ele existe
+    _gravar_atomico(os.path.join(destino, ARQ_MANIFESTO), lambda p: _salvar_json(p, manifesto))
+    return IndiceTaxa(datas, taxa, indice), len(datas) - i0
+
+
+def carregar_indice(origem=None, destino=TAXAS_DIR):
+    origem = origem or csv_selic()
+    if indice_desatualizado(origem, destino):
+        return atualizar_indice(origem, destino)[0]
+    return IndiceTaxa(np.load(os.path.join(destino, ARQ_DATAS)),
+                      np.load(os.path.join(destino, ARQ_TAXA)),
+                      np.load(os.path.join(destino, ARQ_INDICE)))
+
+
+def sincronizar(providers, destino=TAXAS_DIR):
+    # Busca incremental da Selic (SGS, ou o provedor local nos testes) pelo
+    # download_assets.py e atualiza o índice a partir das datas novas
+    from download_assets import sync_all
+    sync_all(providers, "incremental", [ATIVO_SELIC])
+    return atualizar_indice(destino=destino)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice acumulado da Selic (LFT) em dias úteis")
+    parser.add_argument("--sincronizar", action="store_true", help="busca as taxas novas no SGS antes")
+    parser.add_argument("--local", metavar="DIR", help="com --sincronizar: CSVs locais em vez do BCB")
+    args = parser.parse_args()
+
+    if args.sincronizar:
+        from provedores import PROVEDORES, ProvedorLocal
+        if args.local:
+            local = ProvedorLocal(args.local)
+            providers = {key: local for key in PROVEDORES}
+        else:
+            providers = {key: cls() for key, cls in PROVEDORES.items()}
+        indice, novos = sincronizar(providers)
+    else:
+        indice, novos = atualizar_indice()
+    print(f"Índice Selic: {len(indice.datas)} dias úteis de {indice.datas[0]} a {indice.datas[-1]} "
+          f"({novos} recalculados), taxa média {indice.taxa_anual():.2%} a.a.")
@@ -1,28 +1,76 @@
 import os
+import sys
+import json
+import time
+import shutil
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
 
-ASSETS_CONFIG = [
-    { 'id': 'us_treasury_7_10', 'name': 'US Treasury Bond 7-10y (IEF)', 'path': '../dados/renda_fixa/US/us_treasury_bond_7_10y_IEF.csv' },
-    { 'id': 'us_treasury_20', 'name': 'US Treasury Bond 20y (TLT)', 'path': '../dados/renda_fixa/US/us_treasury_bond_20y_TLT.csv' },
-    { 'id': 'us_corp_inv', 'name': 'US Corp Bond Inv Grade (LQD)', 'path': '../dados/renda_fixa/US/us_corp_bond_inv_grade_LQD.csv' },
-    { 'id': 'us_corp_high', 'name': 'US Corp Bond High Yield (HYG)', 'path': '../dados/renda_fixa/US/us_corp_bond_high_yield_HYG.csv' },
-    { 'id': 'us_treasury_1_3', 'name': 'US Treasury Bond 1-3y (SHY)', 'path': '../dados/renda_fixa/US/us_treasury_bond_1_3y_SHY.csv' },
-    { 'id': 'br_cri_inf', 'name': 'BR CRI Inflation Proxy (CPTS11)', 'path': '../dados/renda_fixa/BR/br_cri_inflation_proxy_CPTS11.csv' },
-    { 'id': 'br_gov_fixed', 'name': 'BR Gov Fixed Rate (IRFM11)', 'path': '../dados/renda_fixa/BR/br_gov_fixed_rate_IRFM11.csv' },
-    { 'id': 'br_deb_infra', 'name': 'BR Debêntures Infra (KDIF11)', 'path': '../dados/renda_fixa/BR/br_debentures_infra_KDIF11.csv' },
-    { 'id': 'br_gov_inf', 'name': 'BR Gov Inflation (IMAB11)', 'path': '../dados/renda_fixa/BR/br_gov_inflation_IMAB11.csv' },
-    { 'id': 'br_deb', 'name': 'BR Debêntures (DEBB11)', 'path': '../dados/renda_fixa/BR/br_debentures_DEBB11.csv' },
-    { 'id': 'br_cri_proxy', 'name': 'BR CRI Proxy (KNCR11)', 'path': '../dados/renda_fixa/BR/br_cri_proxy_KNCR11.csv' },
-    { 'id': 'selic', 'name': 'Selic Histórica', 'path': '../dados/renda_fixa/BR/selic_historica.csv' },
-    { 'id': 'silver', 'name': 'Prata (Silver)', 'path': '../dados/metais/silver_prata.csv' },
-    { 'id': 'gold', 'name': 'Ouro (Gold)', 'path': '../dados/metais/gold_ouro.csv' },
-    { 'id': 'usdt', 'name': 'Stablecoin (USDT)', 'path': '../dados/ativos_nao_tradicionais/CRIPTO/stable_usdt.csv' },
-    { 'id': 'art', 'name': 'Art Index (Artnet)', 'path': '../dados/ativos_nao_tradicionais/ARTE/art_index_artnet.csv' },
-    { 'id': 'usd_brl', 'name': 'USD/BRL', 'path': '../dados/cotacao/usd_brl_currency.csv' },
-    { 'id': 'eur_brl', 'name': 'EUR/BRL', 'path': '../dados/cotacao/eur_brl_currency.csv' },
-    { 'id': 'sp500', 'name': 'US S&P 500 (SPY)', 'path': '../dados/renda_variavel/US/us_sp500_SPY.csv' },
-    { 'id': 'ibovespa', 'name': 'BR Ibovespa (BOVA11)', 'path': '../dados/renda_variavel/BR/br_ibovespa_BOVA11.csv' }
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "dados", "codes"))
+from ativos import ATIVOS
+from painel import BRL_DIR, carregar_painel
+from taxas import ATIVO_SELIC, carregar_indice
+import instrumentacao
+
+# Static site build
+# Everything comes from the asset registry (dados/codes/ativos.py) plus the
+# derived series below:
+#   pages/<id>.html, js/config.js, dados/web/miniaturas/<id>.bin, dados/web/lod/<id>/
+# Series come from the BRL price panel (dados/codes/painel.py), already
+# validated at write time (qualidade.py), sorted and de-duplicated; the LFT
+# comes from the business-day Selic accrual index (dados/codes/taxas.py).
+# Each output is stored with a fingerprint of its inputs (source sha256 from
+# the panel manifest, registry entry, template, build parameters) in
+# .build/state.json; only outputs whose fingerprint changed are rebuilt, and
+# per-asset work runs in a thread pool. The panel only re-hashes a source CSV
+# when its (size, mtime) changes, so a no-op rebuild costs a stat() per asset.
+
+# Bump when the output format changes (invalidates every fingerprint)
+BUILD_VERSION = 2
+BUILD_DIR = os.path.join(ROOT, ".build")
+STATE_PATH = os.path.join(BUILD_DIR, "state.json")
+
+PAGES_DIR = os.path.join(ROOT, "pages")
+CONFIG_JS = os.path.join(ROOT, "js", "config.js")
+
+# Site series that are not CSVs of the registry. origem: which store serves
+# them (load_series); the page links the CSV they are derived from.
+DERIVED_ASSETS = [
+    {"nome": "lft", "id": "lft", "titulo": "LFT (Selic acumulada, DU/252)", "regiao": "Brasil",
+     "categoria": "Renda Fixa", "origem": "indice_selic", "pasta": "renda_fixa/BR", "fonte": ATIVO_SELIC},
 ]
 
+REGION_ORDER = ["EUA", "Brasil", "Ativos Não Tradicionais"]
+CATEGORY_ORDER = ["Renda Fixa", "Renda Variável", "Cotações", "Metais", "Cripto", "Arte"]
+
+def site_assets(registry=ATIVOS + DERIVED_ASSETS):
+    # Registry entries shown on the site, in page order (region, category)
+    assets = [
+        {
+            'id': a['id'],
+            'nome': a['nome'],
+            'name': a['titulo'],
+            'path': (f"../dados/{a['pasta']}/{a['fonte']}.csv" if "origem" in a
+                     else f"../dados/brl/{a['pasta']}/{a['nome']}.csv"),
+            'region': a['regiao'],
+            'category': a['categoria'],
+            **({'origem': a['origem']} if "origem" in a else {}),
+        }
+        for a in registry if "id" in a
+    ]
+    def order(asset):
+        region = REGION_ORDER.index(asset['region']) if asset['region'] in REGION_ORDER else len(REGION_ORDER)
+        category = CATEGORY_ORDER.index(asset['category']) if asset['category'] in CATEGORY_ORDER else len(CATEGORY_ORDER)
+        return region, category
+    return sorted(assets, key=order)
+
+ASSETS_CONFIG = site_assets()
+
 TEMPLATE = """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
@@ -30,7 +78,6 @@ TEMPLATE = """<!DOCTYPE html>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Baroque - {name}</title>
     <link rel="stylesheet" href="../css/style.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/PapaParse/5.3.0/papaparse.min.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/hammer.js/2.0.8/hammer.min.js"></script>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/chartjs-plugin-zoom/2.0.1/chartjs-plugin-zoom.min.js"></script>
@@ -103,29 +150,345 @@ TEMPLATE = """<!DOCTYPE html>
         // Inject configuration specific to this asset
         const CURRENT_ASSET_CONFIG = {{
             name: "{name}",
-            path: "{path}"
+            path: "{path}",
+            lod: "{lod}"
         }};
     </script>
+    <script src="../js/lod.js"></script>
     <script src="../js/render_chart.js"></script>
 </body>
 </html>
 """
 
-output_dir = "pages"
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+# Thumbnails for the overview page (pages/assets.html)
+# Every series is reduced to THUMBNAIL_POINTS points with LTTB
+# (Largest-Triangle-Three-Buckets), which keeps peaks, troughs and the overall
+# shape, and written to its own binary series file (about 2.4 KB). The page
+# (js/charts.js) only fetches the files of the cards that scroll into view, so
+# its first paint does not grow with the size of the catalogue.
+THUMBNAIL_POINTS = 300
+THUMBNAIL_DIR = os.path.join(ROOT, "dados", "web", "miniaturas")
+
+def lttb(x, y, n_out):
+    # Returns the indices of the n_out points kept (first and last always kept)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def load_series(asset, painel, indice=None):
+    # (days since 1970-01-01, values) of an asset's column in the BRL panel,
+    # or of the LFT accrual index (base 1 on its first business day)
+    if asset.get('origem') == "indice_selic":
+        return indice.datas.astype("datetime64[D]").astype(np.int64), np.asarray(indice.indice, dtype=float)
+    if asset['nome'] not in painel.colunas:
+        print(f"[SKIP] {asset['nome']} not in the panel")
+        return None
+    values = np.asarray(painel.coluna(asset['nome']), dtype=float)
+    valid = ~np.isnan(values)
+    days = painel.datas[valid].astype("datetime64[D]").astype(np.int64)
+    return days, values[valid]
+
+def write_json(path, obj):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, separators=(",", ":"))
+
+def thumbnail(days, values, n_points=THUMBNAIL_POINTS):
+    keep = lttb(days.astype(float), values, n_points)
+    return {
+        "t": days[keep],
+        "v": values[keep],
+        "n": int(len(values)),
+    }
+
+# Binary series files (.bin) for the front end: js/lod.js loads each one with a
+# single fetch into typed arrays, without text parsing or per-row objects.
+# Little-endian layout:
+#   header (16 bytes): magic b"BRQS" | uint16 version | uint16 columns | uint32 rows | uint32 reserved
+#   int32[rows]        days since 1970-01-01
+#   float32[rows]      once per value column (names and order in index.json)
+# Every block starts on a 4-byte boundary, so the browser views the buffer in
+# place (Int32Array/Float32Array) without copying. CSVs stay the human format.
+SERIES_MAGIC = b"BRQS"
+SERIES_VERSION = 1
+SERIES_HEADER = struct.Struct("<4sHHII")
+
+def encode_series(days, columns):
+    header = SERIES_HEADER.pack(SERIES_MAGIC, SERIES_VERSION, len(columns), len(days), 0)
+    blocks = [np.asarray(days, dtype="<i4").tobytes()]
+    blocks += [np.asarray(column, dtype="<f4").tobytes() for column in columns]
+    return header + b"".join(blocks)
+
+def decode_series(buffer):
+    # Inverse of encode_series: (days, [columns]) as read-only views of the buffer
+    magic, version, n_columns, n_rows, _ = SERIES_HEADER.unpack_from(buffer)
+    if magic != SERIES_MAGIC or version != SERIES_VERSION:
+        raise ValueError(f"not a series file (magic {magic!r}, version {version})")
+    offset = SERIES_HEADER.size
+    days = np.frombuffer(buffer, dtype="<i4", count=n_rows, offset=offset)
+    columns = [np.frombuffer(buffer, dtype="<f4", count=n_rows, offset=offset + 4 * n_rows * (k + 1))
+               for k in range(n_columns)]
+    return days, columns
+
+def write_series(path, days, columns):
+    with open(path, "wb") as f:
+        f.write(encode_series(days, columns))
+
+# Level-of-detail pyramid for the detail pages (js/lod.js)
+# dados/web/lod/<id>/index.json lists, from coarsest to finest, the levels, the
+# value columns of their .bin files and the files with the date range of each one:
+#   M - monthly buckets (last, min, max), one file
+#   W - weekly buckets (last, min, max), one file
+#   D - daily closes, one file per year
+# The charts open with the coarsest level and only fetch the files of the finer
+# level that cover the zoom/pan window. Data is already sorted and de-duplicated.
+LOD_DIR = os.path.join(ROOT, "dados", "web", "lod")
+LOD_LEVELS = [
+    {"nivel": "M", "bucket": "M", "chunk": None},
+    {"nivel": "W", "bucket": "W", "chunk": None},
+    {"nivel": "D", "bucket": None, "chunk": "Y"},
+]
+
+def bucket_keys(days, unit):
+    if unit == "W":
+        # 1970-01-01 was a Thursday: +3 makes the weeks start on Monday
+        return (days + 3) // 7
+    return days.astype("datetime64[D]").astype(f"datetime64[{unit}]").astype(np.int64)
+
+def group_bounds(keys):
+    # (start, end) of each run of equal keys (keys are sorted)
+    cuts = np.flatnonzero(np.diff(keys)) + 1
+    return np.r_[0, cuts], np.r_[cuts, len(keys)]
+
+def aggregate(days, values, unit):
+    # Bucket = last close (dated on its last trading day) plus min and max
+    starts, ends = group_bounds(bucket_keys(days, unit))
+    return {
+        "t": days[ends - 1],
+        "v": values[ends - 1],
+        "lo": np.minimum.reduceat(values, starts),
+        "hi": np.maximum.reduceat(values, starts),
+    }
+
+def write_lod(asset_dir, days, values):
+    # Rewrites the pyramid of one asset; returns the number of files written
+    shutil.rmtree(asset_dir, ignore_errors=True)
+    os.makedirs(asset_dir)
 
-for asset in ASSETS_CONFIG:
-    filename = f"{asset['id']}.html"
-    filepath = os.path.join(output_dir, filename)
-    
-    content = TEMPLATE.format(
+    levels, files = [], 0
+    for spec in LOD_LEVELS:
+        data = aggregate(days, values, spec["bucket"]) if spec["bucket"] else {"t": days, "v": values}
+        columns = [key for key in data if key != "t"]
+        if spec["chunk"]:
+            starts, ends = group_bounds(bucket_keys(data["t"], spec["chunk"]))
+        else:
+            starts, ends = np.array([0]), np.array([len(data["t"])])
+
+        chunks = []
+        for a, b in zip(starts, ends):
+            t = data["t"][a:b]
+            name = f"{spec['nivel']}.bin" if not spec["chunk"] else \
+                f"{spec['nivel']}_{t[0].astype('datetime64[D]').astype(object).year}.bin"
+            write_series(os.path.join(asset_dir, name), t, [data[key][a:b] for key in columns])
+            chunks.append({"arquivo": name, "inicio": int(t[0]), "fim": int(t[-1])})
+        levels.append({"nivel": spec["nivel"], "pontos": int(len(data["t"])), "colunas": columns,
+                       "arquivos": chunks})
+        files += len(chunks)
+
+    write_json(os.path.join(asset_dir, "index.json"),
+               {"inicio": int(days[0]), "fim": int(days[-1]), "niveis": levels})
+    return files + 1
+
+# --- Incremental build ---
+
+def fingerprint(*parts):
+    data = json.dumps([BUILD_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {"outputs": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def source_hash(asset, painel, indice=None):
+    # sha256 of the asset's source CSV, as recorded in the panel manifest;
+    # for the LFT, of the index itself (dates + values, a few KB)
+    if asset.get('origem') == "indice_selic":
+        return hashlib.sha256(indice.datas.tobytes() + indice.indice.tobytes()).hexdigest()
+    return painel.fontes.get(asset['nome'], {}).get("sha256")
+
+def lod_dir(asset):
+    return os.path.join(LOD_DIR, asset['id'])
+
+def page_file(asset):
+    return os.path.join(PAGES_DIR, f"{asset['id']}.html")
+
+def thumb_file(asset):
+    return os.path.join(THUMBNAIL_DIR, f"{asset['id']}.bin")
+
+def render_page(asset):
+    return TEMPLATE.format(
         name=asset['name'],
-        path=asset['path']
+        path=asset['path'],
+        lod=f"../{os.path.relpath(lod_dir(asset), ROOT)}/index.json".replace(os.sep, "/")
     )
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
+
+def render_config(assets):
+    lines = ["// Generated by generate_pages.py from dados/codes/ativos.py - do not edit by hand",
+             "const ASSETS_CONFIG = ["]
+    for i, asset in enumerate(assets):
+        entry = ", ".join(f"{key}: {json.dumps(asset[key], ensure_ascii=False)}"
+                          for key in ("id", "name", "path", "region", "category"))
+        lines.append(f"    {{ {entry} }}" + ("," if i < len(assets) - 1 else ""))
+    lines.append("];")
+    return "\n".join(lines) + "\n"
+
+def write_text(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
         f.write(content)
-    print(f"Created {filepath}")
+    os.replace(tmp, path)
+
+def build_asset(asset, jobs, painel, indice=None):
+    # jobs: subset of {"page", "lod", "thumb"} to rebuild for this asset
+    # Spans are summed over the worker threads, so they can add up to more than
+    # the wall time of the "assets" stage
+    done = []
+    if "page" in jobs:
+        with instrumentacao.etapa("asset/page"):
+            write_text(page_file(asset), render_page(asset))
+        done.append("page")
+    if "lod" in jobs or "thumb" in jobs:
+        with instrumentacao.etapa("asset/series"):
+            loaded = load_series(asset, painel, indice)
+        if loaded is None:
+            return done
+        days, values = loaded
+        if "lod" in jobs:
+            with instrumentacao.etapa("asset/lod"):
+                files = write_lod(lod_dir(asset), days, values)
+            instrumentacao.contar("lod_files", files)
+            done.append("lod")
+        if "thumb" in jobs:
+            with instrumentacao.etapa("asset/thumb"):
+                os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+                thumb = thumbnail(days, values)
+                write_series(thumb_file(asset), thumb["t"], [thumb["v"]])
+            done.append("thumb")
+    return done
+
+def remove_stale(state, assets):
+    # Outputs of assets that left the registry
+    ids = {a['id'] for a in assets}
+    for key in list(state["outputs"]):
+        kind, _, asset_id = key.partition(":")
+        if not asset_id or asset_id in ids:
+            continue
+        stale = {'id': asset_id}
+        if kind == "page" and os.path.exists(page_file(stale)):
+            os.remove(page_file(stale))
+        elif kind == "lod":
+            shutil.rmtree(lod_dir(stale), ignore_errors=True)
+        elif kind == "thumb" and os.path.exists(thumb_file(stale)):
+            os.remove(thumb_file(stale))
+        del state["outputs"][key]
+        print(f"Removed {key}")
+
+def build(assets=None, force=False, workers=4, painel=None):
+    start = time.perf_counter()
+    assets = ASSETS_CONFIG if assets is None else assets
+    with instrumentacao.etapa("panel"):
+        # Rebuilt here only if some BRL CSV changed
+        painel = carregar_painel(BRL_DIR) if painel is None else painel
+    indice = None
+    if any(a.get('origem') == "indice_selic" for a in assets):
+        with instrumentacao.etapa("selic_index"):
+            # Updated here only from the first new or revised Selic rate
+            indice = carregar_indice()
+    state = {"outputs": {}} if force else load_state(STATE_PATH)
+    state.pop("files", None)  # per-CSV hashes of older builds (now in the panel manifest)
+    outputs = state["outputs"]
+    remove_stale(state, assets)
+
+    # 1. Plan: which outputs of each asset are out of date
+    template_hash = fingerprint(TEMPLATE)
+    planned, new_prints = {}, {}
+    with instrumentacao.etapa("plan"):
+        for asset in assets:
+            source_sha = source_hash(asset, painel, indice)
+            prints = {
+                "page": (fingerprint(template_hash, asset), page_file(asset)),
+                "lod": (fingerprint(source_sha, LOD_LEVELS), os.path.join(lod_dir(asset), "index.json")),
+                "thumb": (fingerprint(source_sha, THUMBNAIL_POINTS), thumb_file(asset)),
+            }
+            if source_sha is None:
+                print(f"[SKIP] {asset['nome']} has no source series")
+                prints = {"page": prints["page"]}
+            jobs = {kind for kind, (fp, path) in prints.items()
+                    if outputs.get(f"{kind}:{asset['id']}") != fp or not os.path.exists(path)}
+            new_prints[asset['id']] = {kind: fp for kind, (fp, _) in prints.items()}
+            # Build cache: up-to-date outputs are hits, outputs to rebuild are misses
+            instrumentacao.cache("outputs", acertos=len(prints) - len(jobs), faltas=len(jobs))
+            if jobs:
+                planned[asset['id']] = (asset, jobs)
+
+    # 2. Per-asset outputs in parallel
+    counts = {"page": 0, "lod": 0, "thumb": 0}
+    if planned:
+        with instrumentacao.etapa("assets"), ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {asset_id: pool.submit(build_asset, asset, jobs, painel, indice)
+                       for asset_id, (asset, jobs) in planned.items()}
+            for asset_id, future in futures.items():
+                for kind in future.result():
+                    outputs[f"{kind}:{asset_id}"] = new_prints[asset_id][kind]
+                    counts[kind] += 1
+
+    # 3. Shared output: JS config
+    with instrumentacao.etapa("shared"):
+        write_shared(assets, outputs)
+
+    save_state(state, STATE_PATH)
+    for kind, n in counts.items():
+        instrumentacao.contar(f"rebuilt_{kind}", n)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Rebuilt {counts['page']} pages, {counts['lod']} LOD pyramids, {counts['thumb']} thumbnails "
+          f"({len(assets) - len(planned)} assets up to date) in {elapsed:.0f} ms")
+    return counts
+
+def write_shared(assets, outputs):
+    config = render_config(assets)
+    config_fp = fingerprint(config)
+    if outputs.get("config") != config_fp or not os.path.exists(CONFIG_JS):
+        write_text(CONFIG_JS, config)
+        outputs["config"] = config_fp
+        print(f"Created {os.path.relpath(CONFIG_JS, ROOT)}")
 
-print("All asset pages created successfully.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the static site from dados/codes/ativos.py")
+    parser.add_argument("--force", action="store_true", help="ignore the build state and rebuild everything")
+    parser.add_argument("--workers", type=int, default=4, help="threads for per-asset outputs")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    with instrumentacao.sessao("generate_pages", args.metricas, args.perfil):
+        build(force=args.force, workers=args.workers)
@@ -1,136 +1,199 @@
+// Overview page (pages/assets.html): one card per asset of js/config.js,
+// grouped by region and category. Cards are plain DOM; a card's thumbnail
+// (dados/web/miniaturas/<id>.bin, LTTB-downsampled by generate_pages.py) is
+// only fetched, and its Chart.js instance only created, when the card gets
+// close to the viewport. Fetching and decoding run in a Web Worker
+// (js/thumb_worker.js) with at most MAX_FETCHES requests in flight, so the
+// first paint does not depend on how many assets the catalogue has.
 document.addEventListener('DOMContentLoaded', () => {
-    const assets = [
-        { name: 'US Treasury Bond 7-10y (IEF)', path: '../dados/renda_fixa/US/us_treasury_bond_7_10y_IEF.csv' },
-        { name: 'US Treasury Bond 20y (TLT)', path: '../dados/renda_fixa/US/us_treasury_bond_20y_TLT.csv' },
-        { name: 'US Corp Bond Inv Grade (LQD)', path: '../dados/renda_fixa/US/us_corp_bond_inv_grade_LQD.csv' },
-        { name: 'US Corp Bond High Yield (HYG)', path: '../dados/renda_fixa/US/us_corp_bond_high_yield_HYG.csv' },
-        { name: 'US Treasury Bond 1-3y (SHY)', path: '../dados/renda_fixa/US/us_treasury_bond_1_3y_SHY.csv' },
-        { name: 'BR CRI Inflation Proxy (CPTS11)', path: '../dados/renda_fixa/BR/br_cri_inflation_proxy_CPTS11.csv' },
-        { name: 'BR Gov Fixed Rate (IRFM11)', path: '../dados/renda_fixa/BR/br_gov_fixed_rate_IRFM11.csv' },
-        { name: 'BR Debêntures Infra (KDIF11)', path: '../dados/renda_fixa/BR/br_debentures_infra_KDIF11.csv' },
-        { name: 'BR Gov Inflation (IMAB11)', path: '../dados/renda_fixa/BR/br_gov_inflation_IMAB11.csv' },
-        { name: 'BR Debêntures (DEBB11)', path: '../dados/renda_fixa/BR/br_debentures_DEBB11.csv' },
-        { name: 'BR CRI Proxy (KNCR11)', path: '../dados/renda_fixa/BR/br_cri_proxy_KNCR11.csv' },
-        { name: 'Selic Histórica', path: '../dados/renda_fixa/BR/selic_historica.csv' },
-        { name: 'Prata (Silver)', path: '../dados/metais/silver_prata.csv' },
-        { name: 'Ouro (Gold)', path: '../dados/metais/gold_ouro.csv' },
-        { name: 'Stablecoin (USDT)', path: '../dados/ativos_nao_tradicionais/CRIPTO/stable_usdt.csv' },
-        { name: 'Art Index (Artnet)', path: '../dados/ativos_nao_tradicionais/ARTE/art_index_artnet.csv' },
-        { name: 'USD/BRL', path: '../dados/cotacao/usd_brl_currency.csv' },
-        { name: 'EUR/BRL', path: '../dados/cotacao/eur_brl_currency.csv' },
-        { name: 'US S&P 500 (SPY)', path: '../dados/renda_variavel/US/us_sp500_SPY.csv' },
-        { name: 'BR Ibovespa (BOVA11)', path: '../dados/renda_variavel/BR/br_ibovespa_BOVA11.csv' }
-    ];
-
-    const grid = document.getElementById('charts-grid');
-
-    assets.forEach((asset, index) => {
-        // Create HTML structure for each chart
-        const card = document.createElement('article');
-        card.className = 'card';
-        
-        const title = document.createElement('h3');
-        title.textContent = asset.name;
-        card.appendChild(title);
-
-        const chartContainer = document.createElement('div');
-        chartContainer.className = 'chart-container';
-        
-        const canvas = document.createElement('canvas');
-        canvas.id = `chart-${index}`;
-        chartContainer.appendChild(canvas);
-        card.appendChild(chartContainer);
-        
-        grid.appendChild(card);
-
-        // Fetch and parse CSV
-        Papa.parse(asset.path, {
-            download: true,
-            header: true,
-            skipEmptyLines: true,
-            complete: function(results) {
-                createChart(canvas.id, results.data, asset.name);
-            },
-            error: function(err) {
-                console.error(`Error loading ${asset.name}:`, err);
-                chartContainer.innerHTML = '<p style="color:red; font-size: 0.8rem;">Erro ao carregar dados.</p>';
-            }
+    const MAX_FETCHES = 4;
+    const PRELOAD_MARGIN = '200px 0px'; // start loading slightly before a card is visible
+    const REGION_ORDER = ['Brasil', 'EUA', 'Ativos Não Tradicionais'];
+
+    const container = document.getElementById('assets-container');
+    const thumbUrl = id => new URL(`../dados/web/miniaturas/${id}.bin`, document.baseURI).href;
+
+    // --- Cards ---
+
+    // Group by Region then Category
+    const grouped = {};
+    ASSETS_CONFIG.forEach(asset => {
+        const region = asset.region || 'Outros';
+        const category = asset.category || 'Geral';
+        grouped[region] = grouped[region] || {};
+        grouped[region][category] = grouped[region][category] || [];
+        grouped[region][category].push(asset);
+    });
+    // Regions not in the list go last, in registry order
+    const regions = REGION_ORDER.concat(Object.keys(grouped).filter(r => !REGION_ORDER.includes(r)));
+
+    const canvases = new Map(); // asset id -> canvas
+    regions.forEach(region => {
+        if (!grouped[region]) return;
+        const regionSection = document.createElement('section');
+        regionSection.className = 'region-section';
+        const regionTitle = document.createElement('h2');
+        regionTitle.className = 'region-title';
+        regionTitle.textContent = region;
+        regionSection.appendChild(regionTitle);
+
+        Object.entries(grouped[region]).forEach(([category, assets]) => {
+            const categoryDiv = document.createElement('div');
+            categoryDiv.className = 'category-group';
+            const catTitle = document.createElement('h3');
+            catTitle.className = 'category-title';
+            catTitle.textContent = category;
+            categoryDiv.appendChild(catTitle);
+
+            const grid = document.createElement('div');
+            grid.className = 'grid';
+            assets.forEach(asset => {
+                const card = document.createElement('a');
+                card.href = `${asset.id}.html`;
+                card.className = 'card asset-link';
+                card.style.display = 'flex';
+                card.style.flexDirection = 'column';
+                card.style.justifyContent = 'space-between';
+
+                const title = document.createElement('h3');
+                title.textContent = asset.name;
+
+                // Fixed height: cards keep their size before the chart exists
+                const chartContainer = document.createElement('div');
+                chartContainer.style.height = '100px';
+                chartContainer.style.width = '100%';
+                chartContainer.style.marginTop = '1rem';
+                chartContainer.style.position = 'relative';
+                chartContainer.dataset.assetId = asset.id;
+
+                const canvas = document.createElement('canvas');
+                canvas.id = `mini-chart-${asset.id}`;
+                chartContainer.appendChild(canvas);
+                canvases.set(asset.id, canvas);
+
+                card.appendChild(title);
+                card.appendChild(chartContainer);
+                grid.appendChild(card);
+            });
+            categoryDiv.appendChild(grid);
+            regionSection.appendChild(categoryDiv);
         });
+        container.appendChild(regionSection);
     });
 
-    function createChart(canvasId, data, label) {
-        const ctx = document.getElementById(canvasId).getContext('2d');
-        
-        // Extract labels (Date) and data (Value - assume 2nd column)
-        // Check keys to find the value column (not 'Date')
-        if (data.length === 0) return;
-        
-        const keys = Object.keys(data[0]);
-        const dateKey = keys[0]; // Assuming first is Date
-        const valueKey = keys[1]; // Assuming second is Value
-
-        const labels = data.map(item => item[dateKey]);
-        const values = data.map(item => parseFloat(item[valueKey]));
-
-        // Calculate simple trend for color (Green if last > first)
-        const isPositive = values[values.length - 1] >= values[0];
-        // Minimalist colors: simple black or grey line, maybe green/red for trend only implicitly or subtle
-        // Request was minimalist. Black line is very minimalist.
-        const borderColor = '#800020'; 
-        
-        new Chart(ctx, {
+    // --- Thumbnail loading ---
+
+    // Decoding happens in the worker; without Worker support (or if it fails to
+    // start) the same fetch + decode runs here
+    let worker = null;
+    const callbacks = new Map();
+    try {
+        worker = new Worker('../js/thumb_worker.js');
+        worker.onmessage = event => {
+            const done = callbacks.get(event.data.id);
+            callbacks.delete(event.data.id);
+            if (done) done(event.data);
+        };
+        worker.onerror = () => {
+            // e.g. pages opened from file://: finish the pending requests here
+            worker = null;
+            const pending = Array.from(callbacks.entries());
+            callbacks.clear();
+            pending.forEach(([id, done]) => fetchOnMainThread(id).then(done));
+        };
+    } catch (err) {
+        worker = null;
+    }
+
+    function fetchOnMainThread(id) {
+        return fetch(thumbUrl(id))
+            .then(response => {
+                if (!response.ok) throw new Error(`${response.status} ${id}`);
+                return response.arrayBuffer();
+            })
+            .then(buffer => ({ id, ...SeriesLOD.decode(buffer, ['v']) }))
+            .catch(err => ({ id, error: String(err) }));
+    }
+
+    function fetchThumbnail(id) {
+        if (!worker) return fetchOnMainThread(id);
+        return new Promise(resolve => {
+            callbacks.set(id, resolve);
+            worker.postMessage({ id, url: thumbUrl(id) });
+        });
+    }
+
+    // Cards waiting for a fetch slot, in the order they came into view
+    const queue = [];
+    const started = new Set();
+    let inFlight = 0;
+
+    function pump() {
+        while (inFlight < MAX_FETCHES && queue.length > 0) {
+            const id = queue.shift();
+            started.add(id);
+            inFlight++;
+            fetchThumbnail(id).then(result => {
+                inFlight--;
+                if (result.error) {
+                    console.error('Error loading thumbnail', result.error);
+                } else {
+                    renderMiniChart(canvases.get(id), result);
+                }
+                pump();
+            });
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            const id = entry.target.dataset.assetId;
+            if (started.has(id)) return;
+            const queued = queue.indexOf(id);
+            if (entry.isIntersecting && queued < 0) {
+                queue.push(id);
+            } else if (!entry.isIntersecting && queued >= 0) {
+                // Scrolled past before its turn: free the slot for visible cards
+                queue.splice(queued, 1);
+            }
+        });
+        pump();
+    }, { rootMargin: PRELOAD_MARGIN });
+
+    canvases.forEach(canvas => observer.observe(canvas.parentElement));
+
+    function renderMiniChart(canvas, series) {
+        observer.unobserve(canvas.parentElement);
+        if (series.v.length === 0) return;
+
+        // x in days since 1970 (LTTB points are not evenly spaced)
+        const points = Array.from(series.t, (t, i) => ({ x: t, y: series.v[i] }));
+        new Chart(canvas.getContext('2d'), {
             type: 'line',
             data: {
-                labels: labels,
                 datasets: [{
-                    label: label,
-                    data: values,
-                    borderColor: borderColor,
-                    borderWidth: 1.5,
-                    pointRadius: 0, // Hide points for cleaner look
-                    pointHoverRadius: 4,
+                    data: points,
+                    borderColor: '#800020',
+                    borderWidth: 2,
+                    pointRadius: 0,
                     fill: false,
-                    tension: 0.1
+                    tension: 0.3
                 }]
             },
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                plugins: {
-                    legend: {
-                        display: false // Hide legend for minimalism
-                    },
-                    tooltip: {
-                        mode: 'index',
-                        intersect: false,
-                    }
-                },
+                parsing: false,
+                plugins: { legend: { display: false }, tooltip: { enabled: false } },
                 scales: {
-                    x: {
-                        display: false, // Hide x axis labels for cleaner look on small charts
-                        grid: {
-                            display: false
-                        }
-                    },
-                    y: {
-                        display: true,
-                        position: 'right', // Put axis on right
-                        grid: {
-                            color: '#f0f0f0'
-                        },
-                        ticks: {
-                            font: {
-                                size: 10,
-                                family: 'Helvetica'
-                            },
-                            color: '#999'
-                        }
-                    }
+                    x: { type: 'linear', display: false },
+                    y: { display: false }
                 },
-                interaction: {
-                    mode: 'nearest',
-                    axis: 'x',
-                    intersect: false
+                animation: false,
+                elements: {
+                    line: {
+                        borderJoinStyle: 'round'
+                    }
                 }
             }
         });
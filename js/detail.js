@@ -55,63 +55,83 @@ document.addEventListener('DOMContentLoaded', () => {
         lineType: 0, // Simple
     });
 
+    // Bucket max/min envelope (collapses onto the line at the daily level)
+    const envelopeOptions = {
+        color: 'rgba(128, 0, 32, 0.25)',
+        lineWidth: 1,
+        crosshairMarkerVisible: false,
+        lastValueVisible: false,
+        priceLineVisible: false,
+    };
+    const highSeries = chart.addLineSeries(envelopeOptions);
+    const lowSeries = chart.addLineSeries(envelopeOptions);
+
     // 4. Load Data
-    Papa.parse(assetConfig.path, {
-        download: true,
-        header: true,
-        skipEmptyLines: true,
-        complete: function(results) {
+    // LOD pyramid from generate_pages.py: already sorted and de-duplicated.
+    // Opens with the coarsest level and refines the visible window as the user
+    // zooms/scrolls. Times are days since 1970 -> UTC timestamps in seconds.
+    const DAY = 86400;
+    let lod = null;
+    let overview = null;
+    let shownKey = null;
+    let requestId = 0;
+    let refineTimer = null;
+
+    SeriesLOD.open(`../dados/web/lod/${assetId}/index.json`)
+        .then(opened => {
+            lod = opened;
+            return lod.overview();
+        })
+        .then(data => {
             document.getElementById('loading-msg').style.display = 'none';
-            const data = processData(results.data);
-            if (data && data.length > 0) {
-                series.setData(data);
-                chart.timeScale().fitContent();
-            } else {
+            if (data.t.length === 0) {
                 console.error("No valid data found.");
+                return;
             }
-        },
-        error: function(err) {
-            console.error("Error loading CSV:", err);
+            overview = data;
+            setData(data, 'overview');
+            chart.timeScale().fitContent();
+            chart.timeScale().subscribeVisibleTimeRangeChange(() => {
+                clearTimeout(refineTimer);
+                refineTimer = setTimeout(refine, 150);
+            });
+        })
+        .catch(err => {
+            console.error("Error loading data:", err);
             document.getElementById('loading-msg').textContent = 'Erro ao carregar dados.';
-        }
-    });
+        });
 
-    function processData(csvData) {
-        if (!csvData || csvData.length === 0) return [];
-        
-        const keys = Object.keys(csvData[0]);
-        // Expect Date is key[0], Value is key[1]
-        // Lightweight charts needs { time: 'yyyy-mm-dd', value: number }
-        
-        const mappedData = csvData.map(row => {
-            const dateStr = row[keys[0]];
-            const valStr = row[keys[1]];
-            
-            if (!dateStr || !valStr) return null;
-
-            // Ensure date is in YYYY-MM-DD format if possible, but lightweight charts is quite forgiving with proper ISO strings
-            // Our data seems to be YYYY-MM-DD from previous `read_file`.
-            
-            return {
-                time: dateStr,
-                value: parseFloat(valStr)
-            };
-        }).filter(item => item !== null && !isNaN(item.value));
-        
-        // Sort by time just in case
-        mappedData.sort((a, b) => (new Date(a.time) - new Date(b.time)));
+    function setData(data, key) {
+        // setData keeps bar indices, not dates: restore the visible dates afterwards
+        const visible = shownKey === null ? null : chart.timeScale().getVisibleRange();
+        shownKey = key;
+        series.setData(Array.from(data.t, (t, i) => ({ time: t * DAY, value: data.v[i] })));
+        highSeries.setData(Array.from(data.t, (t, i) => ({ time: t * DAY, value: data.hi[i] })));
+        lowSeries.setData(Array.from(data.t, (t, i) => ({ time: t * DAY, value: data.lo[i] })));
+        if (visible) chart.timeScale().setVisibleRange(visible);
+    }
 
-        // Remove duplicates on time (Lightweight charts throws error on duplicate time)
-        const uniqueData = [];
-        const seenTimes = new Set();
-        
-        for (const item of mappedData) {
-            if (!seenTimes.has(item.time)) {
-                seenTimes.add(item.time);
-                uniqueData.push(item);
-            }
+    function refine() {
+        const range = chart.timeScale().getVisibleRange();
+        if (!range) return;
+        const from = Math.floor(range.from / DAY);
+        const to = Math.ceil(range.to / DAY);
+        const level = lod.pickLevel(from, to);
+        if (level === lod.index.niveis[0]) {
+            if (shownKey !== 'overview') setData(overview, 'overview');
+            return;
         }
-
-        return uniqueData;
+        const current = ++requestId;
+        lod.window(from, to).then(fine => {
+            // Same level and files already on screen (e.g. the range change we caused)
+            const key = `${fine.nivel}:${fine.t[0]}:${fine.t[fine.t.length - 1]}`;
+            if (current !== requestId || key === shownKey) return;
+            // Keep the current fine data while the window stays inside it
+            if (shownKey && shownKey.startsWith(`${fine.nivel}:`)) {
+                const [, first, last] = shownKey.split(':').map(Number);
+                if (first <= from && last >= to) return;
+            }
+            setData(SeriesLOD.splice(overview, fine), key);
+        }).catch(err => console.error("Error loading detail:", err));
     }
 });
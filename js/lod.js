@@ -0,0 +1,134 @@
+// Level-of-detail loader for the pyramids written by generate_pages.py
+// (dados/web/lod/<id>/index.json). Times are days since 1970-01-01.
+// Levels are listed from coarsest to finest; each file is fetched at most once.
+// Files use the binary series layout of generate_pages.py (16-byte header,
+// int32 days, one float32 block per column) and are read straight into typed
+// arrays: series are { t: Int32Array, v, lo, hi: Float32Array }.
+const SeriesLOD = (() => {
+    const MAX_POINTS = 1500; // points we are willing to draw for the visible window
+    const MAGIC = 0x53515242; // "BRQS" read as a little-endian uint32
+    const VERSION = 1;
+    const HEADER_BYTES = 16;
+
+    // ArrayBuffer -> { t, <column>: ... } as views on the same buffer (no copy)
+    function decode(buffer, columns) {
+        const header = new DataView(buffer, 0, HEADER_BYTES);
+        if (header.getUint32(0, true) !== MAGIC || header.getUint16(4, true) !== VERSION) {
+            throw new Error('Not a series file');
+        }
+        const nColumns = header.getUint16(6, true);
+        const rows = header.getUint32(8, true);
+        const out = { t: new Int32Array(buffer, HEADER_BYTES, rows) };
+        for (let k = 0; k < nColumns; k++) {
+            out[columns[k]] = new Float32Array(buffer, HEADER_BYTES + 4 * rows * (k + 1), rows);
+        }
+        return out;
+    }
+
+    // First index with t[i] >= day (t is sorted)
+    function lowerBound(t, day) {
+        let lo = 0, hi = t.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (t[mid] < day) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    // Concatenates [start, end) slices of several series into new typed arrays
+    function concat(parts) {
+        const rows = parts.reduce((n, p) => n + p.end - p.start, 0);
+        const out = { t: new Int32Array(rows), v: new Float32Array(rows),
+                      lo: new Float32Array(rows), hi: new Float32Array(rows) };
+        let offset = 0;
+        parts.forEach(({ src, start, end }) => {
+            ['t', 'v', 'lo', 'hi'].forEach(key => out[key].set(src[key].subarray(start, end), offset));
+            offset += end - start;
+        });
+        return out;
+    }
+
+    function open(indexUrl) {
+        const baseUrl = indexUrl.slice(0, indexUrl.lastIndexOf('/') + 1);
+        const files = new Map();
+
+        function fetchFile(name, columns) {
+            if (!files.has(name)) {
+                files.set(name, fetch(baseUrl + name).then(response => {
+                    if (!response.ok) throw new Error(`${response.status} ${name}`);
+                    return response.arrayBuffer();
+                }).then(buffer => {
+                    const chunk = decode(buffer, columns);
+                    // Daily files have no envelope: it collapses onto the close
+                    chunk.lo = chunk.lo || chunk.v;
+                    chunk.hi = chunk.hi || chunk.v;
+                    return chunk;
+                }));
+            }
+            return files.get(name);
+        }
+
+        return fetch(indexUrl)
+            .then(response => {
+                if (!response.ok) throw new Error(`${response.status} ${indexUrl}`);
+                return response.json();
+            })
+            .then(index => {
+                const span = Math.max(1, index.fim - index.inicio);
+
+                // Finest level whose estimated point count in [from, to] fits the budget
+                function pickLevel(from, to) {
+                    const share = Math.min(1, Math.max(0, to - from) / span);
+                    let chosen = index.niveis[0];
+                    index.niveis.forEach(level => {
+                        if (level.pontos * share <= MAX_POINTS) chosen = level;
+                    });
+                    return chosen;
+                }
+
+                // Data of the level covering [from, to], clipped to the window
+                function load(level, from, to) {
+                    const needed = level.arquivos.filter(f => f.fim >= from && f.inicio <= to);
+                    return Promise.all(needed.map(f => fetchFile(f.arquivo, level.colunas))).then(chunks => {
+                        const out = concat(chunks.map(src => ({
+                            src, start: lowerBound(src.t, from), end: lowerBound(src.t, to + 1)
+                        })));
+                        out.nivel = level.nivel;
+                        return out;
+                    });
+                }
+
+                return {
+                    index,
+                    // Whole history at the coarsest level (first paint)
+                    overview: () => load(index.niveis[0], index.inicio, index.fim),
+                    pickLevel,
+                    // Finest affordable level for the window plus a margin on each side
+                    // (so short pans do not need a new request)
+                    window: (from, to) => {
+                        const margin = (to - from) * 0.5;
+                        const level = pickLevel(from, to);
+                        return load(level, from - margin, to + margin);
+                    }
+                };
+            });
+    }
+
+    // Coarse series outside [fine.t[0], fine.t[last]] + fine series inside
+    function splice(coarse, fine) {
+        if (fine.t.length === 0) return coarse;
+        const first = fine.t[0];
+        const last = fine.t[fine.t.length - 1];
+        return concat([
+            { src: coarse, start: 0, end: lowerBound(coarse.t, first) },
+            { src: fine, start: 0, end: fine.t.length },
+            { src: coarse, start: lowerBound(coarse.t, last + 1), end: coarse.t.length }
+        ]);
+    }
+
+    function toDateString(days) {
+        return new Date(days * 86400000).toISOString().slice(0, 10);
+    }
+
+    return { open, decode, splice, toDateString, MAX_POINTS };
+})();
@@ -15,16 +15,23 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // 2. Load Data
-    Papa.parse(assetConfig.path, {
-        download: true,
-        header: true,
-        skipEmptyLines: true,
-        complete: function(results) {
-            const loadingMsg = document.getElementById('loading-msg');
+    // Opens with the coarsest level of the LOD pyramid (whole history in one
+    // small file) and swaps in finer levels for the visible window on zoom/pan.
+    const loadingMsg = document.getElementById('loading-msg');
+    let lod = null;
+    let overview = null;
+    let chart = null;
+    let requestId = 0;
+
+    SeriesLOD.open(assetConfig.lod)
+        .then(opened => {
+            lod = opened;
+            return lod.overview();
+        })
+        .then(data => {
             if(loadingMsg) loadingMsg.style.display = 'none';
-            
-            const data = processData(results.data);
-            if (data.labels.length > 0) {
+            overview = data;
+            if (data.t.length > 0) {
                 createChart(data);
             } else {
                 console.error("No valid data found.");
@@ -33,45 +40,48 @@ document.addEventListener('DOMContentLoaded', () => {
                     loadingMsg.textContent = 'Dados insuficientes para exibir o gráfico.';
                 }
             }
-        },
-        error: function(err) {
-            console.error("Error loading CSV:", err);
-            const loadingMsg = document.getElementById('loading-msg');
+        })
+        .catch(err => {
+            console.error("Error loading data:", err);
             if(loadingMsg) {
                 loadingMsg.style.display = 'block';
                 loadingMsg.textContent = 'Erro ao carregar dados.';
             }
-        }
-    });
+        });
 
-    function processData(csvData) {
-        if (!csvData || csvData.length === 0) return { labels: [], values: [] };
-        
-        const keys = Object.keys(csvData[0]);
-        // Expecting first column Date, second column Value
-        
-        const labels = [];
-        const values = [];
+    function toPoints(data) {
+        // SeriesLOD returns typed arrays: Array.from, since .map would return a typed array
+        return {
+            last: Array.from(data.t, (t, i) => ({ x: t, y: data.v[i] })),
+            lo: Array.from(data.t, (t, i) => ({ x: t, y: data.lo[i] })),
+            hi: Array.from(data.t, (t, i) => ({ x: t, y: data.hi[i] }))
+        };
+    }
 
-        csvData.forEach(row => {
-            const dateStr = row[keys[0]];
-            const valStr = row[keys[1]];
-            
-            if (dateStr && valStr && !isNaN(parseFloat(valStr))) {
-                labels.push(dateStr);
-                values.push(parseFloat(valStr));
-            }
-        });
+    function setData(data) {
+        const points = toPoints(data);
+        chart.data.datasets[0].data = points.hi;
+        chart.data.datasets[1].data = points.lo;
+        chart.data.datasets[2].data = points.last;
+        chart.update('none');
+    }
 
-        return { labels, values };
+    function refine({ chart: c }) {
+        const from = Math.floor(c.scales.x.min);
+        const to = Math.ceil(c.scales.x.max);
+        const current = ++requestId;
+        if (lod.pickLevel(from, to) === lod.index.niveis[0]) {
+            setData(overview);
+            return;
+        }
+        lod.window(from, to).then(fine => {
+            // Drop answers that arrive after a newer zoom/pan
+            if (current === requestId) setData(SeriesLOD.splice(overview, fine));
+        }).catch(err => console.error("Error loading detail:", err));
     }
 
     function createChart(data) {
         // Need to create a canvas element inside the container because Chart.js needs a canvas context
-        // The container currently has <div id="chart"></div> which might not be a canvas depending on previous edits
-        // But generate_pages.py template has <div id="chart"></div>. Chart.js needs <canvas>.
-        // So we should replace the innerHTML or assume we can create one.
-        
         const container = document.getElementById('chart');
         
         // Clear container and add canvas
@@ -80,16 +90,29 @@ document.addEventListener('DOMContentLoaded', () => {
         container.appendChild(canvas);
         
         const ctx = canvas.getContext('2d');
+        const points = toPoints(data);
         
-        new Chart(ctx, {
+        chart = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: data.labels,
                 datasets: [{
+                    // Bucket max/min envelope (collapses onto the line at the daily level)
+                    data: points.hi,
+                    borderWidth: 0,
+                    pointRadius: 0,
+                    pointHitRadius: 0,
+                    fill: false
+                }, {
+                    data: points.lo,
+                    borderWidth: 0,
+                    pointRadius: 0,
+                    pointHitRadius: 0,
+                    backgroundColor: 'rgba(128, 0, 32, 0.1)', // Light Burgundy fill
+                    fill: '-1'
+                }, {
                     label: assetConfig.name,
-                    data: data.values,
+                    data: points.last,
                     borderColor: '#800020', // Borgonha
-                    backgroundColor: 'rgba(128, 0, 32, 0.1)', // Light Burgundy fill
                     borderWidth: 1.5,
                     pointRadius: 0, // Clean look
                     pointHoverRadius: 4,
@@ -100,6 +123,8 @@ document.addEventListener('DOMContentLoaded', () => {
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
+                parsing: false,
+                animation: false,
                 plugins: {
                     legend: {
                         display: false
@@ -107,6 +132,10 @@ document.addEventListener('DOMContentLoaded', () => {
                     tooltip: {
                         mode: 'index',
                         intersect: false,
+                        filter: item => item.datasetIndex === 2,
+                        callbacks: {
+                            title: items => items.length ? SeriesLOD.toDateString(items[0].parsed.x) : ''
+                        },
                         backgroundColor: '#fff',
                         titleColor: '#1a1a1a',
                         bodyColor: '#1a1a1a',
@@ -123,20 +152,29 @@ document.addEventListener('DOMContentLoaded', () => {
                                 enabled: true
                             },
                             mode: 'x', // Zoom mainly in time
+                            onZoomComplete: refine
                         },
                         pan: {
                             enabled: true,
                             mode: 'x',
+                            onPanComplete: refine
+                        },
+                        limits: {
+                            x: { min: lod.index.inicio, max: lod.index.fim, minRange: 14 }
                         }
                     }
                 },
                 scales: {
                     x: {
+                        type: 'linear', // days since 1970-01-01
+                        min: lod.index.inicio,
+                        max: lod.index.fim,
                         grid: {
                             display: false
                         },
                         ticks: {
                             maxTicksLimit: 8,
+                            callback: value => SeriesLOD.toDateString(value),
                             color: '#999',
                             font: {
                                 family: 'Helvetica'
@@ -0,0 +1,18 @@
+// Fetches and decodes overview thumbnails off the main thread (js/charts.js).
+// Message in: { id, url }. Message out: { id, t, v } with the typed arrays'
+// buffer transferred (no copy), or { id, error }.
+importScripts('lod.js');
+
+self.onmessage = event => {
+    const { id, url } = event.data;
+    fetch(url)
+        .then(response => {
+            if (!response.ok) throw new Error(`${response.status} ${url}`);
+            return response.arrayBuffer();
+        })
+        .then(buffer => {
+            const series = SeriesLOD.decode(buffer, ['v']);
+            self.postMessage({ id, t: series.t, v: series.v }, [buffer]);
+        })
+        .catch(err => self.postMessage({ id, error: String(err) }));
+};
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from cla import FronteiraCLA
+from estatisticas import EstatisticaExpansiva, empilhar
+from fatores import estimar_fatores, estimar_pca
+from nuvem import simular_nuvem
+from otimizacao import ObjetivosCarteira
+
+# Modelo de alocação (Markowitz com a LFT como ativo volátil), sem efeitos
+# colaterais: recebe os log-retornos (carga.carregar_retornos), devolve um dicionário com estatísticas,
+# carteiras ótimas e fronteira. Gráficos e impressão ficam em relatorio.py.
+
+VOL_ALVO_PADRAO = 0.05
+LIMITES_PESOS = (0, 1)
+# Entra na chave do cache de resultados: incremente ao mudar o cálculo
+VERSAO_MODELO = 2
+
+
+def estatisticas_retornos(retornos):
+    # Estatísticas anualizadas dos log-retornos (datas x ativos, sem NaN)
+    cov_matrix = retornos.cov() * 252
+    ret_mean = retornos.mean() * 252
+    return ret_mean, cov_matrix
+
+
+def modelo_risco(retornos, fatores):
+    # fatores: int -> k componentes principais; DataFrame -> log-retornos dos
+    # fatores nomeados (ações, juros, câmbio, ouro...), regressão dos retornos neles
+    if isinstance(fatores, pd.DataFrame):
+        return estimar_fatores(retornos, fatores)
+    return estimar_pca(retornos, int(fatores))
+
+
+def otimizar_carteiras(ret_mean, cov_matrix, risk_free_rate, target_vol=VOL_ALVO_PADRAO, n_pontos=50):
+    # Estatísticas sobre arrays NumPy (ver otimizacao.py). cov_matrix pode ser
+    # o DataFrame denso ou um ModeloFatores (fatores.py, O(N·k) em tudo abaixo)
+    sigma = cov_matrix.values if isinstance(cov_matrix, pd.DataFrame) else cov_matrix
+    objetivos = ObjetivosCarteira(ret_mean.values, sigma, risk_free_rate)
+    get_stats = objetivos.stats
+
+    # Fronteira exata pelo Critical Line Algorithm (ver cla.py): uma única passada
+    # devolve todos os portfólios de canto (long-only, pesos entre 0 e 1) e os
+    # pontos abaixo são interpolados exatamente entre eles, sem SLSQP por ponto.
+    fronteira = FronteiraCLA(ret_mean.values, sigma)
+
+    # A. Carteira de Mínima Volatilidade Global
+    w_min_vol = fronteira.min_volatility()
+
+    # B. Carteira de Máximo Sharpe (usando a média da Selic como benchmark fixo)
+    w_max_sharpe = fronteira.max_sharpe(risk_free_rate)
+
+    # C. Carteira (Alvo de Volatilidade Específico na Curva)
+    # Ao invés de usar a reta CML, buscamos o ponto na FRONTEIRA com Vol = alvo.
+    # Maior retorno dado o risco alvo (None se o alvo estiver fora da fronteira);
+    # fallback: mínima volatilidade se o alvo for inatingível
+    w_alvo = fronteira.pesos_para_volatilidade(target_vol)
+    alvo_atingido = w_alvo is not None
+    if not alvo_atingido:
+        w_alvo = w_min_vol
+
+    # D. Contorno da Fronteira Eficiente (Matemático), do mínimo global até o
+    # ativo de maior retorno. Cada ponto é uma combinação de dois cantos do CLA.
+    ret_min = get_stats(w_min_vol)[0]
+    target_rets = np.linspace(ret_min, max(ret_mean), n_pontos)
+    vols_front, pesos_front = fronteira.curva(target_rets)
+
+    return {
+        'tickers': list(ret_mean.index),
+        'risk_free_rate': risk_free_rate,
+        'target_vol': target_vol,
+        'alvo_atingido': alvo_atingido,
+        'carteiras': {
+            'min_vol': (w_min_vol, get_stats(w_min_vol)),
+            'max_sharpe': (w_max_sharpe, get_stats(w_max_sharpe)),
+            'alvo': (w_alvo, get_stats(w_alvo)),
+        },
+        'n_cantos': len(fronteira.cantos),
+        'fronteira': {'rets': target_rets, 'vols': vols_front, 'pesos': pesos_front},
+    }
+
+
+def volatilidade_expansiva(retornos, pesos):
+    # Volatilidade expansiva em fluxo (ver estatisticas.py): uma passada atualiza
+    # a covariância completa a cada dia, sem recalcular o histórico.
+    # Devolve (vol por ativo, vol da carteira sqrt(wᵀ Σ_t w)) em cada data
+    estat = empilhar(EstatisticaExpansiva(retornos.shape[1]), retornos)
+    vol_ativos = pd.DataFrame(estat['vol'], index=retornos.index, columns=retornos.columns)
+    vol_carteira = pd.Series(np.sqrt(np.einsum('i,tij,j->t', pesos, estat['cov'], pesos)),
+                             index=retornos.index)
+    return vol_ativos, vol_carteira
+
+
+def nuvem_aleatoria(ret_mean, cov_matrix, risk_free_rate, n_simulacoes=30000, seed=42):
+    # Simulação de Monte Carlo para visualizar a "nuvem"
+    # Vetorizada em blocos (ver nuvem.py): mesmos resultados do laço antigo com seed 42
+    return simular_nuvem(ret_mean, cov_matrix, risk_free_rate, n_portfolios=n_simulacoes, seed=seed)
+
+
+def chave_resultado(cache, retornos, risk_free_rate, target_vol=VOL_ALVO_PADRAO, n_pontos=50, fatores=None):
+    # Impressão digital das entradas: a matriz de retornos (datas e ativos, logo
+    # a janela), restrições, vol alvo, taxa livre de risco, modelo
+    # de risco e versão
+    return cache.chave(retornos=retornos, risk_free_rate=float(risk_free_rate), target_vol=float(target_vol),
+                       n_pontos=int(n_pontos), limites=LIMITES_PESOS, fatores=fatores, versao=VERSAO_MODELO)
+
+
+def alocar(retornos, risk_free_rate, target_vol=VOL_ALVO_PADRAO, n_pontos=50, cache=None, fatores=None):
+    # Pipeline completo: estatísticas + carteiras ótimas + fronteira
+    # Com cache (ver cache_resultados.py), entradas repetidas não recalculam nada.
+    # Com fatores (ver modelo_risco), a otimização usa Σ = B F Bᵀ + D; a matriz
+    # amostral continua em 'cov_matrix' para o relatório.
+    if cache is not None:
+        chave = chave_resultado(cache, retornos, risk_free_rate, target_vol, n_pontos, fatores)
+        resultado = cache.obter(chave)
+        if resultado is not None:
+            return resultado
+
+    ret_mean, cov_matrix = estatisticas_retornos(retornos)
+    risco = cov_matrix if fatores is None else modelo_risco(retornos, fatores)
+    resultado = otimizar_carteiras(ret_mean, risco, risk_free_rate, target_vol, n_pontos)
+    resultado.update({
+        'retornos': retornos,
+        'ret_mean': ret_mean,
+        'cov_matrix': cov_matrix,
+        'correl_matrix': retornos.corr(),
+        'modelo_risco': None if fatores is None else risco,
+    })
+    if cache is not None:
+        cache.guardar(chave, resultado, ativos=resultado['tickers'])
+    return resultado
@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+import argparse
+import time
+import os
+import sys
+
+# Camada de dados compartilhada (dados/codes)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'dados', 'codes'))
+from painel import DADOS_DIR, BRL_DIR
+from retornos import FATOR_ANUAL, PERIODICIDADES, carregar_cubo
+from taxas import carregar_indice
+import instrumentacao
+from estatisticas import EstatisticaExpansiva, EstatisticaJanela
+from otimizacao import ObjetivosCarteira, otimizar
+from risco import avaliar_series
+
+# Backtest walk-forward
+# Em vez de otimizar uma vez com a amostra inteira (e aplicar esses pesos ao
+# próprio histórico), a cada `frequencia` observações:
+#   1. as estatísticas (janela móvel ou expansiva) já estão atualizadas em
+#      fluxo, em O(N²) por dia (estatisticas.py);
+#   2. min vol, max Sharpe e vol alvo são reotimizados (SLSQP com gradiente
+#      analítico) partindo dos pesos da otimização anterior (warm start);
+#   3. os novos pesos valem a partir do dia seguinte e derivam com os preços
+#      até o próximo rebalanceamento.
+# Não há look-ahead: os pesos escolhidos no fechamento de t só usam dados até t.
+
+# Ordem importa: vol_alvo usa a carteira de mínima vol já reotimizada
+CARTEIRAS = ('min_vol', 'max_sharpe', 'vol_alvo')
+
+
+def _otimizar_carteira(objetivos, restricoes, nome, x0):
+    if nome == 'min_vol':
+        return otimizar(objetivos, objetivos.min_volatility, x0, restricoes['soma'])
+    if nome == 'max_sharpe':
+        return otimizar(objetivos, objetivos.neg_sharpe, x0, restricoes['soma'])
+    # Máximo retorno com vol <= alvo
+    return otimizar(objetivos, objetivos.neg_return, x0, restricoes['vol_alvo'])
+
+
+def _vol_alvo_trivial(objetivos, vol_alvo, pesos_min_vol):
+    # Casos sem solver: alvo abaixo da vol mínima (inviável -> carteira de
+    # mínima vol, como no script principal) ou acima da vol do ativo de maior
+    # retorno (a restrição não amarra -> 100% nesse ativo). None = resolver.
+    if pesos_min_vol is not None and objetivos.stats(pesos_min_vol)[1] >= vol_alvo:
+        return pesos_min_vol
+    melhor = np.argmax(objetivos.mu)
+    if np.sqrt(objetivos.sigma[melhor, melhor]) <= vol_alvo:
+        return np.eye(objetivos.num_ativos)[melhor]
+    return None
+
+
+def _carregar_periodo(pesos, simples):
+    # Aplica os pesos-alvo no início do período e deixa a carteira derivar.
+    # simples: (k, N) retornos simples do período. Devolve os k retornos diários
+    # da carteira e os pesos no fim do período (antes do próximo rebalanceamento).
+    crescimento = np.cumprod(1 + simples, axis=0)
+    valor = crescimento @ pesos
+    ret = valor / np.concatenate(([1.0], valor[:-1])) - 1
+    return ret, pesos * crescimento[-1] / valor[-1]
+
+
+def walk_forward(retornos, janela=None, frequencia=21, min_obs=None, risk_free_rate=0.0,
+                 vol_alvo=0.05, carteiras=CARTEIRAS, fator_anual=252):
+    # retornos: DataFrame de log-retornos (datas x ativos), na periodicidade de fator_anual
+    # janela: None = expansiva; int = janela móvel com esse número de observações
+    # frequencia: rebalanceia a cada `frequencia` observações (1 = diário)
+    # min_obs: observações antes do primeiro rebalanceamento (padrão: janela ou 252)
+    datas = retornos.index
+    valores = retornos.to_numpy(dtype=float)
+    T, N = valores.shape
+    if min_obs is None:
+        min_obs = janela or fator_anual
+
+    if janela is None:
+        estimador = EstatisticaExpansiva(N, fator_anual)
+    else:
+        estimador = EstatisticaJanela(N, janela, fator_anual)
+
+    # Restrições criadas uma vez: leem μ/Σ de `objetivos`, atualizados no lugar
+    objetivos = ObjetivosCarteira(np.zeros(N), np.eye(N), risk_free_rate)
+    restricoes = {
+        'soma': [objetivos.restricao_soma()],
+        'vol_alvo': [objetivos.restricao_soma(), objetivos.restricao_vol_maxima(vol_alvo)],
+    }
+
+    simples = np.nan_to_num(np.expm1(valores))
+    alvo = {nome: np.ones(N) / N for nome in carteiras}
+    atuais = {nome: None for nome in carteiras}
+    ret_carteira = {nome: np.full(T, np.nan) for nome in carteiras}
+    historico = {nome: [] for nome in carteiras}
+    giro = {nome: [] for nome in carteiras}
+    falhas = {nome: 0 for nome in carteiras}
+    iteracoes = {nome: 0 for nome in carteiras}
+    datas_rebal = []
+    tempo_solver = 0.0
+
+    inicio = time.perf_counter()
+    for t in range(T):
+        estimador.atualizar(valores[t])
+        if t + 1 < min_obs or (t + 1 - min_obs) % frequencia or t == T - 1:
+            continue
+
+        cov = estimador.covariancia()
+        mu = estimador.media()
+        if np.isnan(cov).any() or np.isnan(mu).any():
+            continue
+        objetivos.atualizar(mu, cov)
+
+        t0 = time.perf_counter()
+        for nome in carteiras:
+            if nome == 'vol_alvo':
+                pesos = _vol_alvo_trivial(objetivos, vol_alvo, alvo.get('min_vol'))
+                if pesos is not None:
+                    alvo[nome] = pesos
+                    instrumentacao.contar("vol_alvo_sem_solver")
+                    continue
+            res = _otimizar_carteira(objetivos, restricoes, nome, alvo[nome])
+            instrumentacao.solver(f"slsqp/{nome}", res)
+            iteracoes[nome] += res.nit
+            pesos = np.clip(res.x, 0, 1)
+            if not res.success:
+                falhas[nome] += 1
+                pesos = alvo[nome]
+            alvo[nome] = pesos / pesos.sum()
+        tempo_solver += time.perf_counter() - t0
+
+        # Carrega os pesos de t+1 até o próximo rebalanceamento
+        fim = min(t + 1 + frequencia, T)
+        datas_rebal.append(datas[t])
+        for nome in carteiras:
+            anterior = atuais[nome]
+            giro[nome].append(np.abs(alvo[nome] - anterior).sum() if anterior is not None else 0.0)
+            historico[nome].append(alvo[nome])
+            ret, atuais[nome] = _carregar_periodo(alvo[nome], simples[t + 1:fim])
+            ret_carteira[nome][t + 1:fim] = ret
+    segundos = time.perf_counter() - inicio
+
+    n_rebal = len(datas_rebal)
+    indice_rebal = pd.DatetimeIndex(datas_rebal) if isinstance(datas, pd.DatetimeIndex) else datas_rebal
+    return {
+        'retornos': pd.DataFrame(ret_carteira, index=datas).dropna(how='all'),
+        'pesos': {nome: pd.DataFrame(historico[nome], index=indice_rebal, columns=retornos.columns)
+                  for nome in carteiras},
+        'giro': pd.DataFrame(giro, index=indice_rebal),
+        'stats': {
+            'rebalanceamentos': n_rebal,
+            'segundos': segundos,
+            'segundos_solver': tempo_solver,
+            'rebal_por_segundo': n_rebal / segundos if segundos > 0 else float('inf'),
+            'iteracoes': iteracoes,
+            'falhas': falhas,
+        },
+    }
+
+
+def resumo(resultado, fator_anual=252, risk_free_rate=0.0):
+    # Retorno/vol anualizados, Sharpe e Sortino sobre a mesma taxa livre de
+    # risco da otimização, giro médio e o risco histórico (VaR/CVaR por
+    # período, max drawdown e duração, ver risco.py)
+    retornos = resultado['retornos'].dropna()
+    linhas = {}
+    for nome, ret in retornos.items():
+        anos = len(ret) / fator_anual
+        cagr = (1 + ret).prod() ** (1 / anos) - 1
+        vol = ret.std() * np.sqrt(fator_anual)
+        linhas[nome] = {
+            'retorno_aa': cagr,
+            'vol_aa': vol,
+            'sharpe': (ret.mean() * fator_anual - risk_free_rate) / vol,
+            'giro_medio': resultado['giro'][nome].mean(),
+        }
+    risco = avaliar_series(retornos, risk_free_rate=risk_free_rate, fator_anual=fator_anual)
+    return pd.DataFrame(linhas).T.join(risco)
+
+
+def executar(args):
+    with instrumentacao.etapa("carregar"):
+        # Retornos prontos do cubo (dados/codes/retornos.py), nas datas comuns aos ativos
+        cubo = carregar_cubo(BRL_DIR if args.brl else DADOS_DIR)
+        retornos = cubo.alinhados(args.ativos, args.periodicidade, "log")
+    fator_anual = FATOR_ANUAL[args.periodicidade]
+    print(f"{len(retornos)} observações de {retornos.index[0]:%Y-%m-%d} a {retornos.index[-1]:%Y-%m-%d}")
+
+    if args.rf == "selic":
+        # Selic efetiva do período, do índice acumulado em dias úteis (O(1))
+        rf = carregar_indice().taxa_anual(retornos.index[0], retornos.index[-1])
+        print(f"Taxa livre de risco (Selic no período): {rf:.2%} a.a.")
+    else:
+        rf = float(args.rf)
+
+    with instrumentacao.etapa("walk_forward"):
+        resultado = walk_forward(retornos, janela=args.janela or None, frequencia=args.frequencia,
+                                 risk_free_rate=rf, vol_alvo=args.vol_alvo, fator_anual=fator_anual)
+
+    s = resultado['stats']
+    print(f"\n{s['rebalanceamentos']} rebalanceamentos em {s['segundos']:.2f}s "
+          f"({s['rebal_por_segundo']:.0f} rebal/s, solver {s['segundos_solver']:.2f}s)")
+    print(f"Iterações SLSQP: {s['iteracoes']} | falhas: {s['falhas']}")
+    print("\n--- Desempenho fora da amostra ---")
+    print(resumo(resultado, fator_anual, rf).to_string(float_format=lambda x: f"{x:.4f}"))
+    print("\n--- Últimos pesos ---")
+    for nome, pesos in resultado['pesos'].items():
+        print(f"{nome}: " + ", ".join(f"{c}={p:.1%}" for c, p in pesos.iloc[-1].items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest walk-forward das carteiras de Markowitz")
+    parser.add_argument("ativos", nargs="*",
+                        default=["us_sp500_SPY", "us_treasury_bond_20y_TLT", "gold_ouro"])
+    parser.add_argument("--janela", type=int, default=0, help="janela móvel em observações (0 = expansiva)")
+    parser.add_argument("--frequencia", type=int, default=21, help="rebalanceia a cada N observações")
+    parser.add_argument("--periodicidade", choices=PERIODICIDADES, default="D",
+                        help="retornos diários, semanais ou mensais")
+    parser.add_argument("--vol-alvo", type=float, default=0.10)
+    parser.add_argument("--rf", default="0", help="taxa livre de risco anual, ou 'selic' (acumulada no período)")
+    parser.add_argument("--brl", action="store_true", help="usa a camada BRL (dados/brl) em vez da moeda de origem")
+    instrumentacao.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    with instrumentacao.sessao("backtest", args.metricas, args.perfil):
+        executar(args)
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Cache em disco dos resultados do modelo (pesos, estatísticas, fronteira)
+# A chave é uma impressão digital (sha256) das entradas: matriz de preços
+# (datas, ativos e valores -> janela e retornos), restrições, vol alvo, etc.
+# Cada entrada é um pickle em <pasta>/<chave>.pkl; o índice <pasta>/indice.json
+# guarda tamanho, último acesso e os ativos de cada entrada, para o despejo LRU
+# (limite de bytes) e para invalidar por ativo.
+
+PASTA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache', 'resultados')
+LIMITE_PADRAO = 64 * 1024 * 1024
+ARQ_INDICE = 'indice.json'
+
+
+def atualizar_hash(h, obj):
+    # Hash estável de arrays, DataFrames/Series, dicts, listas e escalares
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        atualizar_hash(h, obj.to_numpy())
+        atualizar_hash(h, obj.index.astype(str).tolist())
+        if isinstance(obj, pd.DataFrame):
+            atualizar_hash(h, obj.columns.astype(str).tolist())
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"{arr.dtype}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    elif isinstance(obj, dict):
+        for chave in sorted(obj):
+            h.update(repr(chave).encode())
+            atualizar_hash(h, obj[chave])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            atualizar_hash(h, item)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode())
+
+
+def impressao_digital(**partes):
+    h = hashlib.sha256()
+    atualizar_hash(h, partes)
+    return h.hexdigest()
+
+
+class CacheResultados:
+    def __init__(self, pasta=PASTA_PADRAO, limite_bytes=LIMITE_PADRAO):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        os.makedirs(pasta, exist_ok=True)
+        self._indice = self._ler_indice()
+
+    chave = staticmethod(impressao_digital)
+
+    def _arquivo(self, chave):
+        return os.path.join(self.pasta, f"{chave}.pkl")
+
+    def _ler_indice(self):
+        caminho = os.path.join(self.pasta, ARQ_INDICE)
+        if not os.path.exists(caminho):
+            return {}
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _gravar_indice(self):
+        caminho = os.path.join(self.pasta, ARQ_INDICE)
+        tmp = caminho + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._indice, f, indent=1, sort_keys=True)
+        os.replace(tmp, caminho)
+
+    def obter(self, chave):
+        # Devolve o valor guardado ou None (e marca o acesso para o LRU)
+        caminho = self._arquivo(chave)
+        if chave not in self._indice or not os.path.exists(caminho):
+            self.faltas += 1
+            return None
+        with open(caminho, 'rb') as f:
+            valor = pickle.load(f)
+        self._indice[chave]['acesso'] = time.time()
+        self._gravar_indice()
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave, valor, ativos=()):
+        caminho = self._arquivo(chave)
+        tmp = caminho + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, caminho)
+        agora = time.time()
+        self._indice[chave] = {
+            'bytes': os.path.getsize(caminho),
+            'criado': agora,
+            'acesso': agora,
+            'ativos': list(ativos),
+        }
+        self._despejar()
+        self._gravar_indice()
+
+    def _despejar(self):
+        # LRU: remove as entradas menos acessadas até caber no limite
+        total = sum(e['bytes'] for e in self._indice.values())
+        for chave in sorted(self._indice, key=lambda c: self._indice[c]['acesso']):
+            if total <= self.limite_bytes:
+                break
+            total -= self._indice[chave]['bytes']
+            self._remover(chave)
+
+    def _remover(self, chave):
+        self._indice.pop(chave, None)
+        caminho = self._arquivo(chave)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    # --- Invalidação ---
+
+    def invalidar(self, chave=None, ativos=None):
+        # chave: remove uma entrada; ativos: remove as que usam algum desses ativos;
+        # sem argumentos: esvazia o cache. Devolve o número de entradas removidas.
+        if chave is not None:
+            alvo = [chave] if chave in self._indice else []
+        elif ativos is not None:
+            ativos = set(ativos)
+            alvo = [c for c, e in self._indice.items() if ativos & set(e['ativos'])]
+        else:
+            alvo = list(self._indice)
+        for c in alvo:
+            self._remover(c)
+        self._gravar_indice()
+        return len(alvo)
+
+    def tamanho(self):
+        return len(self._indice), sum(e['bytes'] for e in self._indice.values())
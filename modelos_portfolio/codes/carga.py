@@ -0,0 +1,73 @@
+import os
+import sys
+
+# Camada de dados compartilhada (dados/codes)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'dados', 'codes'))
+import numpy as np
+from painel import BRL_DIR
+from retornos import carregar_cubo
+from taxas import carregar_indice
+
+# Carga dos dados do modelo de alocação: log-retornos dos ativos de risco em
+# BRL do cubo pré-calculado (dados/codes/retornos.py) + LFT do índice
+# acumulado da Selic (dados/codes/taxas.py) nas mesmas datas, tudo sem rede,
+# sem reler CSVs e sem recalcular retornos a partir de preços.
+
+# IVVB11 não está em dados/; o SPY em BRL faz o papel do S&P 500 em reais
+ATIVOS_RISCO = ['br_ibovespa_BOVA11', 'br_gov_inflation_IMAB11', 'us_sp500_SPY']
+INICIO_PADRAO = '2020-01-01'
+
+# Fatores nomeados do modelo de risco (alocacao.modelo_risco), já em BRL
+FATORES_NOMEADOS = {
+    'acoes': 'us_sp500_SPY',
+    'juros': 'br_gov_fixed_rate_IRFM11',
+    'cambio': 'usd_brl_currency',
+    'ouro': 'gold_ouro',
+}
+
+
+def abrir_cubo(base_path=BRL_DIR):
+    # Cubo de retornos da camada BRL (dados/brl, gerada por dados/codes/conversao.py)
+    return carregar_cubo(base_path)
+
+
+def carregar_lft(indice=None, inicio=None):
+    # LFT = índice acumulado da Selic em dias úteis (DU/252, calendário ANBIMA),
+    # pré-calculado em dados/taxas/. Taxa livre de risco de referência: média
+    # dos rendimentos diários da LFT desde `inicio`, anualizada
+    if indice is None:
+        indice = carregar_indice()
+    risk_free_rate_ref = indice.retornos_diarios(inicio).mean() * 252
+    return indice.serie(nome='LFT'), risk_free_rate_ref
+
+
+def retornos_lft(indice, datas):
+    # Log-retorno da LFT entre datas consecutivas: log da razão dos índices
+    return np.diff(np.log(indice.valor(datas)))
+
+
+def carregar_retornos(cubo=None, ativos_risco=ATIVOS_RISCO, inicio=INICIO_PADRAO, indice=None):
+    # Devolve (retornos, risk_free_rate_ref): log-retornos diários dos ativos de
+    # risco nas datas em que todos cotam (Cubo.alinhados) + coluna LFT com o
+    # rendimento do índice entre cada uma dessas datas e a anterior. Datas
+    # depois do fim do índice ficam de fora, como no inner join com a LFT.
+    if cubo is None:
+        cubo = abrir_cubo()
+    if indice is None:
+        indice = carregar_indice()
+    _, risk_free_rate_ref = carregar_lft(indice, inicio)
+
+    fim = indice.datas[-1]
+    retornos = cubo.alinhados(ativos_risco, 'D', inicio=inicio, fim=fim)
+    retornos.columns = [cubo.rotulos[c] for c in ativos_risco]
+    retornos['LFT'] = retornos_lft(indice, cubo.datas_comuns(ativos_risco, 'D', inicio=inicio, fim=fim))
+    return retornos, risk_free_rate_ref
+
+
+def carregar_fatores(cubo=None, fatores=FATORES_NOMEADOS, inicio=INICIO_PADRAO):
+    # Log-retornos dos fatores nomeados (colunas = nomes dos fatores), datas em comum
+    if cubo is None:
+        cubo = abrir_cubo()
+    df = cubo.alinhados(list(fatores.values()), 'D', inicio=inicio)
+    df.columns = list(fatores)
+    return df
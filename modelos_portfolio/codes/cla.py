@@ -0,0 +1,291 @@
+import numpy as np
+from fatores import ModeloFatores, como_covariancia
+
+# Critical Line Algorithm (Markowitz) para a fronteira eficiente long-only.
+# Baseado em Bailey & López de Prado (2013), "An Open-Source Implementation of
+# the Critical-Line Algorithm for Portfolio Optimization".
+#
+# Em uma única passada o algoritmo encontra todos os portfólios de canto
+# (turning points), do portfólio de máximo retorno até o de mínima variância.
+# Entre dois cantos consecutivos os pesos variam linearmente com o retorno,
+# então qualquer ponto da fronteira é uma combinação convexa exata de dois
+# cantos: mínima volatilidade, máximo Sharpe, alvo de volatilidade e curvas
+# de qualquer resolução saem sem novas chamadas ao otimizador.
+# cov_matrix pode ser densa ou um ModeloFatores (ver fatores.py).
+
+# Tolerância relativa entre lambdas: com Woodbury (ModeloFatores) o lambda de
+# entrada de um ativo recém-fixado pode diferir do corrente só por arredondamento
+TOL_LAMBDA = 1e-12
+# Limite de cantos por ativo: acima disso o algoritmo está ciclando
+MAX_CANTOS_POR_ATIVO = 20
+
+
+class CLA:
+    def __init__(self, ret_mean, cov_matrix, lower=0.0, upper=1.0):
+        self.mean = np.asarray(ret_mean, dtype=float)
+        self.covar = como_covariancia(cov_matrix)
+        self.fatores = isinstance(self.covar, ModeloFatores)
+        n = self.mean.shape[0]
+        self.lB = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+        self.uB = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+        self.w = []  # pesos de cada portfólio de canto
+        self.l = []  # lambdas
+        self.g = []  # gammas
+        self.f = []  # ativos livres em cada canto
+
+    def solve(self):
+        free, w = self._init_algo()
+        self.w.append(w.copy())
+        self.l.append(None)
+        self.g.append(None)
+        self.f.append(free[:])
+
+        n = self.mean.shape[0]
+        fixado = None  # ativo que foi para o limite no último canto
+        while True:
+            if len(self.w) > MAX_CANTOS_POR_ATIVO * max(n, 5):
+                raise RuntimeError(f"CLA não convergiu: {len(self.w)} cantos para {n} ativos")
+
+            # 1) Caso a): um peso livre vai para um limite
+            l_in, i_in, bi_in = -np.inf, None, None
+            if len(free) > 1:
+                termos = self._get_matrices(free, w)
+                for j, i in enumerate(free):
+                    lam, bi = self._compute_lambda(termos, j, [self.lB[i], self.uB[i]])
+                    if lam is not None and lam > l_in:
+                        l_in, i_in, bi_in = lam, i, bi
+
+            # 2) Caso b): um peso no limite passa a ser livre
+            l_out, i_out = -np.inf, None
+            if len(free) < self.mean.shape[0]:
+                # Com fatores, Bᵀ D⁻¹ B do conjunto livre + um ativo é uma atualização de posto 1
+                gram = self.covar.gram(free) if self.fatores else None
+                for i in self._get_b(free):
+                    if i == fixado:
+                        # Voltaria no mesmo lambda em que acabou de sair
+                        continue
+                    extra = None
+                    if self.fatores:
+                        extra = gram + np.outer(self.covar.B[i], self.covar.B[i]) / self.covar.D[i]
+                    termos = self._get_matrices(free + [i], w, extra)
+                    lam, _ = self._compute_lambda(termos, len(free), w[i])
+                    if lam is None:
+                        continue
+                    # Estritamente abaixo do lambda corrente, com folga relativa
+                    if (self.l[-1] is None or lam < self.l[-1] - TOL_LAMBDA * abs(self.l[-1])) and lam > l_out:
+                        l_out, i_out = lam, i
+
+            fixado = None
+            if (i_in is None or l_in < 0) and (i_out is None or l_out < 0):
+                # 3) Portfólio de mínima variância (lambda = 0: o termo de retorno some)
+                self.l.append(0.0)
+            else:
+                # 4) Escolhe o evento com maior lambda
+                if l_in > l_out:
+                    self.l.append(l_in)
+                    free.remove(i_in)
+                    w[i_in] = bi_in
+                    fixado = i_in
+                else:
+                    self.l.append(l_out)
+                    free.append(i_out)
+            termos = self._get_matrices(free, w)
+
+            # 5) Pesos do novo canto
+            wF, g = self._compute_w(termos)
+            w[free] = wF
+            self.w.append(w.copy())
+            self.g.append(g)
+            self.f.append(free[:])
+            if self.l[-1] == 0:
+                break
+
+        # 6) Remove cantos com erro numérico ou que não são eficientes
+        self._purge_num_err(1e-9)
+        self._purge_excess()
+        return self
+
+    def _init_algo(self):
+        # Começa pelo ativo de maior retorno, preenchendo até o limite superior
+        order = np.argsort(self.mean, kind='stable')
+        w = self.lB.copy()
+        i = len(order)
+        while w.sum() < 1:
+            i -= 1
+            w[order[i]] = self.uB[order[i]]
+        w[order[i]] += 1 - w.sum()
+        return [int(order[i])], w
+
+    def _get_b(self, free):
+        return [i for i in range(self.mean.shape[0]) if i not in free]
+
+    def _get_matrices(self, free, w, gram=None):
+        # wB vem dos pesos correntes (e não do último canto), para que um peso
+        # recém-fixado no limite já entre com o valor do limite.
+        # Só os produtos Σ_FF⁻¹ x são necessários: com matriz densa via inversa do
+        # bloco livre, com ModeloFatores via Woodbury em O(N·k), sem montar Σ.
+        b = self._get_b(free)
+        meanF = self.mean[free]
+        wB = w[b]
+        if self.fatores:
+            resolver = self.covar.resolvedor(free, gram)
+            covarFB_wB = self.covar.bloco_cruzado(free, b, wB)
+        else:
+            covarF_inv = np.linalg.inv(self.covar[np.ix_(free, free)])
+            resolver = lambda x: covarF_inv @ x
+            covarFB_wB = self.covar[np.ix_(free, b)] @ wB
+
+        # Σ_FF⁻¹ [1, μ_F, Σ_FB w_B] num único solve
+        onesF = np.ones(meanF.shape[0])
+        c4, c2, l3 = resolver(np.column_stack([onesF, meanF, covarFB_wB])).T
+        return {
+            'c1': c4.sum(),   # 1ᵀ Σ⁻¹ 1
+            'c2': c2,         # Σ⁻¹ μ
+            'c3': c2.sum(),   # 1ᵀ Σ⁻¹ μ
+            'c4': c4,         # Σ⁻¹ 1
+            'l1': wB.sum(),
+            'l2': l3.sum(),   # 1ᵀ Σ⁻¹ Σ_FB w_B
+            'l3': l3,         # Σ⁻¹ Σ_FB w_B
+        }
+
+    def _compute_lambda(self, t, i, bi):
+        c = -t['c1'] * t['c2'][i] + t['c3'] * t['c4'][i]
+        if c == 0:
+            return None, None
+        if isinstance(bi, list):
+            bi = bi[1] if c > 0 else bi[0]
+        return float(((1 - t['l1'] + t['l2']) * t['c4'][i] - t['c1'] * (bi + t['l3'][i])) / c), bi
+
+    def _compute_w(self, t):
+        lam = self.l[-1]
+        g = float(-lam * t['c3'] / t['c1'] + (1 - t['l1'] + t['l2']) / t['c1'])
+        return -t['l3'] + g * t['c4'] + lam * t['c2'], g
+
+    def _purge_num_err(self, tol):
+        keep = []
+        for w in self.w:
+            ok = abs(w.sum() - 1) <= tol and np.all(w >= self.lB - tol) and np.all(w <= self.uB + tol)
+            keep.append(ok)
+        self._keep(keep)
+
+    def _purge_excess(self):
+        # Mantém apenas cantos com retorno estritamente decrescente
+        rets = [self.mean @ w for w in self.w]
+        keep = []
+        menor = np.inf
+        for r in rets:
+            ok = r < menor - 1e-12
+            keep.append(ok)
+            if ok:
+                menor = r
+        self._keep(keep)
+
+    def _keep(self, keep):
+        self.w = [x for x, k in zip(self.w, keep) if k]
+        self.l = [x for x, k in zip(self.l, keep) if k]
+        self.g = [x for x, k in zip(self.g, keep) if k]
+        self.f = [x for x, k in zip(self.f, keep) if k]
+
+
+class FronteiraCLA:
+    # Fronteira exata a partir dos cantos do CLA.
+    # Os cantos ficam ordenados do maior para o menor retorno.
+
+    def __init__(self, ret_mean, cov_matrix, lower=0.0, upper=1.0):
+        self.mu = np.asarray(ret_mean, dtype=float)
+        self.sigma = como_covariancia(cov_matrix)
+        cla = CLA(self.mu, self.sigma, lower, upper).solve()
+        self.lB, self.uB = cla.lB, cla.uB
+        self.cantos = np.array(cla.w)
+        self.lambdas = np.array(cla.l, dtype=object)
+        self.rets = self.cantos @ self.mu
+        self.vols = np.sqrt(np.einsum('ij,ij->i', self.cantos @ self.sigma, self.cantos))
+
+    def stats(self, w):
+        ret = self.mu @ w
+        vol = np.sqrt(w @ self.sigma @ w)
+        return ret, vol
+
+    def min_volatility(self):
+        return self.cantos[-1].copy()
+
+    def max_return(self):
+        return self.cantos[0].copy()
+
+    def _combinar(self, a, b, t):
+        # Combinação convexa de dois cantos; o clip remove resíduos como -1e-17
+        return np.clip(b + t * (a - b), self.lB, self.uB)
+
+    def _segmentos(self):
+        # Pares de cantos adjacentes (a: maior retorno, b: menor retorno)
+        return zip(self.cantos[:-1], self.cantos[1:])
+
+    def _quadratica(self, a, b):
+        # Ao longo de w(t) = b + t (a - b), t em [0, 1]:
+        # ret(t) = r0 + r1 t ;  var(t) = v0 + v1 t + v2 t²
+        d = a - b
+        sb = self.sigma @ b
+        sd = self.sigma @ d
+        return self.mu @ b, self.mu @ d, b @ sb, 2 * d @ sb, d @ sd
+
+    def max_sharpe(self, risk_free_rate=0.0):
+        # Em cada segmento o Sharpe (r0 - rf + r1 t) / sqrt(v0 + v1 t + v2 t²)
+        # tem no máximo um ponto crítico, obtido em forma fechada.
+        melhor_w, melhor_sr = self.cantos[-1].copy(), -np.inf
+        if len(self.cantos) == 1:
+            return self.cantos[0].copy()
+        for a, b in self._segmentos():
+            r0, r1, v0, v1, v2 = self._quadratica(a, b)
+            e = r0 - risk_free_rate
+            candidatos = [0.0, 1.0]
+            den = r1 * v1 / 2 - e * v2
+            if den != 0:
+                t = (e * v1 / 2 - r1 * v0) / den
+                if 0 < t < 1:
+                    candidatos.append(t)
+            for t in candidatos:
+                var = v0 + v1 * t + v2 * t * t
+                if var <= 0:
+                    continue
+                sr = (e + r1 * t) / np.sqrt(var)
+                if sr > melhor_sr:
+                    melhor_sr, melhor_w = sr, self._combinar(a, b, t)
+        return melhor_w
+
+    def pesos_para_retorno(self, alvo):
+        # Interpolação linear exata no segmento que contém o retorno alvo
+        if alvo >= self.rets[0]:
+            return self.cantos[0].copy()
+        if alvo <= self.rets[-1]:
+            return self.cantos[-1].copy()
+        k = np.searchsorted(-self.rets, -alvo)  # rets é decrescente
+        a, b = self.cantos[k - 1], self.cantos[k]
+        ra, rb = self.rets[k - 1], self.rets[k]
+        t = (alvo - rb) / (ra - rb)
+        return self._combinar(a, b, t)
+
+    def pesos_para_volatilidade(self, alvo):
+        # Maior retorno com volatilidade = alvo (na fronteira eficiente a vol
+        # cresce com o retorno). Devolve None se o alvo estiver fora da curva.
+        if alvo < self.vols[-1] - 1e-12 or alvo > self.vols[0] + 1e-12:
+            return None
+        k = int(np.argmax(self.vols <= alvo))  # primeiro canto com vol <= alvo
+        if k == 0:
+            return self.cantos[0].copy()
+        a, b = self.cantos[k - 1], self.cantos[k]
+        _, _, v0, v1, v2 = self._quadratica(a, b)
+        # v2 t² + v1 t + (v0 - alvo²) = 0, raiz em [0, 1]
+        c = v0 - alvo**2
+        if abs(v2) < 1e-18:
+            t = -c / v1
+        else:
+            disc = max(v1 * v1 - 4 * v2 * c, 0.0)
+            t = (-v1 + np.sqrt(disc)) / (2 * v2)
+        t = min(max(t, 0.0), 1.0)
+        return self._combinar(a, b, t)
+
+    def curva(self, target_rets):
+        # Pesos e volatilidades da fronteira para um vetor de retornos alvo
+        pesos = np.array([self.pesos_para_retorno(r) for r in target_rets])
+        vols = np.sqrt(np.einsum('ij,ij->i', pesos @ self.sigma, pesos))
+        return vols, pesos
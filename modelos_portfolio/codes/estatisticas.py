@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+# Estatísticas em fluxo (streaming) para o painel de retornos
+# Cada nova observação atualiza médias, volatilidades e a matriz de covariância
+# em O(N²) (N = ativos), sem reprocessar o histórico:
+#   EstatisticaExpansiva - janela crescente (Welford)
+#   EstatisticaJanela    - janela móvel de tamanho fixo (Welford com remoção)
+#   EstatisticaEWMA      - média/covariância exponencialmente ponderadas
+#
+# NaN é tratado par a par (pairwise-complete): o par (i, j) só é atualizado
+# nas datas em que os dois ativos têm retorno, como em DataFrame.cov().
+# Internamente A[i, j] é a média de i nas datas válidas do par (i, j) e
+# C[i, j] o co-momento acumulado do par.
+
+
+class _EstatisticaBase:
+    def __init__(self, num_ativos, fator_anual=252, ddof=1):
+        self.num_ativos = num_ativos
+        self.fator_anual = fator_anual
+        self.ddof = ddof
+        self.n = np.zeros((num_ativos, num_ativos))
+        self.A = np.zeros((num_ativos, num_ativos))
+        self.C = np.zeros((num_ativos, num_ativos))
+
+    @staticmethod
+    def _preparar(x):
+        x = np.asarray(x, dtype=float)
+        validos = ~np.isnan(x)
+        return np.where(validos, x, 0.0), validos[:, None] & validos[None, :]
+
+    def _adicionar(self, xz, M):
+        # Welford: C_ij += (x_i - média_i antiga)(x_j - média_j nova)
+        self.n += M
+        d = xz[:, None] - self.A
+        self.A += np.where(M, d / np.maximum(self.n, 1), 0.0)
+        self.C += np.where(M, d * (xz[None, :] - self.A.T), 0.0)
+
+    def atualizar(self, x):
+        self._adicionar(*self._preparar(x))
+
+    def media(self):
+        # Média anualizada de cada ativo
+        return np.diag(self.A) * self.fator_anual
+
+    def covariancia(self):
+        # Covariância anualizada (NaN onde o par ainda não tem observações suficientes)
+        den = self.n - self.ddof
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = np.where(den > 0, self.C / den, np.nan)
+        return cov * self.fator_anual
+
+    def volatilidade(self):
+        return np.sqrt(np.diag(self.covariancia()))
+
+
+class EstatisticaExpansiva(_EstatisticaBase):
+    pass
+
+
+class EstatisticaJanela(_EstatisticaBase):
+    def __init__(self, num_ativos, janela, fator_anual=252, ddof=1):
+        super().__init__(num_ativos, fator_anual, ddof)
+        self.janela = janela
+        # Buffer circular com as últimas `janela` observações (para a remoção)
+        self._buffer = np.full((janela, num_ativos), np.nan)
+        self._pos = 0
+        self._cheio = False
+
+    def _remover(self, xz, M):
+        # Inverso do Welford: parte do conjunto maior (n) para o menor (n - 1)
+        # C_menor = C_maior - (x_i - média_i menor)(x_j - média_j maior)
+        d_maior = xz[None, :] - self.A.T
+        n_novo = self.n - M
+        media_menor = (self.n * self.A - xz[:, None]) / np.maximum(n_novo, 1)
+        A_novo = np.where(M, np.where(n_novo > 0, media_menor, 0.0), self.A)
+        C_novo = self.C - np.where(M, (xz[:, None] - A_novo) * d_maior, 0.0)
+        self.C = np.where(n_novo > 0, C_novo, 0.0)
+        self.A = A_novo
+        self.n = n_novo
+
+    def atualizar(self, x):
+        x = np.asarray(x, dtype=float)
+        if self._cheio:
+            self._remover(*self._preparar(self._buffer[self._pos]))
+        self._buffer[self._pos] = x
+        self._pos = (self._pos + 1) % self.janela
+        self._cheio = self._cheio or self._pos == 0
+        self._adicionar(*self._preparar(x))
+
+
+class EstatisticaEWMA(_EstatisticaBase):
+    # lambda_ (decaimento, ex: 0.94 RiskMetrics) ou halflife em observações
+    def __init__(self, num_ativos, lambda_=0.94, halflife=None, fator_anual=252):
+        super().__init__(num_ativos, fator_anual, ddof=0)
+        if halflife is not None:
+            lambda_ = 0.5 ** (1.0 / halflife)
+        self.alpha = 1.0 - lambda_
+
+    def atualizar(self, x):
+        xz, M = self._preparar(x)
+        primeiro = M & (self.n == 0)
+        seguintes = M & (self.n > 0)
+        a = self.alpha
+        d = xz[:, None] - self.A
+        d_t = xz[None, :] - self.A.T
+        # S_nova = (1 - α)(S + α d dᵀ) ; m_nova = m + α d
+        self.C = np.where(seguintes, (1 - a) * (self.C + a * d * d_t), np.where(primeiro, 0.0, self.C))
+        self.A = np.where(seguintes, self.A + a * d, np.where(primeiro, xz[:, None], self.A))
+        self.n += M
+
+    def covariancia(self):
+        return np.where(self.n > 0, self.C, np.nan) * self.fator_anual
+
+
+def fluxo(estimador, retornos):
+    # Gera (data, média, volatilidade, covariância) após cada observação
+    datas, valores = _desempacotar(retornos)
+    for data, x in zip(datas, valores):
+        estimador.atualizar(x)
+        yield data, estimador.media(), estimador.volatilidade(), estimador.covariancia()
+
+
+def empilhar(estimador, retornos, covariancia=True):
+    # Versão empilhada: arrays (T, N) de média/vol e (T, N, N) de covariância
+    datas, valores = _desempacotar(retornos)
+    T, N = valores.shape
+    medias = np.empty((T, N))
+    vols = np.empty((T, N))
+    covs = np.empty((T, N, N)) if covariancia else None
+    for t, x in enumerate(valores):
+        estimador.atualizar(x)
+        cov = estimador.covariancia()
+        medias[t] = estimador.media()
+        vols[t] = np.sqrt(np.diag(cov))
+        if covariancia:
+            covs[t] = cov
+    return {'datas': datas, 'media': medias, 'vol': vols, 'cov': covs}
+
+
+def _desempacotar(retornos):
+    if isinstance(retornos, pd.DataFrame):
+        return retornos.index, retornos.to_numpy(dtype=float)
+    valores = np.asarray(retornos, dtype=float)
+    return np.arange(len(valores)), valores
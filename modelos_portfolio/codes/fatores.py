@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# Modelo de fatores para a covariância: Σ = B F Bᵀ + diag(D)
+#   B: cargas (N x k), F: covariância dos fatores (k x k), D: variâncias
+#   idiossincráticas (N,). Nunca se monta a matriz N x N: produtos e solves
+#   custam O(N·k) (+ O(k³) no núcleo de Woodbury).
+#
+# ModeloFatores se comporta como a matriz densa nos produtos com @
+# (Σ @ w, w @ Σ, W @ Σ), então otimizacao.py, nuvem.py e cla.py aceitam
+# qualquer um dos dois como cov_matrix. Para o CLA, resolvedor() aplica Σ_FF⁻¹
+# de um subconjunto de ativos pela identidade de Woodbury:
+#   Σ⁻¹ x = D⁻¹x - D⁻¹B (F⁻¹ + Bᵀ D⁻¹ B)⁻¹ Bᵀ D⁻¹ x
+
+# Piso das variâncias idiossincráticas (fração da variância total do ativo):
+# mantém D > 0 (Woodbury exige D invertível) mesmo se um fator for o próprio ativo
+PISO_IDIO = 1e-4
+
+
+class ModeloFatores:
+    # numpy delega w @ modelo para __rmatmul__
+    __array_ufunc__ = None
+
+    def __init__(self, cargas, cov_fatores, idio, ativos=None, fatores=None):
+        self.B = np.asarray(cargas, dtype=float)
+        self.F = np.atleast_2d(np.asarray(cov_fatores, dtype=float))
+        self.D = np.asarray(idio, dtype=float)
+        self.F_inv = np.linalg.inv(self.F)
+        self.ativos = list(ativos) if ativos is not None else None
+        self.fatores = list(fatores) if fatores is not None else None
+
+    @property
+    def shape(self):
+        n = self.B.shape[0]
+        return n, n
+
+    @property
+    def k(self):
+        return self.B.shape[1]
+
+    def __matmul__(self, x):
+        # Σ x, com x (N,) ou (N, m)
+        x = np.asarray(x, dtype=float)
+        d = self.D if x.ndim == 1 else self.D[:, None]
+        return self.B @ (self.F @ (self.B.T @ x)) + d * x
+
+    def __rmatmul__(self, x):
+        # x Σ, com x (N,) ou (m, N) (Σ é simétrica)
+        x = np.asarray(x, dtype=float)
+        return ((x @ self.B) @ self.F) @ self.B.T + x * self.D
+
+    def diagonal(self):
+        return np.einsum('ij,jk,ik->i', self.B, self.F, self.B) + self.D
+
+    def variancias(self, pesos):
+        # wᵀΣw de cada linha de pesos (m, N) em O(m·N·k)
+        pesos = np.atleast_2d(pesos)
+        xb = pesos @ self.B
+        return np.einsum('ij,jk,ik->i', xb, self.F, xb) + (pesos**2) @ self.D
+
+    def denso(self):
+        # Só para conferência/relatórios com poucos ativos
+        return self.B @ self.F @ self.B.T + np.diag(self.D)
+
+    def gram(self, idx):
+        # Bᵀ D⁻¹ B restrito aos ativos idx (k x k)
+        bi = self.B[idx]
+        return (bi / self.D[idx, None]).T @ bi
+
+    def resolvedor(self, idx, gram=None):
+        # Função x -> Σ[idx, idx]⁻¹ x (Woodbury); gram permite atualizações de posto 1
+        bi, di = self.B[idx], self.D[idx]
+        if gram is None:
+            gram = self.gram(idx)
+        nucleo = np.linalg.inv(self.F_inv + gram)
+        bd = bi / di[:, None]
+
+        def resolver(x):
+            x = np.asarray(x, dtype=float)
+            y = x / di if x.ndim == 1 else x / di[:, None]
+            return y - bd @ (nucleo @ (bd.T @ x))
+        return resolver
+
+    def bloco_cruzado(self, linhas, colunas, x):
+        # Σ[linhas, colunas] @ x para conjuntos disjuntos (D não entra), sem montar o bloco
+        return self.B[linhas] @ (self.F @ (self.B[colunas].T @ x))
+
+
+def como_covariancia(cov_matrix):
+    # ModeloFatores passa intacto; qualquer outra coisa vira array denso
+    if isinstance(cov_matrix, ModeloFatores):
+        return cov_matrix
+    return np.asarray(cov_matrix, dtype=float)
+
+
+def _matriz(retornos):
+    if isinstance(retornos, pd.DataFrame):
+        return retornos.to_numpy(dtype=float), list(retornos.columns)
+    return np.asarray(retornos, dtype=float), None
+
+
+def _idio(var_residual, var_total):
+    return np.maximum(var_residual, PISO_IDIO * var_total)
+
+
+def estimar_pca(retornos, k=5, fator_anual=252):
+    # Fatores estatísticos: os k componentes principais dos retornos centrados.
+    # SVD econômica de (T x N): não forma a covariância amostral N x N.
+    X, ativos = _matriz(retornos)
+    X = X - X.mean(axis=0)
+    T = X.shape[0]
+    k = min(k, min(X.shape) - 1)
+    _, s, vt = np.linalg.svd(X, full_matrices=False)
+    autovalores = s[:k]**2 / (T - 1) * fator_anual
+    cargas = vt[:k].T
+    var_total = (X**2).sum(axis=0) / (T - 1) * fator_anual
+    var_fatores = (cargas**2) @ autovalores
+    return ModeloFatores(cargas, np.diag(autovalores), _idio(var_total - var_fatores, var_total),
+                         ativos, [f"PC{i + 1}" for i in range(k)])
+
+
+def estimar_fatores(retornos, retornos_fatores, fator_anual=252):
+    # Fatores nomeados (ações, juros, câmbio, ouro...): regressão MQO de cada
+    # ativo nos retornos dos fatores, nas datas em comum.
+    # F = covariância dos fatores, D = variância dos resíduos.
+    dados = pd.concat([retornos, retornos_fatores], axis=1, join='inner').dropna()
+    n = retornos.shape[1]
+    R = dados.iloc[:, :n].to_numpy(dtype=float)
+    X = dados.iloc[:, n:].to_numpy(dtype=float)
+    R = R - R.mean(axis=0)
+    X = X - X.mean(axis=0)
+    T = len(dados)
+    cargas = np.linalg.lstsq(X, R, rcond=None)[0].T
+    residuos = R - X @ cargas.T
+    cov_fatores = X.T @ X / (T - 1) * fator_anual
+    var_total = (R**2).sum(axis=0) / (T - 1) * fator_anual
+    var_residuos = (residuos**2).sum(axis=0) / (T - 1) * fator_anual
+    return ModeloFatores(cargas, cov_fatores, _idio(var_residuos, var_total),
+                         list(retornos.columns), list(retornos_fatores.columns))
@@ -0,0 +1,64 @@
+import numpy as np
+from fatores import como_covariancia
+
+# Simulação de Monte Carlo da "nuvem" de portfólios aleatórios.
+# Os pesos são sorteados em blocos (chunks) e retorno, volatilidade e Sharpe
+# de cada bloco saem de um único produto matricial, sem laço por portfólio.
+# A memória de trabalho é O(chunk_size * num_ativos), independente do total.
+# Com um ModeloFatores (fatores.py) no lugar de Σ, W Σ custa O(chunk·N·k).
+
+CHUNK_PADRAO = 50_000
+
+
+def iterar_nuvem(ret_mean, cov_matrix, risk_free_rate, n_portfolios=30000,
+                 chunk_size=CHUNK_PADRAO, seed=42):
+    # Gera (pesos, rets, vols, srs) bloco a bloco.
+    # Usa RandomState para reproduzir exatamente o laço antigo com
+    # np.random.seed(seed) + np.random.random(num_ativos) a cada iteração:
+    # sortear uma matriz (k, n) consome a mesma sequência que k vetores (n,).
+    mu = np.asarray(ret_mean, dtype=float)
+    sigma = como_covariancia(cov_matrix)
+    num_ativos = mu.shape[0]
+    rng = np.random.RandomState(seed)
+
+    restante = int(n_portfolios)
+    while restante > 0:
+        k = min(chunk_size, restante)
+        w = rng.random_sample((k, num_ativos))
+        w /= w.sum(axis=1, keepdims=True)
+
+        rets = w @ mu
+        # diag(W Σ Wᵀ) sem montar a matriz k x k
+        vols = np.sqrt(np.einsum('ij,ij->i', w @ sigma, w))
+        srs = np.zeros(k)
+        np.divide(rets - risk_free_rate, vols, out=srs, where=vols > 0)
+
+        yield w, rets, vols, srs
+        restante -= k
+
+
+def simular_nuvem(ret_mean, cov_matrix, risk_free_rate, n_portfolios=30000,
+                  chunk_size=CHUNK_PADRAO, seed=42, guardar_pesos=False):
+    # Versão agregada: devolve arrays pré-alocados (rets, vols, srs) e,
+    # opcionalmente, a matriz de pesos (cuidado com a memória em milhões).
+    n_portfolios = int(n_portfolios)
+    num_ativos = len(ret_mean)
+    rets = np.empty(n_portfolios)
+    vols = np.empty(n_portfolios)
+    srs = np.empty(n_portfolios)
+    pesos = np.empty((n_portfolios, num_ativos)) if guardar_pesos else None
+
+    inicio = 0
+    for w, r, v, s in iterar_nuvem(ret_mean, cov_matrix, risk_free_rate,
+                                   n_portfolios, chunk_size, seed):
+        fim = inicio + len(r)
+        rets[inicio:fim] = r
+        vols[inicio:fim] = v
+        srs[inicio:fim] = s
+        if guardar_pesos:
+            pesos[inicio:fim] = w
+        inicio = fim
+
+    if guardar_pesos:
+        return rets, vols, srs, pesos
+    return rets, vols, srs
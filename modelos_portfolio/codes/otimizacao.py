@@ -0,0 +1,117 @@
+import numpy as np
+from fatores import como_covariancia
+
+# Objetivos e restrições do Markowitz com gradientes analíticos.
+# Tudo roda sobre arrays NumPy (sem reempacotar ret_mean/cov_matrix do pandas)
+# e cada objetivo devolve (valor, gradiente) para uso com minimize(jac=True),
+# evitando as N+1 chamadas de get_stats das diferenças finitas do SLSQP.
+#
+#   ret(w)    = μᵀw                     ∇ = μ
+#   vol(w)    = sqrt(wᵀΣw)              ∇ = Σw / vol
+#   sharpe(w) = (ret - rf) / vol        ∇ = (μ·vol - (ret - rf)·Σw/vol) / vol²
+#
+# Σ pode ser densa ou um ModeloFatores (fatores.py): Σw custa O(N·k).
+
+
+class ObjetivosCarteira:
+    def __init__(self, ret_mean, cov_matrix, risk_free_rate):
+        self.mu = np.asarray(ret_mean, dtype=float)
+        self.sigma = como_covariancia(cov_matrix)
+        self.rf = float(risk_free_rate)
+        self.num_ativos = self.mu.shape[0]
+        self.contagem = {'objetivo': 0, 'restricao': 0, 'jacobiano': 0}
+
+    def atualizar(self, ret_mean, cov_matrix):
+        # Troca μ e Σ no lugar: as restrições já criadas leem self.mu/self.sigma,
+        # então podem ser reaproveitadas entre rebalanceamentos (backtest)
+        self.mu = np.asarray(ret_mean, dtype=float)
+        self.sigma = como_covariancia(cov_matrix)
+
+    def zerar_contagem(self):
+        for chave in self.contagem:
+            self.contagem[chave] = 0
+
+    def stats(self, weights):
+        w = np.asarray(weights, dtype=float)
+        ret = self.mu @ w
+        vol = np.sqrt(w @ self.sigma @ w)
+        sr = (ret - self.rf) / vol if vol > 0 else 0
+        return np.array([ret, vol, sr])
+
+    # --- Objetivos: devolvem (valor, gradiente) ---
+
+    def min_volatility(self, w):
+        self.contagem['objetivo'] += 1
+        sw = self.sigma @ w
+        vol = np.sqrt(w @ sw)
+        return vol, sw / vol
+
+    def neg_return(self, w):
+        self.contagem['objetivo'] += 1
+        return -(self.mu @ w), -self.mu
+
+    def neg_sharpe(self, w):
+        self.contagem['objetivo'] += 1
+        sw = self.sigma @ w
+        vol = np.sqrt(w @ sw)
+        excesso = self.mu @ w - self.rf
+        grad = (self.mu * vol - excesso * sw / vol) / vol**2
+        return -excesso / vol, -grad
+
+    # --- Restrições de igualdade com jacobiano analítico ---
+
+    def _restricao(self, fun, jac, tipo='eq'):
+        def fun_contada(w):
+            self.contagem['restricao'] += 1
+            return fun(w)
+
+        def jac_contado(w):
+            self.contagem['jacobiano'] += 1
+            return jac(w)
+
+        return {'type': tipo, 'fun': fun_contada, 'jac': jac_contado}
+
+    def restricao_soma(self):
+        # Σw = 1
+        uns = np.ones(self.num_ativos)
+        return self._restricao(lambda w: np.sum(w) - 1, lambda w: uns)
+
+    def restricao_retorno(self, alvo):
+        # μᵀw = alvo
+        return self._restricao(lambda w: self.mu @ w - alvo, lambda w: self.mu)
+
+    def restricao_vol(self, alvo):
+        # sqrt(wᵀΣw) = alvo
+        def jac(w):
+            sw = self.sigma @ w
+            return sw / np.sqrt(w @ sw)
+
+        return self._restricao(lambda w: np.sqrt(w @ self.sigma @ w) - alvo, jac)
+
+    def restricao_vol_maxima(self, alvo):
+        # sqrt(wᵀΣw) <= alvo (desigualdade: convexa, converge melhor que a igualdade)
+        def jac(w):
+            sw = self.sigma @ w
+            return -sw / np.sqrt(w @ sw)
+
+        return self._restricao(lambda w: alvo - np.sqrt(w @ self.sigma @ w), jac, 'ineq')
+
+
+def otimizar(objetivos, funcao, x0, restricoes, bounds=None):
+    # Wrapper de minimize(SLSQP) com gradiente analítico.
+    # Devolve o OptimizeResult com as contagens de avaliação anexadas em res.contagem.
+    # scipy só é importado aqui: quem usa apenas stats()/objetivos não paga por ele.
+    from scipy.optimize import minimize
+    if bounds is None:
+        bounds = tuple((0, 1) for _ in range(objetivos.num_ativos))
+    antes = dict(objetivos.contagem)
+    res = minimize(funcao, x0, method='SLSQP', jac=True, bounds=bounds, constraints=restricoes)
+    res.contagem = {chave: objetivos.contagem[chave] - antes[chave] for chave in antes}
+    return res
+
+
+def resumo_avaliacoes(nome, res):
+    # Linha de relatório: iterações do solver e avaliações de objetivo/restrições
+    c = res.contagem
+    return (f"{nome}: nit={res.nit} nfev={res.nfev} njev={res.njev} | "
+            f"objetivo={c['objetivo']} restrições={c['restricao']} jacobianos={c['jacobiano']}")
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from cla import FronteiraCLA
+
+# Fronteira eficiente reamostrada (Michaud) por block bootstrap
+# A fronteira de uma única amostra é muito sensível ao erro de estimação (o
+# máximo Sharpe costuma concentrar quase tudo num ativo). Aqui o histórico de
+# retornos é reamostrado em blocos contíguos (moving block bootstrap: preserva
+# autocorrelação e agrupamentos de volatilidade), cada reamostra tem a sua
+# fronteira exata pelo CLA (cla.py) e os pesos são promediados:
+#   - carteiras: média dos pesos de min vol, max Sharpe e vol alvo;
+#   - fronteira: média, ponto a ponto, dos n_pontos portfólios igualmente
+#     espaçados em retorno entre o mínimo global e o ativo de maior retorno.
+# As bandas são quantis entre as reamostras (pesos e, para a fronteira, os
+# pontos retorno/vol de cada reamostra com as suas próprias estimativas).
+#
+# As reamostras rodam num pool de processos. A matriz de retornos (T x N) vai
+# uma única vez para a memória compartilhada e os processos a leem sem cópia;
+# cada tarefa recebe só as sementes de um lote. A reamostra i usa sempre a
+# i-ésima semente derivada de `seed`: o resultado não depende de workers.
+
+N_REAMOSTRAS_PADRAO = 200
+# ~1 mês de pregões por bloco
+BLOCO_PADRAO = 21
+BANDA_PADRAO = (0.05, 0.95)
+CARTEIRAS = ('min_vol', 'max_sharpe', 'alvo')
+# Lotes por processo: equilibra a carga sem mandar uma tarefa por reamostra
+LOTES_POR_WORKER = 4
+VERSAO = 1
+
+# Nos processos do pool: a memória compartilhada e a matriz de retornos sobre ela
+_compartilhado = {}
+
+
+def indices_bloco(rng, T, tamanho_bloco):
+    # Blocos de tamanho fixo com início uniforme, concatenados até T observações
+    b = min(max(1, int(tamanho_bloco)), T)
+    n_blocos = -(-T // b)
+    inicios = rng.integers(0, T - b + 1, n_blocos)
+    return (inicios[:, None] + np.arange(b)).ravel()[:T]
+
+
+def estatisticas(retornos, fator_anual=252):
+    # Mesmas estimativas de alocacao.estatisticas_retornos, sobre um array
+    return retornos.mean(axis=0) * fator_anual, np.cov(retornos, rowvar=False) * fator_anual
+
+
+def resolver(retornos, risk_free_rate, target_vol, n_pontos, fator_anual=252):
+    # Fronteira de uma amostra: pesos das três carteiras (3 x N) e da curva
+    # (n_pontos x N), com retornos e vols da curva nas estimativas da amostra
+    mu, sigma = estatisticas(retornos, fator_anual)
+    fronteira = FronteiraCLA(mu, sigma)
+    w_min_vol = fronteira.min_volatility()
+    w_alvo = fronteira.pesos_para_volatilidade(target_vol)
+    carteiras = np.array([w_min_vol, fronteira.max_sharpe(risk_free_rate),
+                          w_min_vol if w_alvo is None else w_alvo])
+    rets = np.linspace(mu @ w_min_vol, mu.max(), n_pontos)
+    vols, pesos = fronteira.curva(rets)
+    return carteiras, pesos, rets, vols
+
+
+def _iniciar(nome, forma, dtype):
+    # Anexa o processo à memória compartilhada criada por fronteira_reamostrada
+    shm = shared_memory.SharedMemory(name=nome)
+    _compartilhado['shm'] = shm
+    _compartilhado['retornos'] = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+
+
+def _lote(sementes, tamanho_bloco, risk_free_rate, target_vol, n_pontos, fator_anual, retornos=None):
+    retornos = _compartilhado['retornos'] if retornos is None else retornos
+    saida = []
+    for semente in sementes:
+        idx = indices_bloco(np.random.default_rng(semente), len(retornos), tamanho_bloco)
+        saida.append(resolver(retornos[idx], risk_free_rate, target_vol, n_pontos, fator_anual))
+    return saida
+
+
+def _reamostrar(R, sementes, parametros, workers):
+    lotes = [l for l in np.array_split(np.arange(len(sementes)), workers * LOTES_POR_WORKER) if len(l)]
+    if workers == 1:
+        # Sem pool: subir processos não compensa
+        return [r for l in lotes for r in _lote([sementes[i] for i in l], *parametros, retornos=R)]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(R.nbytes, 1))
+    try:
+        np.ndarray(R.shape, dtype=R.dtype, buffer=shm.buf)[:] = R
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar,
+                                 initargs=(shm.name, R.shape, R.dtype.str)) as pool:
+            futuros = [pool.submit(_lote, [sementes[i] for i in l], *parametros) for l in lotes]
+            return [r for futuro in futuros for r in futuro.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def chave_reamostragem(cache, retornos, risk_free_rate, target_vol, n_reamostras, tamanho_bloco,
+                       n_pontos, seed, banda, fator_anual):
+    return cache.chave(retornos=retornos, risk_free_rate=float(risk_free_rate), target_vol=float(target_vol),
+                       n_reamostras=int(n_reamostras), tamanho_bloco=int(tamanho_bloco), n_pontos=int(n_pontos),
+                       seed=int(seed), banda=tuple(banda), fator_anual=fator_anual, versao=VERSAO)
+
+
+def fronteira_reamostrada(retornos, risk_free_rate, target_vol, n_reamostras=N_REAMOSTRAS_PADRAO,
+                          tamanho_bloco=BLOCO_PADRAO, n_pontos=50, workers=None, seed=42,
+                          banda=BANDA_PADRAO, fator_anual=252, cache=None):
+    # retornos: DataFrame de log-retornos (datas x ativos, sem NaN), como
+    # resultado['retornos'] de alocacao.alocar. Carteiras no formato de
+    # alocar ({nome: (pesos, (ret, vol, sharpe))}), avaliadas nas estimativas
+    # da amostra inteira; bandas em 'bandas' e nas chaves banda_* da fronteira.
+    if cache is not None:
+        chave = chave_reamostragem(cache, retornos, risk_free_rate, target_vol, n_reamostras,
+                                   tamanho_bloco, n_pontos, seed, banda, fator_anual)
+        resultado = cache.obter(chave)
+        if resultado is not None:
+            return resultado
+
+    R = np.ascontiguousarray(retornos, dtype=float)
+    if np.isnan(R).any():
+        raise ValueError("Retornos com NaN: alinhe os ativos em datas comuns antes")
+    sementes = np.random.SeedSequence(seed).spawn(int(n_reamostras))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sementes)))
+    parametros = (tamanho_bloco, risk_free_rate, target_vol, n_pontos, fator_anual)
+    carteiras, pesos, rets, vols = (np.array(x) for x in zip(*_reamostrar(R, sementes, parametros, workers)))
+
+    mu, sigma = estatisticas(R, fator_anual)
+
+    def avaliar(w):
+        ret = w @ mu
+        vol = np.sqrt(np.einsum('...i,ij,...j->...', w, sigma, w))
+        return ret, vol
+
+    medias = carteiras.mean(axis=0)
+    resultado_carteiras, bandas = {}, {}
+    for i, nome in enumerate(CARTEIRAS):
+        ret, vol = avaliar(medias[i])
+        resultado_carteiras[nome] = (medias[i], (ret, vol, (ret - risk_free_rate) / vol if vol > 0 else 0.0))
+        bandas[nome] = tuple(np.quantile(carteiras[:, i], banda, axis=0))
+
+    pesos_front = pesos.mean(axis=0)
+    rets_front, vols_front = avaliar(pesos_front)
+    resultado = {
+        'tickers': list(getattr(retornos, 'columns', range(R.shape[1]))),
+        'risk_free_rate': risk_free_rate,
+        'target_vol': target_vol,
+        'n_reamostras': len(sementes),
+        'tamanho_bloco': int(tamanho_bloco),
+        'banda': tuple(banda),
+        'carteiras': resultado_carteiras,
+        'bandas': bandas,
+        'fronteira': {
+            'rets': rets_front,
+            'vols': vols_front,
+            'pesos': pesos_front,
+            'banda_pesos': tuple(np.quantile(pesos, banda, axis=0)),
+            'banda_rets': tuple(np.quantile(rets, banda, axis=0)),
+            'banda_vols': tuple(np.quantile(vols, banda, axis=0)),
+        },
+    }
+    if cache is not None:
+        cache.guardar(chave, resultado, ativos=resultado['tickers'])
+    return resultado
@@ -0,0 +1,524 @@
+import os
+import json
+import hashlib
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+import numpy as np
+import pandas as pd
+from alocacao import nuvem_aleatoria, volatilidade_expansiva
+from cache_resultados import atualizar_hash
+from risco import avaliar_carteiras
+
+# Relatórios do modelo de alocação: impressão no console e os gráficos.
+# matplotlib/seaborn só são importados quando um gráfico é pedido, para que
+# quem usa apenas o modelo (ou --sem-graficos) não pague por eles.
+#
+# Cada figura é um par (entradas, desenho): entradas() extrai do resultado só
+# os dados que a figura usa e desenhar() recebe esses dados e o caminho do PNG.
+# O hash das entradas + estilo (este arquivo, fonte, versões) fica em
+# <saida>/.graficos.json; figuras com hash inalterado não são redesenhadas e as
+# demais são desenhadas em paralelo num pool de processos (backend Agg).
+
+PASTA_PADRAO = 'selic volatil'
+FONTE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'fonts', 'Maharlika-Regular.ttf')
+
+TV_BG = '#ffffff'
+TV_GRID = '#f0f3fa'
+TV_TEXT = '#131722'
+TV_GREEN = "#37637E"
+TV_RED = '#f23645'
+TV_BLUE = "#013685"
+TV_YELLOW = '#fbc02d'
+TV_PURPLE = '#6a1b9a' # Roxo forte para LFT
+
+NOMES_CARTEIRAS = {
+    'min_vol': "Carteira Mínima Volatilidade Global",
+    'max_sharpe': "Carteira Máximo Sharpe",
+}
+
+
+# --- Console ---
+
+def imprimir_matrizes(resultado):
+    print("\n" + "="*50)
+    print("MATRIZ DE COVARIANCIA ANUALIZADA")
+    print("="*50)
+    print(resultado['cov_matrix'])
+
+    print("\n" + "="*50)
+    print("MATRIZ DE CORRELAÇÃO")
+    print("="*50)
+    print(resultado['correl_matrix'])
+
+
+def print_portfolio(name, tickers, weights, ret, vol, sr):
+    print(f"\n>>> {name}")
+    for i, ticker in enumerate(tickers):
+        print(f"{ticker}: {weights[i]*100:.2f}%")
+    print(f"Retorno Esperado: {ret*100:.2f}%")
+    print(f"Volatilidade: {vol*100:.2f}%")
+    print(f"Sharpe Ratio: {sr:.2f}")
+
+
+def imprimir_carteiras(resultado):
+    target_vol = resultado['target_vol']
+    if not resultado['alvo_atingido']:
+        vol_min = resultado['carteiras']['min_vol'][1][1]
+        print(f"Aviso: Não foi possível encontrar uma carteira na fronteira com exatos {target_vol*100}% de volatilidade.")
+        print(f"Isso pode acontecer se a volatilidade mínima da carteira (com LFT) for maior que {target_vol*100}%.")
+        print(f"Volatilidade Mínima Possível: {vol_min*100:.2f}%")
+
+    print("\n" + "="*50)
+    print("RESULTADOS (CONSIDERANDO LFT COMO ATIVO VOLÁTIL)")
+    print("="*50)
+
+    nomes = dict(NOMES_CARTEIRAS)
+    nomes['alvo'] = (f"Carteira (Target Vol {target_vol*100}%)" if resultado['alvo_atingido']
+                     else "Carteira (Fallback: Mín Vol)")
+    for chave, nome in nomes.items():
+        pesos, (ret, vol, sr) = resultado['carteiras'][chave]
+        print_portfolio(nome, resultado['tickers'], pesos, ret, vol, sr)
+
+
+def imprimir_risco(resultado, nivel=0.95, pontos_fronteira=10):
+    # Risco histórico (ver risco.py) das três carteiras e da fronteira inteira
+    # numa única avaliação em lote sobre os retornos da amostra
+    chaves = ('min_vol', 'max_sharpe', 'alvo')
+    fronteira = resultado['fronteira']
+    pesos = np.vstack([resultado['carteiras'][c][0] for c in chaves] + [fronteira['pesos']])
+    nomes = list(chaves) + [f"fronteira_{i}" for i in range(len(fronteira['pesos']))]
+    risco = avaliar_carteiras(resultado['retornos'], pesos, nivel, resultado['risk_free_rate'], nomes=nomes)
+
+    def formatar(df):
+        df = df.copy()
+        for coluna in ('var', 'cvar', 'max_drawdown'):
+            df[coluna] = df[coluna].map(lambda x: f"{x*100:.2f}%")
+        df['sortino'] = df['sortino'].map(lambda x: f"{x:.2f}")
+        return df.to_string()
+
+    print("\n" + "="*50)
+    print(f"RISCO HISTÓRICO (VaR/CVaR diários a {nivel:.0%}, drawdown em dias úteis)")
+    print("="*50)
+    print(formatar(risco.loc[list(chaves)]))
+
+    # Fronteira: pontos espaçados do mínimo global ao ativo de maior retorno
+    idx = np.unique(np.linspace(0, len(fronteira['pesos']) - 1, pontos_fronteira).round().astype(int))
+    curva = risco.iloc[len(chaves) + idx].copy()
+    curva.insert(0, 'vol', [f"{v*100:.2f}%" for v in fronteira['vols'][idx]])
+    curva.insert(0, 'retorno', [f"{r*100:.2f}%" for r in fronteira['rets'][idx]])
+    print(f"\nFronteira eficiente ({len(fronteira['pesos'])} carteiras, {len(idx)} exibidas):")
+    print(formatar(curva))
+
+
+def imprimir_reamostragem(reamostrado, resultado, pontos_fronteira=10):
+    # Carteiras e fronteira reamostradas (ver reamostragem.py) ao lado das da
+    # amostra única, com as bandas de confiança entre as reamostras
+    lo, hi = reamostrado['banda']
+    tickers = reamostrado['tickers']
+    print("\n" + "="*50)
+    print(f"FRONTEIRA REAMOSTRADA ({reamostrado['n_reamostras']} reamostras, "
+          f"blocos de {reamostrado['tamanho_bloco']} dias, bandas {lo:.0%}-{hi:.0%})")
+    print("="*50)
+    for chave in ('min_vol', 'max_sharpe', 'alvo'):
+        pesos, (ret, vol, sr) = reamostrado['carteiras'][chave]
+        banda_lo, banda_hi = reamostrado['bandas'][chave]
+        original = resultado['carteiras'][chave][0]
+        print(f"\n>>> {NOMES_CARTEIRAS.get(chave, 'Carteira (Vol Alvo)')}")
+        for i, ticker in enumerate(tickers):
+            print(f"{ticker}: {pesos[i]*100:.2f}% [{banda_lo[i]*100:.2f}% - {banda_hi[i]*100:.2f}%]"
+                  f" (amostra única: {original[i]*100:.2f}%)")
+        print(f"Retorno Esperado: {ret*100:.2f}% | Volatilidade: {vol*100:.2f}% | Sharpe Ratio: {sr:.2f}")
+
+    fronteira = reamostrado['fronteira']
+    n = len(fronteira['pesos'])
+    idx = np.unique(np.linspace(0, n - 1, pontos_fronteira).round().astype(int))
+    (ret_lo, ret_hi), (vol_lo, vol_hi) = fronteira['banda_rets'], fronteira['banda_vols']
+    print(f"\nFronteira reamostrada ({n} pontos, {len(idx)} exibidos; bandas com as estimativas de cada reamostra):")
+    for j in idx:
+        print(f"{j:>3}: retorno {fronteira['rets'][j]*100:6.2f}% [{ret_lo[j]*100:6.2f}% - {ret_hi[j]*100:6.2f}%]"
+              f"  vol {fronteira['vols'][j]*100:6.2f}% [{vol_lo[j]*100:6.2f}% - {vol_hi[j]*100:6.2f}%]")
+
+
+# --- Gráficos ---
+
+def configurar_estilo(fonte=FONTE_PADRAO, headless=True, verbose=True):
+    # Configuração Visual: Estilo Claro com Fonte Maharlika (fonts/ do repositório)
+    import matplotlib
+    if headless:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.font_manager as fm
+    import logging
+    # A Maharlika só tem o peso regular: sem avisos de "findfont" a cada texto em negrito
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+    try:
+        # Registra a fonte no Matplotlib
+        fm.fontManager.addfont(fonte)
+        prop = fm.FontProperties(fname=fonte)
+        plt.rcParams['font.family'] = prop.get_name()
+        plt.rcParams['font.weight'] = 'bold'
+        plt.rcParams['axes.labelweight'] = 'bold'
+        if verbose:
+            print(f"Fonte '{prop.get_name()}' carregada com sucesso!")
+    except Exception as e:
+        if verbose:
+            print(f"Aviso: Não foi possível carregar a fonte '{fonte}': {e}")
+        plt.rcParams['font.family'] = 'sans-serif'
+        plt.rcParams['font.weight'] = 'bold'
+
+
+def apply_tv_style(ax, title="", show_grid=True):
+    ax.set_facecolor(TV_BG)
+    if show_grid:
+        ax.grid(True, color=TV_GRID, linestyle='-', linewidth=0.5, zorder=0)
+        ax.set_axisbelow(True) # Garante que o grid fique ATRÁS dos dados
+    else:
+        ax.grid(False)
+
+    ax.set_title(title, fontsize=18, fontweight='bold', pad=20, color=TV_TEXT)
+    ax.tick_params(colors=TV_TEXT, labelsize=12)
+
+    # Garantir labels e ticks em negrito
+    ax.xaxis.label.set_size(14)
+    ax.xaxis.label.set_fontweight('bold')
+    ax.yaxis.label.set_size(14)
+    ax.yaxis.label.set_fontweight('bold')
+
+    for label in ax.get_xticklabels() + ax.get_yticklabels():
+        label.set_fontweight('bold')
+
+    for spine in ax.spines.values():
+        spine.set_color('#d1d4dc')
+
+
+def add_watermark(fig):
+    # Adiciona "B." em negrito no canto inferior direito de cada imagem
+    fig.text(0.99, 0.01, 'B.', fontsize=24, fontweight='bold',
+             color='black', ha='right', va='bottom', alpha=1.0)
+
+
+def _salvar(fig, caminho):
+    import matplotlib.pyplot as plt
+    add_watermark(fig)
+    plt.savefig(caminho, facecolor=TV_BG, bbox_inches='tight')
+    plt.close(fig)
+    return caminho
+
+
+def cores_ativos(tickers):
+    # Roxo para a LFT, cores fixas para BOVA11/IMAB11 e vermelho para o resto
+    cores = []
+    for ticker in tickers:
+        if ticker == 'LFT':
+            cores.append(TV_PURPLE)
+        elif ticker == 'BOVA11.SA':
+            cores.append(TV_BLUE)
+        elif ticker == 'IMAB11.SA':
+            cores.append(TV_YELLOW)
+        else:
+            cores.append(TV_RED)
+    return cores
+
+
+# Matrizes de covariância e correlação
+
+def entradas_covariancia(resultado):
+    return {'matriz': resultado['cov_matrix']}
+
+
+def desenhar_covariancia(entradas, caminho):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(10, 8), facecolor=TV_BG)
+    sns.heatmap(entradas['matriz'], annot=True, cmap='Blues', fmt=".6f", ax=ax,
+                cbar_kws={'label': 'Covariância'}, annot_kws={"size": 12, "color": TV_TEXT, "fontweight": "bold"})
+    apply_tv_style(ax, 'Matriz de Covariância Anualizada (Incluindo LFT)', show_grid=False)
+    return _salvar(fig, caminho)
+
+
+def entradas_correlacao(resultado):
+    return {'matriz': resultado['correl_matrix']}
+
+
+def desenhar_correlacao(entradas, caminho):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(10, 8), facecolor=TV_BG)
+    sns.heatmap(entradas['matriz'], annot=True, cmap='RdYlGn', center=0, fmt=".4f", ax=ax,
+                cbar_kws={'label': 'Correlação'}, annot_kws={"size": 12, "color": TV_TEXT, "fontweight": "bold"})
+    apply_tv_style(ax, 'Matriz de Correlação (Incluindo LFT)', show_grid=False)
+    return _salvar(fig, caminho)
+
+
+# Composição do portfólio ao longo da fronteira: % LFT vs % ativos de risco
+
+def entradas_proporcoes(resultado):
+    return {
+        'tickers': resultado['tickers'],
+        'pesos_front': resultado['fronteira']['pesos'],
+        'rets_front': resultado['fronteira']['rets'],
+        'ret_alvo': resultado['carteiras']['alvo'][1][0],
+        'target_vol': resultado['target_vol'],
+    }
+
+
+def desenhar_proporcoes(entradas, caminho):
+    import matplotlib.pyplot as plt
+    tickers = entradas['tickers']
+    pesos_front = entradas['pesos_front']
+
+    fig, ax = plt.subplots(figsize=(12, 7), facecolor=TV_BG)
+
+    idx_lft = tickers.index('LFT')
+    peso_lft = pesos_front[:, idx_lft]
+    peso_risco = np.sum(pesos_front[:, [i for i in range(len(tickers)) if i != idx_lft]], axis=1)
+
+    # X-axis: Retorno Anual Esperado (%)
+    returns_pct = entradas['rets_front'] * 100
+
+    ax.stackplot(returns_pct, peso_lft * 100, peso_risco * 100,
+                  labels=['% LFT', '% Ativos de Risco'],
+                  colors=[TV_PURPLE, TV_RED], alpha=0.6)
+
+    apply_tv_style(ax, 'Proporção de Alocação vs. Retorno Esperado')
+    ax.set_xlabel('Retorno Anual Esperado (%)', color=TV_TEXT)
+    ax.set_ylabel('Proporção da Carteira (%)', color=TV_TEXT)
+
+    # Linha vertical no ponto de risco alvo
+    ret_risco = entradas['ret_alvo'] * 100
+    rotulo = f"Risco {entradas['target_vol']*100:g}% (Retorno: {ret_risco:.2f}%)"
+    ax.axvline(x=ret_risco, color=TV_BLUE, linestyle='--', linewidth=2, label=rotulo)
+    ax.legend(loc='upper right', facecolor=TV_BG, edgecolor='#d1d4dc', labelcolor=TV_TEXT, fontsize=12)
+    return _salvar(fig, caminho)
+
+
+# Fronteira eficiente sobre a nuvem de Monte Carlo
+
+def entradas_fronteira(resultado, n_simulacoes=30000):
+    # A nuvem é determinística (seed fixa): basta o hash de μ, Σ, rf e n
+    return {
+        'ret_mean': resultado['ret_mean'],
+        'cov_matrix': resultado['cov_matrix'],
+        'risk_free_rate': resultado['risk_free_rate'],
+        'n_simulacoes': n_simulacoes,
+        'vols_front': resultado['fronteira']['vols'],
+        'rets_front': resultado['fronteira']['rets'],
+        'pontos': {chave: resultado['carteiras'][chave][1][:2] for chave in ('min_vol', 'max_sharpe', 'alvo')},
+    }
+
+
+def desenhar_fronteira(entradas, caminho):
+    import matplotlib.pyplot as plt
+    sim_rets, sim_vols, sim_srs = nuvem_aleatoria(entradas['ret_mean'], entradas['cov_matrix'],
+                                                  entradas['risk_free_rate'], entradas['n_simulacoes'])
+    ret_min, vol_min = entradas['pontos']['min_vol']
+    ret_sharpe, vol_sharpe = entradas['pontos']['max_sharpe']
+    ret_alvo, vol_alvo = entradas['pontos']['alvo']
+
+    fig, ax = plt.subplots(figsize=(12, 8), facecolor=TV_BG)
+
+    # Nuvem densa rasterizada: um bitmap em vez de 30k marcadores vetoriais
+    scatter = ax.scatter(sim_vols, sim_rets, c=sim_srs, cmap='viridis', s=8, alpha=0.2,
+                         label='Portfólios Aleatórios', rasterized=True)
+    cbar = fig.colorbar(scatter, ax=ax)
+    cbar.set_label('Sharpe Ratio', color=TV_TEXT, fontweight='bold')
+    cbar.ax.yaxis.set_tick_params(color=TV_TEXT)
+    # Tick labels da colorbar em negrito
+    for label in cbar.ax.get_yticklabels():
+        label.set_fontweight('bold')
+    plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color=TV_TEXT)
+
+    # Plotar o Contorno Matematico (Linha da Fronteira)
+    ax.plot(entradas['vols_front'], entradas['rets_front'],
+             color=TV_TEXT, linestyle='-', linewidth=2.5, label='Fronteira Eficiente')
+
+    # Plotar os Pontos Ótimos
+    ax.scatter(vol_min, ret_min, color=TV_BLUE, s=150, marker='o', label='Mínima Volatilidade', edgecolors=TV_TEXT, zorder=5)
+    ax.scatter(vol_sharpe, ret_sharpe, color=TV_YELLOW, s=200, marker='*', label='Máximo Sharpe', edgecolors=TV_TEXT, zorder=5)
+    ax.scatter(vol_alvo, ret_alvo, color=TV_RED, s=150, marker='D', label='Carteira (Meta Vol)', edgecolors=TV_TEXT, zorder=5)
+
+    apply_tv_style(ax, 'Fronteira Eficiente (LFT incluída na Otimização)')
+    ax.set_xlabel('Volatilidade Anual (Risco)', color=TV_TEXT)
+    ax.set_ylabel('Retorno Esperado Anual', color=TV_TEXT)
+    ax.legend(loc='upper right', facecolor=TV_BG, edgecolor='#d1d4dc', labelcolor=TV_TEXT, fontsize=12)
+    return _salvar(fig, caminho)
+
+
+# Volatilidade individual (barras) e evolução temporal (expansiva)
+
+def entradas_volatilidade(resultado):
+    return {
+        'tickers': resultado['tickers'],
+        'cov_matrix': resultado['cov_matrix'],
+        'retornos': resultado['retornos'],
+        'w_alvo': resultado['carteiras']['alvo'][0],
+    }
+
+
+def desenhar_volatilidade(entradas, caminho):
+    import matplotlib.pyplot as plt
+    tickers = entradas['tickers']
+    vols_individuais = np.sqrt(np.diag(entradas['cov_matrix']))
+    vol_acumulada, vol_carteira = volatilidade_expansiva(entradas['retornos'], entradas['w_alvo'])
+    bar_colors = cores_ativos(tickers)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8), facecolor=TV_BG)
+
+    ax1.bar(tickers, vols_individuais * 100, color=bar_colors, alpha=0.7, edgecolor=TV_TEXT)
+    apply_tv_style(ax1, 'Volatilidade Individual (Anualizada %)')
+    ax1.set_ylabel('Volatilidade (%)', color=TV_TEXT)
+    ax1.set_xlabel('Ativos', color=TV_TEXT)
+
+    for i, v in enumerate(vols_individuais):
+        ax1.text(i, (v * 100) + 0.2, f"{v*100:.2f}%", ha='center', fontweight='bold', color=TV_TEXT, fontsize=12)
+
+    for i, ticker in enumerate(tickers):
+        ax2.plot(vol_acumulada.index, vol_acumulada[ticker] * 100, label=ticker, linewidth=1.5, color=bar_colors[i], alpha=0.6)
+
+    # Plotar a Carteira com destaque (Linha preta grossa)
+    ax2.plot(vol_carteira.index, vol_carteira * 100,
+             label='CARTEIRA', linewidth=4, color='#131722', linestyle='-', zorder=10)
+
+    apply_tv_style(ax2, 'Evolução da Volatilidade Histórica (Anualizada %)')
+    ax2.set_ylabel('Volatilidade Acumulada (%)', color=TV_TEXT)
+    ax2.set_xlabel('Ano', color=TV_TEXT)
+    ax2.legend(facecolor=TV_BG, edgecolor='#d1d4dc', labelcolor=TV_TEXT, fontsize=11, loc='upper right')
+
+    plt.tight_layout()
+    return _salvar(fig, caminho)
+
+
+# Evolução de R$ 100 investidos em cada ativo e na carteira alvo
+
+def entradas_retorno_acumulado(resultado):
+    return {
+        'tickers': resultado['tickers'],
+        'retornos': resultado['retornos'],
+        'w_alvo': resultado['carteiras']['alvo'][0],
+    }
+
+
+def desenhar_retorno_acumulado(entradas, caminho):
+    import matplotlib.pyplot as plt
+    tickers = entradas['tickers']
+    retornos = entradas['retornos']
+    bar_colors = cores_ativos(tickers)
+
+    ret_acum_ativos = np.exp(retornos.cumsum()) * 100
+    ret_acum_carteira = np.exp((retornos * entradas['w_alvo']).sum(axis=1).cumsum()) * 100
+
+    fig, ax = plt.subplots(figsize=(14, 8), facecolor=TV_BG)
+
+    for i, ticker in enumerate(tickers):
+        ax.plot(ret_acum_ativos.index, ret_acum_ativos[ticker], label=ticker, linewidth=2, color=bar_colors[i], alpha=0.7)
+
+    # Plotar Carteira (Destaque em Preto)
+    ax.plot(ret_acum_carteira.index, ret_acum_carteira, label='CARTEIRA', linewidth=4, color='#131722', linestyle='-', zorder=10)
+
+    apply_tv_style(ax, 'Simulação de Investimento: Evolução de R$ 100,00')
+    ax.set_ylabel('Valor Acumulado (R$)', color=TV_TEXT)
+    ax.set_xlabel('Ano', color=TV_TEXT)
+    ax.legend(facecolor=TV_BG, edgecolor='#d1d4dc', labelcolor=TV_TEXT, fontsize=12, loc='upper right')
+
+    plt.tight_layout()
+    return _salvar(fig, caminho)
+
+
+# arquivo -> (entradas, desenho)
+FIGURAS = {
+    'matriz_covariancia_lft.png': (entradas_covariancia, desenhar_covariancia),
+    'matriz_correlacao_lft.png': (entradas_correlacao, desenhar_correlacao),
+    'proporcao_alocacao_retorno.png': (entradas_proporcoes, desenhar_proporcoes),
+    'fronteira_com_oscilacao.png': (entradas_fronteira, desenhar_fronteira),
+    'analise_volatilidade_completa.png': (entradas_volatilidade, desenhar_volatilidade),
+    'evolucao_retorno_acumulado.png': (entradas_retorno_acumulado, desenhar_retorno_acumulado),
+}
+ARQ_CACHE = '.graficos.json'
+
+
+# --- Pipeline com cache ---
+
+def hash_estilo(fonte=FONTE_PADRAO):
+    # Código deste arquivo (estilo e desenho), fonte e versões das bibliotecas
+    h = hashlib.sha256()
+    with open(os.path.abspath(__file__), 'rb') as f:
+        h.update(f.read())
+    if os.path.exists(fonte):
+        with open(fonte, 'rb') as f:
+            h.update(f.read())
+    for pacote in ('matplotlib', 'seaborn'):
+        try:
+            h.update(metadata.version(pacote).encode())
+        except metadata.PackageNotFoundError:
+            pass
+    return h.hexdigest()
+
+
+def hash_figura(entradas, estilo):
+    h = hashlib.sha256(estilo.encode())
+    atualizar_hash(h, entradas)
+    return h.hexdigest()[:16]
+
+
+def _carregar_cache(saida):
+    caminho = os.path.join(saida, ARQ_CACHE)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _salvar_cache(saida, cache):
+    caminho = os.path.join(saida, ARQ_CACHE)
+    tmp = caminho + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, caminho)
+
+
+def _renderizar(desenho, entradas, caminho, fonte):
+    # Executado nos processos do pool (ou inline quando só há uma figura)
+    configurar_estilo(fonte, headless=True, verbose=False)
+    return desenho(entradas, caminho)
+
+
+def gerar_graficos(resultado, saida=PASTA_PADRAO, fonte=FONTE_PADRAO, workers=None, forcar=False, etapa=None):
+    # Devolve {caminho: 'gerado' | 'inalterado'}
+    # etapa: fábrica de context managers para cronometrar as fases (ex:
+    # instrumentacao.etapa); por padrão não mede nada
+    etapa = etapa or (lambda nome: nullcontext())
+    os.makedirs(saida, exist_ok=True)
+    cache = {} if forcar else _carregar_cache(saida)
+    estilo = hash_estilo(fonte)
+
+    pendentes, status = {}, {}
+    for arquivo, (entradas_fn, desenho) in FIGURAS.items():
+        caminho = os.path.join(saida, arquivo)
+        with etapa(f"entradas/{arquivo}"):
+            entradas = entradas_fn(resultado)
+            assinatura = hash_figura(entradas, estilo)
+        if cache.get(arquivo) == assinatura and os.path.exists(caminho):
+            status[caminho] = 'inalterado'
+            continue
+        pendentes[arquivo] = (desenho, entradas, caminho, assinatura)
+
+    if len(pendentes) == 1 or workers == 1:
+        # Sem pool: subir processos custaria mais que a própria figura
+        for arquivo, (desenho, entradas, caminho, assinatura) in pendentes.items():
+            with etapa(f"desenho/{arquivo}"):
+                _renderizar(desenho, entradas, caminho, fonte)
+            cache[arquivo] = assinatura
+            status[caminho] = 'gerado'
+    elif pendentes:
+        with etapa("desenho"), ProcessPoolExecutor(max_workers=workers or min(len(pendentes), os.cpu_count() or 1)) as pool:
+            futuros = {arquivo: pool.submit(_renderizar, desenho, entradas, caminho, fonte)
+                       for arquivo, (desenho, entradas, caminho, _) in pendentes.items()}
+            for arquivo, futuro in futuros.items():
+                caminho = futuro.result()
+                cache[arquivo] = pendentes[arquivo][3]
+                status[caminho] = 'gerado'
+
+    _salvar_cache(saida, cache)
+    # Mesma ordem de FIGURAS
+    return {os.path.join(saida, arquivo): status[os.path.join(saida, arquivo)] for arquivo in FIGURAS}
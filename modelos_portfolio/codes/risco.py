@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Métricas de risco históricas para conjuntos inteiros de carteiras
+# (fronteira, nuvem de Monte Carlo, pesos do backtest...). Para P carteiras de
+# pesos fixos sobre T datas, os retornos de todas saem de um único produto
+# W (P x N) @ Rᵀ (N x T) e cada métrica é uma redução vetorizada ao longo do
+# tempo, sem laço por carteira:
+#   VaR / CVaR      - estatísticas de ordem (np.partition, O(T) por carteira)
+#   max drawdown    - máximo acumulado da riqueza (em log, sem overflow)
+#   duração         - maior sequência de períodos abaixo do pico anterior
+#   Sortino         - retorno anualizado sobre o desvio abaixo do mínimo aceitável
+# As carteiras são processadas em blocos para que a memória de trabalho fique
+# em O(bloco * T), independente de P. Os retornos não podem ter NaN (use
+# datas comuns, ex: Cubo.alinhados ou resultado['retornos']).
+
+NIVEL_PADRAO = 0.95
+# Elementos (carteiras x datas) por bloco: ~32 MB por matriz float64
+ELEMENTOS_BLOCO = 1 << 22
+COLUNAS = ['var', 'cvar', 'max_drawdown', 'duracao_drawdown', 'sortino']
+
+
+def _cauda(T, nivel):
+    # Número de observações na cauda de (1 - nivel): ao menos uma
+    return min(T, max(1, int(np.ceil((1 - nivel) * T - 1e-9))))
+
+
+def metricas(ret, nivel=NIVEL_PADRAO, risk_free_rate=0.0, fator_anual=252):
+    # ret: (P, T) retornos simples de cada carteira por período, em ordem de data.
+    # Devolve {métrica: array (P,)}; VaR/CVaR são perdas por período (positivas),
+    # max_drawdown é negativo (como no backtest) e a duração é em períodos.
+    ret = np.asarray(ret, dtype=float)
+    P, T = ret.shape
+
+    # VaR: k-ésimo menor retorno; CVaR: média dos k menores (o próprio VaR incluso)
+    k = _cauda(T, nivel)
+    menores = np.partition(ret, k - 1, axis=1)[:, :k]
+    var = -menores[:, k - 1]
+    cvar = -menores.mean(axis=1)
+
+    # Riqueza em log a partir de 1 (o pico inicial é o capital investido)
+    log_riqueza = np.cumsum(np.log1p(ret), axis=1)
+    pico = np.maximum(np.maximum.accumulate(log_riqueza, axis=1), 0.0)
+    max_dd = np.expm1((log_riqueza - pico).min(axis=1))
+
+    # Duração: para cada data, períodos desde a última vez no pico (-1 = início)
+    indices = np.arange(T)
+    no_pico = log_riqueza >= pico
+    ultimo_pico = np.maximum.accumulate(np.where(no_pico, indices, -1), axis=1)
+    duracao = (indices - ultimo_pico).max(axis=1)
+
+    # Sortino: mínimo aceitável = taxa livre de risco por período
+    mar = risk_free_rate / fator_anual
+    desvio_baixa = np.sqrt(np.mean(np.minimum(ret - mar, 0.0) ** 2, axis=1) * fator_anual)
+    excesso = (ret.mean(axis=1) - mar) * fator_anual
+    sortino = np.full(P, np.nan)
+    np.divide(excesso, desvio_baixa, out=sortino, where=desvio_baixa > 0)
+
+    return {
+        'var': var,
+        'cvar': cvar,
+        'max_drawdown': max_dd,
+        'duracao_drawdown': duracao,
+        'sortino': sortino,
+    }
+
+
+def avaliar_carteiras(retornos, pesos, nivel=NIVEL_PADRAO, risk_free_rate=0.0, fator_anual=252,
+                      log=True, nomes=None, elementos_bloco=ELEMENTOS_BLOCO):
+    # retornos: (T, N) DataFrame/array de retornos dos ativos (log, como em
+    # estatisticas_retornos, ou simples com log=False); pesos: (P, N), uma
+    # carteira por linha, rebalanceada aos pesos fixos a cada período.
+    # Devolve um DataFrame (P x COLUNAS).
+    R = np.asarray(retornos, dtype=float)
+    if log:
+        R = np.expm1(R)
+    W = np.atleast_2d(np.asarray(pesos, dtype=float))
+    if np.isnan(R).any():
+        raise ValueError("Retornos com NaN: alinhe os ativos em datas comuns antes")
+    T, P = R.shape[0], W.shape[0]
+
+    Rt = np.ascontiguousarray(R.T)
+    bloco = max(1, int(elementos_bloco) // max(T, 1))
+    saida = {c: np.empty(P) for c in COLUNAS}
+    for i in range(0, P, bloco):
+        # Um produto matricial por bloco: (b x N) @ (N x T), linhas contíguas no tempo
+        parcial = metricas(W[i:i + bloco] @ Rt, nivel, risk_free_rate, fator_anual)
+        for c in COLUNAS:
+            saida[c][i:i + bloco] = parcial[c]
+
+    df = pd.DataFrame(saida, index=nomes)
+    df['duracao_drawdown'] = df['duracao_drawdown'].astype(int)
+    return df
+
+
+def avaliar_series(retornos, nivel=NIVEL_PADRAO, risk_free_rate=0.0, fator_anual=252):
+    # Mesmas métricas para retornos simples já realizados (ex: as colunas de
+    # resultado['retornos'] do backtest), uma carteira por coluna
+    df = pd.DataFrame(retornos)
+    ret = df.to_numpy(dtype=float).T
+    saida = metricas(ret, nivel, risk_free_rate, fator_anual)
+    return pd.DataFrame(saida, index=df.columns).astype({'duracao_drawdown': int})
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Testes rodam da raiz: python -m pytest tests
+# Mesmos caminhos que benchmarks/rodar.py (camada de dados, modelo e o
+# universo sintético de benchmarks/sintetico.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for pasta in ('dados/codes', 'modelos_portfolio/codes', 'benchmarks', '.'):
+    caminho = os.path.join(ROOT, pasta)
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
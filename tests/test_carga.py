@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from sintetico import escrever_universo
+from retornos import carregar_cubo
+from taxas import atualizar_indice
+from carga import carregar_retornos
+
+ATIVOS = ['sint_0000', 'sint_0001', 'sint_0002']
+
+
+def test_retornos_do_cubo_com_lft_nas_mesmas_datas(tmp_path):
+    universo = str(tmp_path / "universo")
+    precos = escrever_universo(universo, n_ativos=3, anos=1, seed=0)
+    cubo = carregar_cubo(universo, destino=str(tmp_path / "cubo"))
+
+    # Selic com um degrau, terminando antes do fim do universo
+    datas = pd.date_range("1994-12-01", "1995-10-31", freq="D")
+    selic = pd.Series(np.where(datas < "1995-06-01", 40.0, 30.0), index=datas)
+    origem = str(tmp_path / "selic.csv")
+    selic.rename("selic_meta_aa").rename_axis("date").to_csv(origem)
+    indice = atualizar_indice(origem, str(tmp_path / "taxas"))[0]
+
+    retornos, _ = carregar_retornos(cubo, ATIVOS, inicio="1995-02-01", indice=indice)
+    assert list(retornos.columns) == [c.upper() for c in ATIVOS] + ['LFT']
+    assert retornos.index[-1] <= pd.Timestamp(indice.datas[-1])
+
+    # Ativos de risco: os mesmos retornos do frame de preços com inner join
+    comuns = precos.loc["1995-02-01":str(indice.datas[-1]), ATIVOS].dropna()
+    esperado = np.log(comuns / comuns.shift(1)).dropna()
+    np.testing.assert_allclose(retornos.iloc[:, :3].to_numpy(), esperado.to_numpy(), atol=1e-5)
+    np.testing.assert_array_equal(retornos.index, esperado.index)
+
+    # LFT: razão do índice entre cada data e a anterior do alinhamento
+    datas_comuns = comuns.index.values
+    lft = np.log(indice.valor(datas_comuns[1:]) / indice.valor(datas_comuns[:-1]))
+    np.testing.assert_allclose(retornos['LFT'].to_numpy(), lft, rtol=1e-12)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from sintetico import gerar_precos
+from alocacao import estatisticas_retornos
+from fatores import estimar_pca
+from cla import CLA, FronteiraCLA
+
+
+# Universos em que o CLA com ModeloFatores ciclava: o lambda de entrada do
+# ativo recém-fixado diferia do corrente só por arredondamento
+@pytest.mark.parametrize('n_ativos, seed', [(20, 0), (20, 2), (50, 0)])
+def test_cla_fatores_termina_e_coincide_com_denso(n_ativos, seed):
+    retornos = np.log(gerar_precos(n_ativos, 20, seed)).diff().dropna()
+    ret_mean, _ = estatisticas_retornos(retornos)
+    modelo = estimar_pca(retornos, 10)
+
+    fatores = FronteiraCLA(ret_mean.values, modelo)
+    denso = FronteiraCLA(ret_mean.values, modelo.denso())
+
+    assert len(fatores.cantos) <= 2 * n_ativos
+    assert fatores.cantos.shape == denso.cantos.shape
+    np.testing.assert_allclose(fatores.cantos, denso.cantos, atol=1e-9)
+    np.testing.assert_allclose(fatores.max_sharpe(), denso.max_sharpe(), atol=1e-9)
+
+
+def test_cla_limite_de_cantos(monkeypatch):
+    # Um ciclo vira erro em vez de laço infinito
+    import cla
+    ret_mean, cov = estatisticas_retornos(np.log(gerar_precos(10, 5, 0)).diff().dropna())
+    monkeypatch.setattr(cla, 'MAX_CANTOS_POR_ATIVO', 0)
+    with pytest.raises(RuntimeError):
+        CLA(ret_mean.values, cov.values).solve()
@@ -0,0 +1,72 @@
+import sys
+import time
+import types
+import numpy as np
+import pandas as pd
+from coleta import Tarefa, agrupar_lotes, coletar
+from provedores import ProvedorLocal, ProvedorSGS, ProvedorYahoo
+
+
+def _publicar(pasta, ticker, datas):
+    serie = pd.Series(np.arange(len(datas), dtype=float) + 1, index=datas, name=ticker)
+    serie.rename_axis("Date").to_csv(pasta / f"{ticker}.csv")
+    return serie
+
+
+def test_lote_unico_com_inicios_diferentes(tmp_path):
+    # Calendários diferentes (cripto, B3, EUA): cada ticker tem o seu último dia
+    datas = pd.date_range("2024-01-01", "2024-03-31", freq="D", name="Date")
+    inicios = {"BTC-USD": "2024-03-30", "BOVA11.SA": "2024-03-28", "SPY": "2024-03-27", "NOVO": None}
+    series = {t: _publicar(tmp_path, t, datas) for t in inicios}
+    provedor = ProvedorLocal(str(tmp_path))
+    tarefas = [Tarefa(t.lower(), t, "yahoo", inicio) for t, inicio in inicios.items()]
+
+    lotes = agrupar_lotes(tarefas, {"yahoo": provedor})
+    assert len(lotes) == 1 and lotes[0][1] is None
+
+    resultados, erros, stats = coletar(tarefas, {"yahoo": provedor})
+    assert not erros and stats["lotes"] == 1 and len(provedor.chamadas) == 1
+    for ticker, inicio in inicios.items():
+        esperado = series[ticker] if inicio is None else series[ticker][inicio:]
+        pd.testing.assert_series_equal(resultados[ticker.lower()], esperado, check_names=False, check_freq=False)
+
+
+def test_lote_pede_do_inicio_mais_antigo(tmp_path):
+    provedor = ProvedorLocal(str(tmp_path))
+    tarefas = [Tarefa(f"a{i}", f"T{i}", "yahoo", f"2024-03-{10 + i}") for i in range(5)]
+    (chave, inicio, grupo), = agrupar_lotes(reversed(tarefas), {"yahoo": provedor})
+    assert inicio == "2024-03-10" and len(grupo) == 5
+
+
+def test_yahoo_ticker_ausente_na_resposta(monkeypatch):
+    # Resposta do lote sem uma das colunas: só esse ticker fica vazio
+    datas = pd.date_range("2024-01-02", periods=3, name="Date")
+    colunas = pd.MultiIndex.from_product([["Adj Close", "Close"], ["SPY", "TLT"]])
+    data = pd.DataFrame(np.ones((3, 4)), index=datas, columns=colunas)
+    chamadas = []
+
+    def download(tickers, **kwargs):
+        chamadas.append(tickers)
+        return data
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+    resultado = ProvedorYahoo(intervalo=0).baixar_lote(["SPY", "TLT", "GLD"])
+    assert chamadas == [["SPY", "TLT", "GLD"]]
+    assert len(resultado["SPY"]) == len(resultado["TLT"]) == 3
+    assert resultado["GLD"].empty
+
+
+def test_sgs_espaca_cada_janela(monkeypatch):
+    # Histórico completo = uma requisição por janela de 10 anos, todas espaçadas
+    instantes = []
+
+    def get(url, params=None, **kwargs):
+        instantes.append(time.monotonic())
+        return types.SimpleNamespace(status_code=200, raise_for_status=lambda: None,
+                                     json=lambda: [{"data": params["dataInicial"], "valor": "10.0"}])
+
+    monkeypatch.setitem(sys.modules, "requests", types.SimpleNamespace(get=get))
+    provedor = ProvedorSGS(intervalo=0.05)
+    resultados, erros, _ = coletar([Tarefa("selic", "432", "sgs")], {"sgs": provedor})
+    assert not erros and len(resultados["selic"]) == len(instantes) >= 3
+    assert min(np.diff(instantes)) >= 0.045
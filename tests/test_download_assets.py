@@ -0,0 +1,138 @@
+import functools
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import coleta
+import download_assets
+import qualidade
+from provedores import ProvedorLocal, com_retentativas
+
+# sync_all contra o provedor local (CSVs numa pasta temporária), sem rede
+
+NOMES = ["us_sp500_SPY", "us_treasury_bond_20y_TLT"]
+TICKERS = {"us_sp500_SPY": "SPY", "us_treasury_bond_20y_TLT": "TLT"}
+
+
+def _precos(ticker, n, seed):
+    rng = np.random.default_rng(seed)
+    datas = pd.bdate_range("2020-01-02", periods=n, name="Date")
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=datas, name=ticker)
+
+
+def _publicar(fonte, serie):
+    serie.to_csv(os.path.join(fonte, f"{serie.name}.csv"))
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    # dados/ e a quarentena numa pasta temporária; retentativas sem espera
+    dados = tmp_path / "dados"
+    fonte = tmp_path / "fonte"
+    dados.mkdir()
+    fonte.mkdir()
+    monkeypatch.setattr(download_assets, "base_path", str(dados))
+    monkeypatch.setattr(qualidade, "registrar",
+                        functools.partial(qualidade.registrar, pasta=str(tmp_path / "quarentena")))
+    monkeypatch.setattr(coleta, "com_retentativas", functools.partial(com_retentativas, espera_base=0))
+    series = {nome: _precos(ticker, 300, i) for i, (nome, ticker) in enumerate(TICKERS.items())}
+    return {"dados": dados, "fonte": str(fonte), "estado": str(dados / "sync_state.json"), "series": series}
+
+
+def _sincronizar(ambiente, provedor, mode):
+    return download_assets.sync_all({"yahoo": provedor}, mode, NOMES, state_path=ambiente["estado"])
+
+
+def _arquivo(nome):
+    asset = next(a for a in download_assets.ATIVOS if a["nome"] == nome)
+    return download_assets.get_file_path(asset)
+
+
+def test_completo_incremental_e_pular(ambiente):
+    serie = ambiente["series"]
+    for nome in NOMES:
+        _publicar(ambiente["fonte"], serie[nome].iloc[:200])
+    provedor = ProvedorLocal(ambiente["fonte"])
+
+    # 1) Sem arquivos: histórico completo
+    estado = _sincronizar(ambiente, provedor, "incremental")
+    assert [inicio for _, inicio in provedor.chamadas] == [None]
+    for nome in NOMES:
+        gravado = download_assets.read_existing(_arquivo(nome))
+        pd.testing.assert_series_equal(gravado, serie[nome].iloc[:200], check_names=False, check_freq=False)
+        assert estado[nome]["rows"] == estado[nome]["rows_added"] == 200
+        assert estado[nome]["last_date"] == serie[nome].index[199].strftime("%Y-%m-%d")
+        assert estado[nome]["ticker"] == TICKERS[nome]
+        assert estado[nome]["provider"] == "local"
+        assert estado[nome]["quarantined"] == 0
+
+    # 2) Novas linhas e o último fechamento revisado: só a cauda é pedida
+    revisada = serie["us_sp500_SPY"].iloc[:250].copy()
+    revisada.iloc[199] *= 1.001
+    _publicar(ambiente["fonte"], revisada)
+    _publicar(ambiente["fonte"], serie["us_treasury_bond_20y_TLT"].iloc[:250])
+    provedor.chamadas.clear()
+    estado = _sincronizar(ambiente, provedor, "incremental")
+
+    assert [inicio for _, inicio in provedor.chamadas] == [serie["us_sp500_SPY"].index[199]]
+    gravado = download_assets.read_existing(_arquivo("us_sp500_SPY"))
+    pd.testing.assert_series_equal(gravado, revisada, check_names=False, check_freq=False)
+    for nome in NOMES:
+        assert estado[nome]["rows"] == 250
+        assert estado[nome]["rows_added"] == 50
+    assert download_assets.load_state(ambiente["estado"]) == estado
+
+    # 3) Modo skip: arquivos existentes não são tocados nem pedidos
+    _publicar(ambiente["fonte"], serie["us_sp500_SPY"])
+    antes = open(_arquivo("us_sp500_SPY"), "rb").read()
+    provedor.chamadas.clear()
+    assert _sincronizar(ambiente, provedor, "skip") == estado
+    assert provedor.chamadas == []
+    assert open(_arquivo("us_sp500_SPY"), "rb").read() == antes
+
+
+class ProvedorFalho(ProvedorLocal):
+    # Lê o primeiro ticker do lote e falha no seguinte
+    def baixar_lote(self, tickers, inicio=None):
+        super().baixar_lote(tickers[:1], inicio)
+        raise ConnectionError(f"falha em {tickers[1]}")
+
+
+def test_falha_no_lote_nao_deixa_arquivo_parcial(ambiente):
+    serie = ambiente["series"]
+    for nome in NOMES:
+        _publicar(ambiente["fonte"], serie[nome].iloc[:200])
+    _sincronizar(ambiente, ProvedorLocal(ambiente["fonte"]), "incremental")
+    antes = {nome: open(_arquivo(nome), "rb").read() for nome in NOMES}
+    estado_antes = download_assets.load_state(ambiente["estado"])
+
+    for nome in NOMES:
+        _publicar(ambiente["fonte"], serie[nome])
+    estado = _sincronizar(ambiente, ProvedorFalho(ambiente["fonte"]), "full")
+
+    # O lote inteiro falhou: CSVs e estado como estavam, nenhum .tmp
+    assert estado == estado_antes
+    for nome in NOMES:
+        assert open(_arquivo(nome), "rb").read() == antes[nome]
+    assert not [f for _, _, arquivos in os.walk(ambiente["dados"]) for f in arquivos if f.endswith(".tmp")]
+
+
+def test_escrita_interrompida_preserva_o_csv(ambiente, monkeypatch):
+    serie = ambiente["series"]["us_sp500_SPY"]
+    _publicar(ambiente["fonte"], serie.iloc[:200])
+    provedor = ProvedorLocal(ambiente["fonte"])
+    download_assets.sync_all({"yahoo": provedor}, "incremental", ["us_sp500_SPY"], state_path=ambiente["estado"])
+    caminho = _arquivo("us_sp500_SPY")
+    antes = open(caminho, "rb").read()
+
+    def escrita_parcial(self, path, *args, **kwargs):
+        with open(path, "w") as f:
+            f.write("Date,SPY\n2020-01-02,")
+        raise OSError("disco cheio")
+
+    _publicar(ambiente["fonte"], serie)
+    monkeypatch.setattr(pd.Series, "to_csv", escrita_parcial)
+    with pytest.raises(OSError):
+        download_assets.sync_all({"yahoo": provedor}, "incremental", ["us_sp500_SPY"], state_path=ambiente["estado"])
+    assert open(caminho, "rb").read() == antes
+    assert not os.path.exists(caminho + ".tmp")
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from taxas import DIAS_ANO, IndiceTaxa, atualizar_indice, dias_uteis, feriados, pascoa, _acumular
+
+D = lambda s: np.datetime64(s, "D")
+
+
+def test_pascoa():
+    assert pascoa(2024) == D("2024-03-31")
+    assert pascoa(2025) == D("2025-04-20")
+    assert pascoa(2026) == D("2026-04-05")
+
+
+def test_dias_uteis_2025():
+    assert len(dias_uteis("2025-01-01", "2026-01-01")) == 252
+    # Carnaval, Sexta-feira Santa e Corpus Christi a partir da Páscoa
+    moveis = [D("2025-03-03"), D("2025-03-04"), D("2025-04-18"), D("2025-06-19")]
+    assert set(moveis) <= set(feriados(2025, 2025))
+    assert not set(moveis) & set(dias_uteis("2025-01-01", "2026-01-01"))
+
+
+def _gravar_selic(path, serie):
+    serie.rename("selic_meta_aa").rename_axis("date").to_csv(path)
+
+
+@pytest.fixture
+def selic():
+    # Taxa meta por dia corrido, com alguns degraus
+    datas = pd.date_range("2024-01-01", "2025-06-30", freq="D")
+    taxa = np.select([datas < "2024-06-01", datas < "2025-01-15"], [11.25, 10.5], 13.25)
+    return pd.Series(taxa, index=datas)
+
+
+def _mesmo_indice(a, b):
+    np.testing.assert_array_equal(a.datas, b.datas)
+    np.testing.assert_array_equal(a.taxa, b.taxa)
+    np.testing.assert_allclose(a.indice, b.indice, rtol=1e-13)
+
+
+def test_atualizacao_incremental_igual_a_completa(tmp_path, selic):
+    origem = str(tmp_path / "selic.csv")
+    destino = str(tmp_path / "taxas")
+    _gravar_selic(origem, selic[:"2025-03-31"])
+    atualizar_indice(origem, destino)
+
+    # Novas datas: só a cauda é recalculada
+    _gravar_selic(origem, selic)
+    incremental, recalculados = atualizar_indice(origem, destino)
+    assert recalculados == len(dias_uteis("2025-04-01", "2025-07-01"))
+    _mesmo_indice(incremental, atualizar_indice(origem, str(tmp_path / "completo_1"))[0])
+
+    # Taxa revisada no meio do histórico: recalcula a partir dela
+    revisada = selic.copy()
+    revisada["2024-09-10":] += 0.25
+    _gravar_selic(origem, revisada)
+    incremental, recalculados = atualizar_indice(origem, destino)
+    assert recalculados == len(dias_uteis("2024-09-10", "2025-07-01"))
+    _mesmo_indice(incremental, atualizar_indice(origem, str(tmp_path / "completo_2"))[0])
+
+    # Sem mudanças: nada recalculado
+    assert atualizar_indice(origem, destino)[1] == 0
+
+
+def test_retorno_e_du_em_dias_nao_uteis():
+    datas = dias_uteis("2025-01-01", "2026-01-01")
+    taxa = np.full(len(datas), 10.0)
+    indice = IndiceTaxa(datas, taxa, _acumular(taxa))
+
+    # Sábado a sábado com o Carnaval no meio: rendem só 5, 6 e 7 de março
+    assert indice.du("2025-03-01", "2025-03-08") == 3
+    assert indice.retorno("2025-03-01", "2025-03-08") == pytest.approx(1.1 ** (3 / DIAS_ANO) - 1, rel=1e-12)
+    # Fim de semana inteiro: nada rende
+    assert indice.du("2025-03-08", "2025-03-09") == 0
+    assert indice.retorno("2025-03-08", "2025-03-09") == 0
+    # Vetorizado: mesmas datas como arrays
+    inicio = np.array(["2025-03-01", "2025-04-18"], dtype="datetime64[D]")
+    fim = np.array(["2025-03-08", "2025-04-21"], dtype="datetime64[D]")
+    np.testing.assert_array_equal(indice.du(inicio, fim), [3, 0])